@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 
+import sys
 import json
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+from reference import load_reference, WORKBOOK, CACHE_DIR
+
 plt.rcParams.update({
     'font.family': 'serif',
     'font.size': 11,
@@ -16,10 +20,44 @@ plt.rcParams.update({
     'figure.facecolor': 'white'
 })
 
+PLOT_METRICS = ['annual_heating_load', 'annual_sensible_cooling_load', 'peak_heating_load',
+                'peak_sensible_cooling_load', 'annual_incident_solar_horizontal',
+                'annual_transmitted_solar_south', 'transmissivity_coefficient_south']
+
+# The curated 600/600FF subset
+OTHER_TOOLS_FILE = 'results/OTHER_TOOLS.json'
+
+def read_reference(reference_file=None):
+    # Default: the compiled workbook cache (all cases), else the curated 600/600FF subset
+    if reference_file is None:
+        try:
+            return load_reference()
+        except FileNotFoundError:
+            reference_file = OTHER_TOOLS_FILE
+    with open(reference_file, 'r') as f:
+        return json.load(f)
+
+def reference_source(reference_file=None):
+    # The file whose edits change what read_reference returns
+    if reference_file is not None:
+        return reference_file
+    if Path(WORKBOOK).exists():
+        return WORKBOOK
+    index_file = Path(CACHE_DIR) / 'index.json'
+    return str(index_file) if index_file.exists() else OTHER_TOOLS_FILE
+
+# extract_results.py's output for run_simulation.py's default weather, then the committed results
+RESULTS_FILE = 'results/BESTEST/FORMATTED_RESULTS.json'
+LEGACY_RESULTS_FILE = 'results/FORMATTED_RESULTS.json'
+
+def default_results_file():
+    return RESULTS_FILE if Path(RESULTS_FILE).exists() else LEGACY_RESULTS_FILE
+
 class BESTESTComparison:
-    def __init__(self, reference_file='results/OTHER_TOOLS.json', results_file='results/FORMATTED_RESULTS.json'):
-        with open(reference_file, 'r') as f:
-            self.reference = json.load(f)
+    def __init__(self, reference_file=None, results_file=None, output_dir='results_analysis'):
+        self.output_dir = Path(output_dir)
+        self.reference = read_reference(reference_file)
+        results_file = results_file or default_results_file()
         with open(results_file, 'r') as f:
             self.results = json.load(f)
         
@@ -31,18 +69,26 @@ class BESTESTComparison:
             'text': '#2C3E50'
         }
     
+    def reference_metric(self, metric_name, case='case_600'):
+        if 'cases' in self.reference:
+            return self.reference['cases'].get(case[len('case_'):], {}).get('metrics', {}).get(metric_name)
+        return self.reference['metrics'].get(metric_name)
+    
     def compare_metric(self, metric_name, case='case_600'):
-        ref_metric = self.reference['metrics'].get(metric_name)
+        ref_metric = self.reference_metric(metric_name, case)
         if not ref_metric:
             return None
         
-        your_value = self.results[case].get(metric_name)
+        your_value = self.results.get(case, {}).get(metric_name)
         if isinstance(your_value, dict) and 'value' in your_value:
             your_value = your_value['value']
+        if your_value is None:
+            return None
         
         stats = ref_metric['statistics']
         
         return {
+            'case': case,
             'metric': metric_name,
             'your_value': your_value,
             'ref_min': stats['min'],
@@ -73,6 +119,15 @@ class BESTESTComparison:
             if comp:
                 results.append(comp)
         
+        # Any other simulated case with reference data in the workbook
+        for case, values in self.results.items():
+            if not case.startswith('case_') or case in ('case_600', 'case_600FF'):
+                continue
+            for metric in values:
+                comp = self.compare_metric(metric, case)
+                if comp:
+                    results.append(comp)
+        
         return pd.DataFrame(results)
     
     def plot_comparison(self, metric_name, save_path=None):
@@ -168,13 +223,9 @@ class BESTESTComparison:
         plt.close()
     
     def plot_all_comparisons(self):
-        Path('results_analysis').mkdir(exist_ok=True)
-        metrics = ['annual_heating_load', 'annual_sensible_cooling_load', 'peak_heating_load', 
-                  'peak_sensible_cooling_load', 'annual_incident_solar_horizontal',
-                  'annual_transmitted_solar_south', 'transmissivity_coefficient_south']
-        
-        for metric in metrics:
-            self.plot_comparison(metric, f"results_analysis/{metric}.png")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for metric in PLOT_METRICS:
+            self.plot_comparison(metric, self.output_dir / f"{metric}.png")
     
     def plot_monthly_comparison(self, data_type='heating', save_path=None):
         if 'monthly_data' not in self.reference:
@@ -277,8 +328,8 @@ class BESTESTComparison:
     def generate_comparison_report(self):
         df = self.compare_all_metrics()
         
-        Path('results_analysis').mkdir(exist_ok=True)
-        with open('results_analysis/results_report.txt', 'w') as f:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.output_dir / 'results_report.txt', 'w') as f:
             f.write("BESTEST VALIDATION REPORT\n")
             f.write("=" * 50 + "\n\n")
             
@@ -310,6 +361,8 @@ class BESTESTComparison:
                     for _, row in cat_df.iterrows():
                         status = "✓" if row['within_range'] else "✗"
                         metric_name = row['metric'].replace('_', ' ').replace('annual ', '').replace('peak ', '').title()
+                        if row['case'] not in ('case_600', 'case_600FF'):
+                            metric_name = f"Case {row['case'][len('case_'):]} {metric_name}"
                         f.write(f"{status} {metric_name}: {row['your_value']:.3f} {row['unit']}")
                         
                         if not row['within_range']:
@@ -327,6 +380,8 @@ class BESTESTComparison:
                 f.write("-" * 17 + "\n")
                 for _, row in failed.iterrows():
                     metric_name = row['metric'].replace('_', ' ').title()
+                    if row['case'] not in ('case_600', 'case_600FF'):
+                        metric_name = f"Case {row['case'][len('case_'):]} {metric_name}"
                     f.write(f"✗ {metric_name}: {row['your_value']:.3f} {row['unit']}")
                     if row['your_value'] < row['ref_min']:
                         f.write(" (below minimum)\n")
@@ -335,10 +390,11 @@ class BESTESTComparison:
                 f.write("\n")
             
             # Performance data
-            heating = df[df['metric'] == 'annual_heating_load']['your_value'].iloc[0]
-            cooling = df[df['metric'] == 'annual_sensible_cooling_load']['your_value'].iloc[0]
-            peak_heat = df[df['metric'] == 'peak_heating_load']['your_value'].iloc[0]
-            peak_cool = df[df['metric'] == 'peak_sensible_cooling_load']['your_value'].iloc[0]
+            case_600 = df[df['case'] == 'case_600']
+            heating = case_600[case_600['metric'] == 'annual_heating_load']['your_value'].iloc[0]
+            cooling = case_600[case_600['metric'] == 'annual_sensible_cooling_load']['your_value'].iloc[0]
+            peak_heat = case_600[case_600['metric'] == 'peak_heating_load']['your_value'].iloc[0]
+            peak_cool = case_600[case_600['metric'] == 'peak_sensible_cooling_load']['your_value'].iloc[0]
             
             f.write("Performance Summary\n")
             f.write("-" * 19 + "\n")
@@ -349,8 +405,133 @@ class BESTESTComparison:
             
         return df
 
+class BatchValidation:
+    MONTHS = ['january', 'february', 'march', 'april', 'may', 'june',
+              'july', 'august', 'september', 'october', 'november', 'december']
+
+    def __init__(self, reference_file=None):
+        reference = read_reference(reference_file)
+        case_refs = reference.get('cases') or {None: reference}
+
+        # Compile every annual metric and monthly range, for every case, into flat arrays once
+        columns, units, stats = [], [], []
+        for case_ref in case_refs.values():
+            for metric, ref in case_ref['metrics'].items():
+                columns.append(f"case_{ref['case']}.{metric}")
+                units.append(ref['unit'])
+                stats.append(ref['statistics'])
+
+            for data_type in ['heating', 'cooling']:
+                ref_monthly = case_ref.get('monthly_data', {}).get(f'{data_type}_loads')
+                if not ref_monthly:
+                    continue
+                for month in self.MONTHS:
+                    if month in ref_monthly['months']:
+                        columns.append(f"case_{ref_monthly['case']}.monthly_{data_type}_loads.{month}")
+                        units.append(ref_monthly['unit'])
+                        stats.append(ref_monthly['months'][month]['statistics'])
+
+        self.columns = columns
+        self.units = units
+        self.ref_min = np.array([s['min'] for s in stats], dtype=float)
+        self.ref_max = np.array([s['max'] for s in stats], dtype=float)
+        self.ref_mean = np.array([s['mean'] for s in stats], dtype=float)
+
+    def flatten(self, results):
+        row = np.full(len(self.columns), np.nan)
+        for i, column in enumerate(self.columns):
+            value = results
+            for key in column.split('.'):
+                value = value.get(key) if isinstance(value, dict) else None
+            if isinstance(value, dict) and 'value' in value:
+                value = value['value']
+            if isinstance(value, (int, float)):
+                row[i] = value
+        return row
+
+    def load(self, paths):
+        names, rows = [], []
+        for path in paths:
+            path = Path(path)
+            if path.suffix == '.csv':
+                # Parametric results.csv: one result set per variant, annual loads of case 600
+                df = pd.read_csv(path)
+                for _, variant in df.iterrows():
+                    results = {'case_600': {m: variant[m] for m in ['annual_heating_load', 'annual_sensible_cooling_load'] if m in variant}}
+                    names.append(f"{path.parent.parent.name}:{variant['variant']}" if len(paths) > 1 else str(variant['variant']))
+                    rows.append(self.flatten(results))
+            else:
+                with open(path, 'r') as f:
+                    results = json.load(f)
+                version = results.get('metadata', {}).get('version', '')
+                names.append(f"{path.parent.name} ({version})" if version else path.parent.name)
+                rows.append(self.flatten(results))
+        return names, np.vstack(rows) if rows else np.empty((0, len(self.columns)))
+
+    def validate(self, values):
+        evaluated = ~np.isnan(values)
+        within = evaluated & (values >= self.ref_min) & (values <= self.ref_max)
+
+        # Distance outside the range, in multiples of the range width (0 inside the range)
+        width = np.where(self.ref_max > self.ref_min, self.ref_max - self.ref_min, 1.0)
+        below = np.clip(self.ref_min - values, 0, None)
+        above = np.clip(values - self.ref_max, 0, None)
+        distance = np.where(evaluated, (below + above) / width, np.nan)
+        return evaluated, within, distance
+
+    def run(self, paths, output_dir='results_analysis'):
+        names, values = self.load(paths)
+        evaluated, within, distance = self.validate(values)
+
+        n_evaluated = evaluated.sum(axis=1)
+        n_passed = within.sum(axis=1)
+        passes = (n_evaluated > 0) & (n_passed == n_evaluated)
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        status = np.where(within, 'pass', np.where(evaluated, 'fail', ''))
+        matrix = pd.DataFrame(status, index=names, columns=self.columns)
+        matrix.index.name = 'result_set'
+        matrix.to_csv(output_dir / 'batch_validation.csv')
+        pd.DataFrame(distance, index=matrix.index, columns=self.columns).to_csv(output_dir / 'batch_distance.csv')
+
+        with open(output_dir / 'batch_summary.txt', 'w') as f:
+            f.write("BESTEST BATCH VALIDATION\n")
+            f.write("=" * 50 + "\n\n")
+            f.write(f"{passes.sum()}/{len(names)} result sets pass every evaluated metric\n\n")
+            for i, name in enumerate(names):
+                mark = "✓" if passes[i] else "✗"
+                f.write(f"{mark} {name}: {n_passed[i]}/{n_evaluated[i]} metrics within range")
+                if not passes[i] and n_evaluated[i]:
+                    worst = np.nanargmax(distance[i])
+                    f.write(f" (worst: {self.columns[worst]}, {distance[i, worst]:.2f} ranges outside)")
+                f.write("\n")
+
+        return matrix, passes
+
 def main():
-    comparison = BESTESTComparison()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare EnergyPlus results against BESTEST reference tools')
+    parser.add_argument('--results', default=None, help=f'Formatted results JSON (default: {RESULTS_FILE}, else {LEGACY_RESULTS_FILE})')
+    parser.add_argument('--output-dir', default='results_analysis', help='Where to write plots and the report')
+    parser.add_argument('--reference', default=None, help='Reference JSON (default: compiled workbook cache, see reference.py)')
+    parser.add_argument('--batch', nargs='+', default=None, help='Validate many FORMATTED_RESULTS.json / parametric results.csv files at once')
+    args = parser.parse_args()
+
+    if args.batch:
+        matrix, passes = BatchValidation(args.reference).run(args.batch, args.output_dir)
+        print(f"BESTEST batch validation: {passes.sum()}/{len(passes)} result sets pass")
+        return 0 if len(passes) else 1
+
+    results_file = args.results or default_results_file()
+    if not Path(results_file).exists():
+        # Nothing was validated, so this must not look like a pass
+        print(f"No {results_file}; run run_simulation.py (or extract_results.py) first, or pass --results")
+        return 1
+
+    comparison = BESTESTComparison(args.reference, results_file=results_file, output_dir=args.output_dir)
     df = comparison.generate_comparison_report()
     
     passed = df['within_range'].sum()
@@ -358,8 +539,9 @@ def main():
     print(f"BESTEST validation: {passed}/{total} passed")
     
     comparison.plot_all_comparisons()
-    comparison.plot_monthly_comparison('heating', 'results_analysis/monthly_heating_comparison.png')
-    comparison.plot_monthly_comparison('cooling', 'results_analysis/monthly_cooling_comparison.png')
+    comparison.plot_monthly_comparison('heating', comparison.output_dir / 'monthly_heating_comparison.png')
+    comparison.plot_monthly_comparison('cooling', comparison.output_dir / 'monthly_cooling_comparison.png')
+    return 0
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,32 +1,24 @@
 #!/usr/bin/env python3
 
+import sys
 import pandas as pd
 import json
+from pathlib import Path
 from datetime import datetime
 
-def extract_eso_data(eso_file):
-    with open(eso_file, 'r') as f:
-        lines = f.readlines()
-    
-    # Parse data dictionary
-    variables = {}
-    data_start = 0
-    
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if line == "End of Data Dictionary":
-            data_start = i + 1
-            break
-        if line and line[0].isdigit() and ',' in line:
-            parts = line.split(',')
-            if len(parts) >= 4:
-                try:
-                    key = int(parts[0])
-                    zone = parts[2]
-                    var = parts[3].split('[')[0].strip()
-                    variables[key] = {'zone': zone, 'variable': var}
-                except:
-                    pass
+from parametric.eso_index import EsoIndex, eso_version
+from parametric.extraction_cache import EXTRACTION_CACHE, EXTRACTOR_VERSION
+
+# run_simulation.py's layout for its default weather: outputs/<weather>/<case>, results/<weather>/
+RUN_DIR = 'outputs/BESTEST'
+RESULTS_DIR = 'results/BESTEST'
+# Runs from before that layout, and where their results were committed
+LEGACY_CASES = {'Case600': 'Case600_output/eplusout.eso', 'Case600FF': 'Case600FF_output/eplusout.eso'}
+LEGACY_RESULTS_DIR = 'results'
+
+def extract_eso_data(eso_file, environments='run_period'):
+    # Byte-offset index of the ESO: only run-period environments are read, design days are skipped
+    index = EsoIndex.load(eso_file)
     
     # Find variables we need
     keywords = [
@@ -40,16 +32,16 @@ def extract_eso_data(eso_file):
     ]
     
     key_vars = {}
-    for key, info in variables.items():
-        var_lower = info['variable'].lower()
+    for key, info in index.variables.items():
+        var_lower = info['name'].lower()
         if any(keyword in var_lower for keyword in keywords):
-            key_vars[key] = info
+            key_vars[int(key)] = {'zone': info['key'], 'variable': info['name']}
     
     # Parse data
     current_data = {}
     all_data = []
     
-    for line in lines[data_start:]:
+    for line in index.lines(index.environments(environments)):
         line = line.strip()
         if not line or line == "End of Data":
             break
@@ -99,7 +91,7 @@ def extract_metrics(df, case_name):
         results['min_time'] = df.loc[min_idx, ['Month', 'DayOfMonth', 'Hour']].to_dict()
         results['max_time'] = df.loc[max_idx, ['Month', 'DayOfMonth', 'Hour']].to_dict()
         
-        if case_name == 'Case600FF':
+        if case_name.endswith('FF'):
             feb_1 = df[(df['Month'] == 2) & (df['DayOfMonth'] == 1)]
             if len(feb_1) > 0:
                 hourly = feb_1.groupby('Hour')[zone_temp_col].first()
@@ -132,8 +124,8 @@ def extract_metrics(df, case_name):
         results['peak_cooling'] = df[cooling_rate].max() / 1000
         results['peak_cooling_time'] = df.loc[peak_idx, ['Month', 'DayOfMonth', 'Hour']].to_dict()
     
-    # Solar radiation (Case600 only)
-    if case_name == 'Case600':
+    # Solar radiation (conditioned cases only)
+    if not case_name.endswith('FF'):
         solar_surfaces = {
             'ROOF': 'horizontal',
             'NORTH_WALL': 'north', 
@@ -158,51 +150,60 @@ def extract_metrics(df, case_name):
     
     return results
 
-def generate_bestest_json(case600_data, case600ff_data):
+def case_key(case_name):
+    # Case600FF -> case_600FF
+    return 'case_' + case_name[len('Case'):] if case_name.startswith('Case') else case_name.lower()
+
+def format_case(data, case_name):
+    if case_name.endswith('FF'):
+        return {
+            "free_float_mean_temperature": round(data.get('mean_temp', 0), 1),
+            "free_float_max_temperature": round(data.get('max_temp', 0), 1),
+            "free_float_min_temperature": round(data.get('min_temp', 0), 1)
+        }
+
+    transmissivity = None
+    if 'solar_south' in data and 'transmitted_south' in data:
+        if data['solar_south'] > 0:
+            transmissivity = data['transmitted_south'] / data['solar_south']
+
+    case_data = {
+        "annual_heating_load": round(data.get('annual_heating', 0), 3),
+        "annual_sensible_cooling_load": round(data.get('annual_cooling', 0), 3),
+        "peak_heating_load": round(data.get('peak_heating', 0), 3),
+        "peak_sensible_cooling_load": round(data.get('peak_cooling', 0), 3),
+        "annual_incident_solar_horizontal": round(data.get('solar_horizontal', 0)),
+        "annual_incident_solar_north": round(data.get('solar_north', 0)),
+        "annual_incident_solar_east": round(data.get('solar_east', 0)),
+        "annual_incident_solar_south": round(data.get('solar_south', 0)),
+        "annual_incident_solar_west": round(data.get('solar_west', 0)),
+        "annual_transmitted_solar_south": round(data.get('transmitted_south', 0)),
+        "transmissivity_coefficient_south": round(transmissivity, 3) if transmissivity else 0
+    }
+
+    # Add monthly data if available
+    if 'monthly_heating_loads' in data:
+        case_data['monthly_heating_loads'] = data['monthly_heating_loads']
+    if 'monthly_cooling_loads' in data:
+        case_data['monthly_cooling_loads'] = data['monthly_cooling_loads']
+
+    return case_data
+
+def generate_bestest_json(cases_data, output_file=f'{RESULTS_DIR}/FORMATTED_RESULTS.json', version=None):
+    # version: the engine that wrote the ESOs (see parametric.eso_index.eso_version)
     json_data = {
         "metadata": {
             "simulation_tool": "EnergyPlus",
-            "version": "25.1.0",
+            "version": version or "unknown",
             "date_run": datetime.now().strftime("%Y-%m-%d")
         }
     }
-    
-    if case600_data:
-        transmissivity = None
-        if 'solar_south' in case600_data and 'transmitted_south' in case600_data:
-            if case600_data['solar_south'] > 0:
-                transmissivity = case600_data['transmitted_south'] / case600_data['solar_south']
-        
-        case_600_data = {
-            "annual_heating_load": round(case600_data.get('annual_heating', 0), 3),
-            "annual_sensible_cooling_load": round(case600_data.get('annual_cooling', 0), 3),
-            "peak_heating_load": round(case600_data.get('peak_heating', 0), 3),
-            "peak_sensible_cooling_load": round(case600_data.get('peak_cooling', 0), 3),
-            "annual_incident_solar_horizontal": round(case600_data.get('solar_horizontal', 0)),
-            "annual_incident_solar_north": round(case600_data.get('solar_north', 0)),
-            "annual_incident_solar_east": round(case600_data.get('solar_east', 0)),
-            "annual_incident_solar_south": round(case600_data.get('solar_south', 0)),
-            "annual_incident_solar_west": round(case600_data.get('solar_west', 0)),
-            "annual_transmitted_solar_south": round(case600_data.get('transmitted_south', 0)),
-            "transmissivity_coefficient_south": round(transmissivity, 3) if transmissivity else 0
-        }
-        
-        # Add monthly data if available
-        if 'monthly_heating_loads' in case600_data:
-            case_600_data['monthly_heating_loads'] = case600_data['monthly_heating_loads']
-        if 'monthly_cooling_loads' in case600_data:
-            case_600_data['monthly_cooling_loads'] = case600_data['monthly_cooling_loads']
-        
-        json_data["case_600"] = case_600_data
-    
-    if case600ff_data:
-        json_data["case_600FF"] = {
-            "free_float_mean_temperature": round(case600ff_data.get('mean_temp', 0), 1),
-            "free_float_max_temperature": round(case600ff_data.get('max_temp', 0), 1),
-            "free_float_min_temperature": round(case600ff_data.get('min_temp', 0), 1)
-        }
-    
-    with open('results/FORMATTED_RESULTS.json', 'w') as f:
+
+    for case_name, data in cases_data.items():
+        if data:
+            json_data[case_key(case_name)] = format_case(data, case_name)
+
+    with open(output_file, 'w') as f:
         json.dump(json_data, f, indent=2)
 
 def extract_monthly_data(df, case_name):
@@ -210,7 +211,7 @@ def extract_monthly_data(df, case_name):
     monthly_heating = {}
     monthly_cooling = {}
     
-    if case_name != 'Case600':
+    if case_name.endswith('FF'):
         return monthly_heating, monthly_cooling
     
     # Find energy columns
@@ -240,47 +241,95 @@ def extract_monthly_data(df, case_name):
     
     return monthly_heating, monthly_cooling
 
+def write_case_csv(eso_file, csv_file, columns):
+    # Only rewritten when the ESO changed or the CSV was replaced since the last write
+    csv_file = Path(csv_file)
+    kind = f"csv {csv_file.resolve()}"
+
+    def write():
+        df = columns()
+        if df is None:
+            return None
+        df.to_csv(csv_file, index=False)
+        return {'mtime': csv_file.stat().st_mtime_ns}
+
+    written = EXTRACTION_CACHE.fetch(eso_file, kind, EXTRACTOR_VERSION, write)
+    if written and (not csv_file.exists() or csv_file.stat().st_mtime_ns != written['mtime']):
+        EXTRACTION_CACHE.forget(eso_file, kind)
+        EXTRACTION_CACHE.fetch(eso_file, kind, EXTRACTOR_VERSION, write)
+
+def case_metrics(df, case_name):
+    if df is None:
+        return None
+
+    metrics = extract_metrics(df, case_name)
+
+    # Add monthly data for conditioned cases
+    if not case_name.endswith('FF'):
+        monthly_heating, monthly_cooling = extract_monthly_data(df, case_name)
+        metrics['monthly_heating_loads'] = monthly_heating
+        metrics['monthly_cooling_loads'] = monthly_cooling
+
+    return metrics
+
+def extract_case(eso_file, case_name, csv_file=None):
+    # Parsed columns and metrics are cached per ESO, so unchanged outputs are not re-parsed
+    def columns():
+        return EXTRACTION_CACHE.fetch_frame(eso_file, 'eso_columns', EXTRACTOR_VERSION,
+                                            lambda: extract_eso_data(eso_file))
+
+    # Save CSV files for bestest_analyze.py
+    if csv_file:
+        write_case_csv(eso_file, csv_file, columns)
+
+    kind = 'case_metrics_ff' if case_name.endswith('FF') else 'case_metrics'
+    return EXTRACTION_CACHE.fetch(eso_file, kind, EXTRACTOR_VERSION, lambda: case_metrics(columns(), case_name))
+
 def main():
-    import os
-    
-    cases = {
-        'Case600': 'Case600_output/eplusout.eso',
-        'Case600FF': 'Case600FF_output/eplusout.eso'
-    }
-    
-    case600_data = case600ff_data = None
-    
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Extract BESTEST results from EnergyPlus outputs')
+    parser.add_argument('--run-dir', default=RUN_DIR, help='Run directory holding <Case>/eplusout.eso (run_simulation.py writes outputs/<weather>)')
+    parser.add_argument('--results-dir', default=None, help=f'Where to write CSV and FORMATTED_RESULTS.json (default: {RESULTS_DIR})')
+    args = parser.parse_args()
+
+    results_dir = args.results_dir or RESULTS_DIR
+    if Path(args.run_dir).is_dir():
+        cases = {d.name: str(d / 'eplusout.eso') for d in sorted(Path(args.run_dir).iterdir()) if d.is_dir()}
+    else:
+        # Legacy runs go back to the legacy results, which analyze.py falls back to
+        results_dir = args.results_dir or LEGACY_RESULTS_DIR
+        print(f"No {args.run_dir}; reading Case600_output and Case600FF_output into {results_dir}/")
+        cases = dict(LEGACY_CASES)
+
+    Path(results_dir).mkdir(parents=True, exist_ok=True)
+    cases_data = {}
+    versions = set()
+
     for case_name, eso_file in cases.items():
         try:
-            df = extract_eso_data(eso_file)
-            if df is not None:
-                # Save CSV files for bestest_analyze.py
-                csv_file = f"results/{case_name}.csv"
-                df.to_csv(csv_file, index=False)
-                
-                metrics = extract_metrics(df, case_name)
-                
-                # Add monthly data for Case600
-                if case_name == 'Case600':
-                    monthly_heating, monthly_cooling = extract_monthly_data(df, case_name)
-                    metrics['monthly_heating_loads'] = monthly_heating
-                    metrics['monthly_cooling_loads'] = monthly_cooling
-                
-                if case_name == 'Case600':
-                    case600_data = metrics
-                    print(f"Case 600: {metrics.get('annual_heating', 0):.3f} MWh heating, {metrics.get('annual_cooling', 0):.3f} MWh cooling")
+            metrics = extract_case(eso_file, case_name, f"{results_dir}/{case_name}.csv")
+            if metrics is not None:
+                cases_data[case_name] = metrics
+                versions.add(eso_version(eso_file))
+                if case_name.endswith('FF'):
+                    print(f"Case {case_name[4:]}: {metrics.get('mean_temp', 0):.1f}°C mean temp")
                 else:
-                    case600ff_data = metrics
-                    print(f"Case 600FF: {metrics.get('mean_temp', 0):.1f}°C mean temp")
-                
+                    print(f"Case {case_name[4:]}: {metrics.get('annual_heating', 0):.3f} MWh heating, {metrics.get('annual_cooling', 0):.3f} MWh cooling")
+
         except FileNotFoundError:
             print(f"File not found: {eso_file}")
         except Exception as e:
             print(f"Error processing {case_name}: {e}")
-    
-    if case600_data or case600ff_data:
-        generate_bestest_json(case600_data, case600ff_data)
-        print("Data saved to CSV and JSON files")
+
+    if cases_data:
+        generate_bestest_json(cases_data, f"{results_dir}/FORMATTED_RESULTS.json",
+                              ', '.join(sorted(v for v in versions if v)) or None)
+        EXTRACTION_CACHE.flush()
+        print(f"Data saved to CSV and JSON files ({EXTRACTION_CACHE.misses} parsed, {EXTRACTION_CACHE.hits} from cache)")
+        return 0
+    print("No cases extracted")
+    return 1
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,4 +1,17 @@
-from .config import STUDY_CASES, CONFIG
-from .simulation import run_simulations
-from .extraction import extract_all_results
-from .analysis import analyze_results
\ No newline at end of file
+import importlib
+
+# Loaded on first use, so scripts that only read ESOs (extract_results.py, run_simulation.py)
+# don't pull in eppy, SALib or the EnergyPlus API through this package
+_EXPORTS = {
+    'STUDY_CASES': 'config',
+    'CONFIG': 'config',
+    'run_simulations': 'simulation',
+    'extract_all_results': 'extraction',
+    'analyze_results': 'analysis',
+    'run_sobol': 'sobol'
+}
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
@@ -15,7 +15,12 @@ def analyze_results(df):
     print(f"Analyzing {len(df)} results...")
     
     create_academic_plots(df, plots_dir)
+    write_results_text(df, plots_dir)
     
+    print("Analysis complete")
+    return True
+
+def write_results_text(df, plots_dir):
     base_mask = df['variant'] == 'base'
     if base_mask.any():
         base_row = df[base_mask].iloc[0]
@@ -38,7 +43,13 @@ def analyze_results(df):
                             h_diff = ((heating - base_row['annual_heating_load']) / base_row['annual_heating_load']) * 100
                             c_diff = ((cooling - base_row['annual_sensible_cooling_load']) / base_row['annual_sensible_cooling_load']) * 100
                             label = group_info['labels'][i]
-                            f.write(f"  {label}: {heating:.3f} MWh ({h_diff:+.1f}%) / {cooling:.3f} MWh ({c_diff:+.1f}%)\n")
+                            fidelity = variant_data['fidelity'].iloc[0] if 'fidelity' in variant_data else 'full'
+                            note = ""
+                            if fidelity == 'screened':
+                                note = " [screened, base values]"
+                            elif fidelity == 'reused':
+                                note = f" [reused from {variant_data['reused_from'].iloc[0]}]"
+                            f.write(f"  {label}: {heating:.3f} MWh ({h_diff:+.1f}%) / {cooling:.3f} MWh ({c_diff:+.1f}%){note}\n")
                     f.write("\n")
             
             # Summary table
@@ -55,6 +66,11 @@ def analyze_results(df):
                         max_c = max(max_c, c_diff)
                 
                 f.write(f"  {group_info['name']}: {max_h:.1f}% heating, {max_c:.1f}% cooling\n")
-    
-    print("Analysis complete")
-    return True
\ No newline at end of file
+            
+            # Variants that were not simulated because their model matched another
+            if 'reused_from' in df:
+                reused = df[df['reused_from'].notna()]
+                if not reused.empty:
+                    f.write("\nReused variants (not simulated):\n")
+                    for _, row in reused.iterrows():
+                        f.write(f"  {row['variant']} -> {row['reused_from']}: {row['reuse_reason']}\n")
\ No newline at end of file
@@ -0,0 +1,136 @@
+import os
+import sys
+import importlib
+import threading
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from .config import CONFIG
+from .canonical import parse_objects
+from .extraction import METRIC_VARIABLES
+from .cpu_budget import pin
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def load_api(module_name=None):
+    # pyenergyplus ships inside the EnergyPlus install directory, not on PyPI
+    energyplus_dir = str(Path(CONFIG['energyplus_exe']).parent)
+    if energyplus_dir not in sys.path:
+        sys.path.insert(0, energyplus_dir)
+    module = importlib.import_module(module_name or CONFIG['pyenergyplus_module'])
+    return module.EnergyPlusAPI()
+
+class SeriesBuffer:
+    def __init__(self, capacity=8760):
+        self.values = np.empty(capacity)
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self.values):
+            self.values = np.resize(self.values, 2 * len(self.values))
+        self.values[self.size] = value
+        self.size += 1
+
+    def array(self):
+        return self.values[:self.size]
+
+def ideal_loads_keys(idf_file):
+    keys = [fields[1] for fields in parse_objects(Path(idf_file).read_text())
+            if fields[0] == 'zonehvac:idealloadsairsystem' and len(fields) > 1]
+    return keys or ['*']
+
+def run_api_simulation(idf_file, output_dir, weather_file, metrics, module_name=None, cores=None, threads=None):
+    # Runs inside a worker process: EnergyPlus state is process-global
+    if threads:
+        # Read when the EnergyPlus library first starts OpenMP in this worker
+        os.environ['OMP_NUM_THREADS'] = str(threads)
+    pin(0, cores)
+    api = load_api(module_name)
+    state = api.state_manager.new_state()
+    api.runtime.set_console_output_status(state, False)
+
+    keys = ideal_loads_keys(idf_file)
+    requests = [(metric, METRIC_VARIABLES[metric], key) for metric in metrics for key in keys]
+    for _, variable, key in requests:
+        api.exchange.request_variable(state, variable, key)
+
+    buffers = {request: SeriesBuffer() for request in requests}
+    handles = {}
+    errors = []
+
+    def collect(state):
+        if api.exchange.warmup_flag(state) or errors:
+            return
+        if not handles:
+            if not api.exchange.api_data_fully_ready(state):
+                return
+            for request in requests:
+                handle = api.exchange.get_variable_handle(state, request[1], request[2])
+                if handle == -1:
+                    errors.append(f"no handle for {request[1]} ({request[2]})")
+                    api.runtime.stop_simulation(state)
+                    return
+                handles[request] = handle
+        for request, handle in handles.items():
+            buffers[request].append(api.exchange.get_variable_value(state, handle))
+
+    # System timestep: energy variables are summed over every HVAC step
+    api.runtime.callback_end_system_timestep_after_hvac_reporting(state, collect)
+    exit_code = api.runtime.run_energyplus(state, ['-w', str(weather_file), '-d', str(output_dir), str(idf_file)])
+    api.state_manager.delete_state(state)
+
+    if errors:
+        return {'status': 'failed', 'reason': errors[0]}
+    if exit_code != 0:
+        return {'status': 'failed', 'reason': f"exit code {exit_code}"}
+
+    totals = {metric: 0.0 for metric in metrics}
+    steps = 0
+    for (metric, _, _), buffer in buffers.items():
+        values = buffer.array()
+        totals[metric] += float(values.sum())
+        steps = max(steps, len(values))
+    return {'status': 'success', 'metrics': {m: total / 3.6e9 for m, total in totals.items()}, 'steps': steps}
+
+def start_api_pool(workers=None):
+    # Spawned, not forked: the sweep's thread pool may already be running when workers start.
+    # Sized once; call stop_api_pool() first to resize, e.g. between calibrated layouts
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=workers or CONFIG['max_parallel'],
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _POOL
+
+def stop_api_pool(kill=False):
+    # kill: a worker is stuck in EnergyPlus and cannot be cancelled, so every worker goes
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is None:
+        return
+    if kill:
+        for process in list((pool._processes or {}).values()):
+            process.kill()
+    pool.shutdown(wait=not kill, cancel_futures=kill)
+
+def api_pool():
+    return _POOL or start_api_pool()
+
+def run_api(idf_file, output_dir, weather_file, metrics, cores=None, threads=None, timeout=None):
+    future = api_pool().submit(run_api_simulation, str(idf_file), str(output_dir), str(weather_file),
+                               list(metrics), CONFIG['pyenergyplus_module'], cores, threads)
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        # Runs sharing the pool fail with it and are retried like any other failed run
+        stop_api_pool(kill=True)
+        return {'status': 'failed', 'reason': f"timeout after {timeout:.0f}s"}
+    except BrokenProcessPool:
+        stop_api_pool()
+        return {'status': 'failed', 'reason': "api worker pool stopped"}
@@ -0,0 +1,91 @@
+import io
+import gzip
+import time
+import shutil
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .config import CONFIG
+from .journal import Journal
+
+# Everything else in an EnergyPlus output directory is dropped on harvest
+KEEP_FILES = ['eplusout.eso', 'eplusout.err']
+
+def new_run_id():
+    return time.strftime('%Y%m%d-%H%M%S')
+
+def base_run_dirs(case='Case600'):
+    # run_simulation.py's outputs/<weather>/<case> for the configured weather, then the old <case>_output
+    return [Path('outputs') / Path(CONFIG['weather_file']).stem / case, Path(f"{case}_output")]
+
+def resolve_eso(eso_path):
+    eso_path = Path(eso_path)
+    for candidate in [eso_path, eso_path.with_name(eso_path.name + '.gz'), eso_path.with_name(eso_path.name + '.zst')]:
+        if candidate.exists():
+            return candidate
+    return eso_path
+
+def open_eso(eso_path):
+    # Text stream over a plain, gzip or zstd ESO; nothing is decompressed to disk
+    eso_path = resolve_eso(eso_path)
+    if eso_path.suffix == '.gz':
+        return gzip.open(eso_path, 'rt')
+    if eso_path.suffix == '.zst':
+        if zstandard is None:
+            raise ImportError("zstandard is required to read .zst artifacts")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(eso_path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader)
+    return open(eso_path, 'r')
+
+def compress_file(src, dst_dir, method):
+    if method == 'zstd' and zstandard is not None:
+        dst = Path(dst_dir) / (Path(src).name + '.zst')
+        with open(src, 'rb') as f_in, open(dst, 'wb') as f_out:
+            zstandard.ZstdCompressor(level=10).copy_stream(f_in, f_out)
+    else:
+        dst = Path(dst_dir) / (Path(src).name + '.gz')
+        with open(src, 'rb') as f_in, gzip.open(dst, 'wb', compresslevel=6) as f_out:
+            shutil.copyfileobj(f_in, f_out)
+    return dst
+
+def harvest(output_dir, run_id, store_dir=None):
+    output_dir = Path(output_dir)
+    run_dir = Path(store_dir or CONFIG['artifact_store']) / run_id / output_dir.name
+    run_dir.mkdir(parents=True, exist_ok=True)
+
+    for name in KEEP_FILES:
+        src = output_dir / name
+        if src.exists():
+            compress_file(src, run_dir, CONFIG['artifact_compression'])
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    return run_dir
+
+def apply_retention(store_dir=None, keep_runs=None, max_age_days=None):
+    store_dir = Path(store_dir or CONFIG['artifact_store'])
+    keep_runs = CONFIG['artifact_keep_runs'] if keep_runs is None else keep_runs
+    max_age_days = CONFIG['artifact_max_age_days'] if max_age_days is None else max_age_days
+    if not store_dir.exists():
+        return []
+
+    # Run ids are timestamps, so name order is age order
+    runs = sorted((d for d in store_dir.iterdir() if d.is_dir()), key=lambda d: d.name, reverse=True)
+    cutoff = time.time() - max_age_days * 86400
+    # An interrupted sweep's finished variants live here until `resume` completes it
+    pending = Journal().pending_run()
+
+    removed = []
+    for i, run_dir in enumerate(runs):
+        if run_dir.name == pending:
+            continue
+        if i >= keep_runs or run_dir.stat().st_mtime < cutoff:
+            shutil.rmtree(run_dir, ignore_errors=True)
+            removed.append(run_dir.name)
+
+    if removed:
+        print(f"Removed {len(removed)} old artifact runs")
+    return removed
@@ -0,0 +1,55 @@
+import time
+import pandas as pd
+from pathlib import Path
+
+from .config import STUDY_CASES, CONFIG
+from .extraction import result_metrics
+
+def benchmark_backends(variant_ids=('1a', '1b', '12a'), repeats=3, backends=('subprocess', 'api')):
+    from .simulation import run_single_simulation
+
+    base_idf_path = Path.cwd() / CONFIG['base_case']
+    original_backend = CONFIG['backend']
+    rows = []
+
+    try:
+        for backend in backends:
+            CONFIG['backend'] = backend
+            for repeat in range(repeats):
+                for variant_id in variant_ids:
+                    # Wall time includes IDF writing and metric extraction, as in a sweep
+                    start = time.time()
+                    result = run_single_simulation(f"bench_{variant_id}", STUDY_CASES[variant_id], base_idf_path)
+                    metrics = result_metrics(result) if result['status'] == 'success' else {}
+                    rows.append({
+                        'backend': backend,
+                        'variant': variant_id,
+                        'repeat': repeat,
+                        'status': result['status'],
+                        'seconds': time.time() - start,
+                        'annual_heating_load': metrics.get('annual_heating_load'),
+                        'annual_sensible_cooling_load': metrics.get('annual_sensible_cooling_load')
+                    })
+    finally:
+        CONFIG['backend'] = original_backend
+
+    df = pd.DataFrame(rows)
+    results_dir = Path.cwd() / "parametric" / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    df.to_csv(results_dir / "backend_benchmark.csv", index=False)
+
+    print("Backend benchmark (mean seconds per variant):")
+    means = {}
+    for backend in backends:
+        ok = df[(df['backend'] == backend) & (df['status'] == 'success')]
+        failed = len(df[df['backend'] == backend]) - len(ok)
+        if ok.empty:
+            print(f"  {backend}: all {failed} runs failed")
+            continue
+        means[backend] = ok['seconds'].mean()
+        print(f"  {backend}: {means[backend]:.2f}s ({len(ok)} runs, {failed} failed)")
+
+    if len(means) == 2:
+        slow, fast = backends
+        print(f"  Speedup {fast} vs {slow}: {means[slow] / means[fast]:.2f}x")
+    return df
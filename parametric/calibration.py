@@ -0,0 +1,180 @@
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from .config import CONFIG, SOBOL_FACTORS
+from .utils import merge_modifications
+from .extraction import METRIC_VARIABLES
+
+def load_targets(reference_file=None):
+    # Reference mean and tool spread for every metric the sweep extracts
+    with open(reference_file or CONFIG['reference_file'], 'r') as f:
+        reference = json.load(f)
+    targets = {}
+    for metric in METRIC_VARIABLES:
+        stats = reference['metrics'].get(metric, {}).get('statistics')
+        if stats and stats['max'] > stats['min']:
+            targets[metric] = (stats['mean'], stats['max'] - stats['min'])
+    return targets
+
+def objective(metrics, targets):
+    # RMS distance to the reference mean, each metric in units of the tools' min-max spread
+    if not all(metric in metrics for metric in targets):
+        return np.inf
+    z = [(metrics[metric] - mean) / spread for metric, (mean, spread) in targets.items()]
+    return float(np.sqrt(np.mean(np.square(z))))
+
+def design_key(variant_ids):
+    # Independent of factor order, so the cache survives changes to calibration_factors
+    return '+'.join(sorted(variant_ids)) or 'base'
+
+class CalibrationCache:
+    def __init__(self, path=None):
+        self.path = Path(path or CONFIG['calibration_cache'])
+        self.entries = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text())
+            except ValueError:
+                self.entries = {}
+
+    def seed_from_sweep(self, csv_file=None):
+        # Full-year single-variant results of the last sweep are designs too
+        csv_file = Path(csv_file or Path.cwd() / "parametric" / "results" / "results.csv")
+        if not csv_file.exists():
+            return 0
+        df = pd.read_csv(csv_file)
+        seeded = 0
+        for _, row in df.iterrows():
+            if row.get('fidelity') in ('full', 'reused') and all(pd.notna(row.get(m)) for m in METRIC_VARIABLES):
+                key = design_key([] if row['variant'] == 'base' else [row['variant']])
+                if key not in self.entries:
+                    self.entries[key] = {m: float(row[m]) for m in METRIC_VARIABLES}
+                    seeded += 1
+        return seeded
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, indent=2))
+
+def run_calibration(budget=None, population=None, seed=0, evaluate=None):
+    if evaluate is None:
+        from .simulation import evaluate_variants as evaluate
+    budget = budget or CONFIG['calibration_budget']
+    population = population or CONFIG['calibration_population']
+    factors = {name: SOBOL_FACTORS[name] for name in CONFIG['calibration_factors']}
+    names = list(factors)
+    n_levels = np.array([len(factors[name]) + 1 for name in names])
+    rng = np.random.default_rng(seed)
+    targets = load_targets()
+    if not targets:
+        print("No reference statistics for the extracted metrics")
+        return pd.DataFrame()
+
+    cache = CalibrationCache()
+    seeded = cache.seed_from_sweep()
+    print(f"Calibrating {', '.join(names)} ({int(np.prod(n_levels))} combinations), "
+          f"budget {budget} simulations, {len(cache.entries)} cached designs ({seeded} from the last sweep)")
+
+    def variants_of(genome):
+        return [factors[name][level - 1] for name, level in zip(names, genome) if level > 0]
+
+    scores = {}
+    simulated = 0
+
+    def score(genomes):
+        # Evaluate a generation: cached designs are free, the rest go to the pool as one batch
+        nonlocal simulated
+        pending = {}
+        for genome in genomes:
+            key = design_key(variants_of(genome))
+            if key not in cache.entries and key not in pending:
+                pending[key] = genome
+        pending = dict(list(pending.items())[:max(0, budget - simulated)])
+        if pending:
+            configs = {f"calib_{'-'.join(map(str, genome))}": merge_modifications(variants_of(genome))
+                       for genome in pending.values()}
+            found = evaluate(configs)
+            simulated += len(configs)
+            for (key, genome), name in zip(pending.items(), configs):
+                if found.get(name):
+                    cache.entries[key] = found[name]
+            cache.save()
+        for genome in genomes:
+            key = design_key(variants_of(genome))
+            if key in cache.entries:
+                scores[tuple(genome)] = objective(cache.entries[key], targets)
+
+    def mutate(genome):
+        child = genome.copy()
+        for i in range(len(names)):
+            if rng.random() < 1 / len(names):
+                child[i] = rng.integers(n_levels[i])
+        return child
+
+    # Start from the base case plus random designs
+    genomes = [np.zeros(len(names), dtype=int)]
+    genomes += [rng.integers(n_levels) for _ in range(population - 1)]
+    score(genomes)
+    if not scores:
+        # Nothing to rank or breed from
+        print(f"No successful evaluations in the first generation ({simulated} simulated, none cached)")
+        return pd.DataFrame()
+
+    best, stale, generation = np.inf, 0, 0
+    while simulated < budget and stale < CONFIG['calibration_patience']:
+        generation += 1
+        ranked = sorted(scores, key=scores.get)
+        current = min(scores.values())
+        if current < best - 1e-9:
+            best, stale = current, 0
+        else:
+            stale += 1
+        print(f"Generation {generation}: best {current:.4f} ({design_key(variants_of(ranked[0]))}), {simulated}/{budget} simulations")
+
+        # Tournament selection over the best half, uniform crossover, per-gene mutation
+        parents = [np.array(g) for g in ranked[:max(2, population // 2)]]
+        children, attempts = [], 0
+        while len(children) < population and attempts < population * 20:
+            attempts += 1
+            a = min(rng.choice(len(parents), 2), key=lambda i: scores[tuple(parents[i])])
+            b = min(rng.choice(len(parents), 2), key=lambda i: scores[tuple(parents[i])])
+            mask = rng.random(len(names)) < 0.5
+            child = mutate(np.where(mask, parents[a], parents[b]))
+            if tuple(child) not in scores and not any((child == c).all() for c in children):
+                children.append(child)
+        if not children:
+            print("Search space exhausted")
+            break
+        score(children)
+
+    rows = []
+    for genome, value in sorted(scores.items(), key=lambda item: item[1]):
+        metrics = cache.entries[design_key(variants_of(genome))]
+        row = {'design': design_key(variants_of(genome)), 'objective': value}
+        row.update({name: (factors[name][level - 1] if level else 'base') for name, level in zip(names, genome)})
+        row.update({metric: metrics.get(metric) for metric in targets})
+        rows.append(row)
+    df = pd.DataFrame(rows)
+
+    results_dir = Path.cwd() / "parametric" / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    df.to_csv(results_dir / "calibration.csv", index=False)
+
+    with open(results_dir / "calibration.txt", 'w') as f:
+        f.write("Calibration Against Reference Mean\n\n")
+        f.write(f"Factors: {', '.join(names)}\n")
+        f.write(f"{len(scores)} designs scored, {simulated} simulated, {generation} generations\n")
+        f.write("Objective: RMS of (value - reference mean) / reference range\n\n")
+        for metric, (mean, spread) in targets.items():
+            f.write(f"  {metric}: mean {mean:.3f}, range {spread:.3f}\n")
+        f.write("\nBest designs:\n")
+        for row in rows[:10]:
+            values = ', '.join(f"{m} {row[m]:.3f}" for m in targets)
+            f.write(f"  {row['objective']:.4f}  {row['design']}: {values}\n")
+
+    if rows:
+        print(f"Best design: {rows[0]['design']} (objective {rows[0]['objective']:.4f})")
+    print(f"Calibration written to {results_dir / 'calibration.txt'}")
+    return df
@@ -0,0 +1,71 @@
+import hashlib
+
+# Reports never change the simulated physics
+IGNORED_PREFIXES = ('output:', 'outputcontrol:')
+
+# Blank fields that EnergyPlus fills with these defaults (object type -> field index -> value)
+FIELD_DEFAULTS = {
+    'building': {3: '0.04', 4: '0.4', 5: 'fullexterior'},
+    'shadowcalculation': {0: 'polygonclipping', 1: 'periodic', 2: '20'}
+}
+
+def normalize_field(value):
+    value = value.strip().lower()
+    try:
+        return repr(float(value))
+    except ValueError:
+        return value
+
+def parse_objects(idf_text):
+    lines = [line.split('!', 1)[0] for line in idf_text.splitlines()]
+    body = ' '.join(lines)
+
+    objects = []
+    for raw in body.split(';'):
+        fields = [normalize_field(f) for f in raw.split(',')]
+        if not fields or not fields[0]:
+            continue
+        objects.append(fields)
+    return objects
+
+def apply_semantics(fields):
+    object_type = fields[0]
+    values = fields[1:]
+
+    for idx, default in FIELD_DEFAULTS.get(object_type, {}).items():
+        while len(values) <= idx:
+            values.append('')
+        if values[idx] == '':
+            values[idx] = normalize_field(default)
+
+    # Update frequency is ignored when shading is recomputed every timestep
+    if object_type == 'shadowcalculation' and len(values) > 2 and values[1] == 'timestep':
+        values[2] = ''
+
+    while values and values[-1] == '':
+        values.pop()
+    return tuple([object_type] + values)
+
+def canonicalize_idf(idf_text):
+    objects = []
+    for fields in parse_objects(idf_text):
+        if fields[0].startswith(IGNORED_PREFIXES):
+            continue
+        objects.append(apply_semantics(fields))
+    # Object order does not matter to EnergyPlus
+    return sorted(objects)
+
+def canonical_hash(canonical):
+    text = '\n'.join(','.join(obj) for obj in canonical)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def canonical_diff(a, b):
+    a_set, b_set = set(a), set(b)
+    return sorted(a_set - b_set), sorted(b_set - a_set)
+
+def describe_modifications(variant_config):
+    parts = []
+    for object_type, mod in variant_config.get('modifications', {}).items():
+        for field, value in zip(mod['fields'], mod['values']):
+            parts.append(f"{object_type}[{field}]={value}")
+    return ', '.join(parts)
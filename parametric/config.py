@@ -45,9 +45,96 @@ STUDY_CASES = {
     # Zone air heat balance variants removed - object doesn't exist in Case 600
 }
 
+# Factors for global sensitivity: each level is the base case or one of these variants.
+# Warmup variants are left out because each sets max and min warmup days together.
+SOBOL_FACTORS = {
+    'timestep': ['1a', '1b', '1c', '1d'],
+    'shadow_freq': ['2a', '2b', '2c'],
+    'shadow_method': ['3a'],
+    'shadow_update': ['4a'],
+    'solar_dist': ['5a', '5b', '5c'],
+    'terrain': ['6a', '6b'],
+    'loads_tolerance': ['7a', '7b'],
+    'temp_tolerance': ['8a', '8b'],
+    'heat_balance': ['11a'],
+    'inside_conv': ['12a', '12b', '12c'],
+    'outside_conv': ['13a', '13b', '13c', '13d'],
+}
+
 CONFIG = {
     'base_case': 'idf_files/Case600_EnergyPlus-25-1-0.idf',  # Updated to use modified 25.1.0 version
     'weather_file': 'weather_files/BESTEST.epw',
     'energyplus_exe': '/Applications/EnergyPlus-25-1-0/energyplus',  # Updated to match version
-    'max_parallel': 4
+    'energyplus_idd': None,  # None = Energy+.idd next to energyplus_exe
+    'max_parallel': 4,
+    # Multi-fidelity screening: representative weeks as (month, start day), and the
+    # % change in short-period heating or cooling that promotes a variant to a full-year run
+    'screening_weeks': [(1, 8), (4, 15), (7, 15), (10, 14)],
+    'screening_tolerance': 0.5,
+    # Variant IDFs only request the variables these metrics need, at this frequency
+    'output_metrics': ['annual_heating_load', 'annual_sensible_cooling_load'],
+    'output_frequency': 'RunPeriod',
+    # Also reported Hourly by every full-year variant for `diff` and `cube` ([] = annual only)
+    'series_variables': ['Zone Ideal Loads Supply Air Total Heating Energy',
+                         'Zone Ideal Loads Supply Air Sensible Cooling Energy',
+                         'Zone Mean Air Temperature'],
+    # Compressed artifact store: finished runs keep only ESO/ERR ('gzip' or 'zstd'),
+    # the newest artifact_keep_runs runs are kept and anything older than max age is dropped.
+    # Off by default (None): harvesting removes parametric/outputs/<variant>, e.g. 'parametric/artifacts'
+    'artifact_store': None,
+    'artifact_compression': 'gzip',
+    'artifact_keep_runs': 5,
+    'artifact_max_age_days': 30,
+    # Append-only job journal used by `parametric_analysis.py resume`
+    'journal_file': 'parametric/journal.jsonl',
+    'max_retries': 1,
+    # Supervision: kill on these eplusout.err patterns; timeouts come from recorded runtimes
+    # (timeout_factor x slowest recent run), else timeout_default scaled by estimated cost
+    'kill_patterns': [r'\*\*\s+Fatal\s+\*\*'],
+    'runtime_history_file': 'parametric/runtime_history.json',
+    'timeout_default': 300,
+    'timeout_min': 60,
+    'timeout_factor': 3.0,
+    # 'subprocess' runs the energyplus CLI; 'api' drives pyenergyplus in worker processes
+    # ('parametric.fake_pyenergyplus' stands in for it on machines without EnergyPlus)
+    'backend': 'subprocess',
+    'pyenergyplus_module': 'pyenergyplus.api',
+    'scratch_dir': None,  # e.g. '/dev/shm' to run each simulation on tmpfs
+    'scratch_limit_mb': 2000,  # total scratch reserved by concurrent jobs
+    'scratch_job_mb': 150,  # first guess per job, refined from measured runs
+    'metrics_port': None,  # serve Prometheus metrics on localhost while a sweep runs
+    # Adaptive timestep study: refine through these steps/hour (divisors of 60) until annual
+    # loads change by less than convergence_tolerance percent
+    'convergence_timesteps': [1, 2, 4, 6, 10, 12, 15, 20, 30, 60],
+    'convergence_tolerance': 0.5,
+    # Calibration: genetic search over these SOBOL_FACTORS towards the reference mean,
+    # population designs per generation, stopping after budget simulations or patience
+    # generations without improvement; scored designs are cached across runs
+    'reference_file': 'results/OTHER_TOOLS.json',
+    'calibration_factors': ['inside_conv', 'outside_conv', 'terrain', 'timestep'],
+    'calibration_population': 8,
+    'calibration_budget': 48,
+    'calibration_patience': 4,
+    'calibration_cache': 'parametric/calibration_cache.json',
+    # Extracted metrics and parsed ESO columns, keyed by ESO size/mtime/SHA-256 and extractor version
+    'extraction_cache': 'results/extraction_cache',
+    'extract_workers': None,  # ESO parsing processes, None = one per CPU
+    # `parametric_analysis.py serve`: localhost variant daemon and its canonical-model result cache
+    'daemon_port': 8765,
+    'daemon_cache': 'parametric/daemon_cache.json',
+    # CPU budget: each of the max_parallel jobs gets threads_per_job cores (None = cores split
+    # evenly) and is pinned to them; `parametric_analysis.py cpu_layout` measures jobs x threads
+    # layouts and saves the fastest, used whenever --parallel/--threads are not given
+    'threads_per_job': None,
+    'pin_cpus': True,
+    'cpu_layout_file': 'results/cpu_layout.json',
+    'cpu_layout_rounds': 2,
+    # `parametric_analysis.py cube`: hourly variant x variable x hour array built from the
+    # .series.npy caches (all hourly variables, or those matching cube_variables)
+    'cube_dir': 'parametric/results/cube',
+    'cube_variables': None,
+    'cube_percentiles': [5, 25, 50, 75, 95],
+    # `parametric_analysis.py versions`: EnergyPlus executables to compare (None = energyplus_exe);
+    # the first one is the reference the others are measured against
+    'energyplus_versions': None
 }
\ No newline at end of file
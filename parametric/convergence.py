@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from .config import CONFIG
+
+OUTPUTS = ['annual_heating_load', 'annual_sensible_cooling_load']
+
+def timestep_config(steps):
+    return {'description': f'Timestep: {steps} steps/hour',
+            'modifications': {'TIMESTEP': {'fields': [0], 'values': [steps]}}}
+
+def observed_order(f, h):
+    # Solve (f1 - f2) / (f2 - f3) = (h1^p - h2^p) / (h2^p - h3^p) for p by bisection;
+    # h need not refine by a constant ratio. None if the sequence is not monotone.
+    d1, d2 = f[0] - f[1], f[1] - f[2]
+    if d2 == 0 or d1 / d2 <= 0:
+        return None
+    ratio = d1 / d2
+
+    def residual(p):
+        return (h[0] ** p - h[1] ** p) / (h[1] ** p - h[2] ** p) - ratio
+
+    low, high = 0.05, 6.0
+    if residual(low) * residual(high) > 0:
+        return None
+    for _ in range(60):
+        mid = (low + high) / 2
+        if residual(low) * residual(mid) <= 0:
+            high = mid
+        else:
+            low = mid
+    return (low + high) / 2
+
+def extrapolate(values, steps):
+    # Richardson extrapolation from the three finest runs; step size is 1/steps hours
+    f = np.asarray(values[-3:], dtype=float)
+    h = 1.0 / np.asarray(steps[-3:], dtype=float)
+    p = observed_order(f, h) if len(f) == 3 else None
+    if p is None:
+        # Oscillating or too few points: assume first order (implicit zone air update)
+        p = 1.0
+    r = h[-2] / h[-1]
+    return f[-1] + (f[-1] - f[-2]) / (r ** p - 1), p
+
+def last_change(metrics, steps):
+    # Largest % change in any output between the two finest successful runs
+    if len(steps) < 2:
+        return np.inf
+    fine, coarse = metrics[steps[-1]], metrics[steps[-2]]
+    changes = [abs(fine[o] - coarse[o]) / abs(coarse[o]) * 100 for o in OUTPUTS if coarse[o]]
+    return max(changes) if changes else np.inf
+
+def run_convergence(tolerance=None, ladder=None, evaluate=None):
+    if evaluate is None:
+        from .simulation import evaluate_variants as evaluate
+    tolerance = CONFIG['convergence_tolerance'] if tolerance is None else tolerance
+    ladder = sorted(ladder or CONFIG['convergence_timesteps'])
+
+    metrics = {}
+    steps = []
+
+    def run(batch):
+        print(f"Timesteps {', '.join(map(str, batch))} per hour...")
+        found = evaluate({f"ts_{n}": timestep_config(n) for n in batch})
+        for n in batch:
+            values = found.get(f"ts_{n}", {})
+            if all(output in values for output in OUTPUTS):
+                metrics[n] = values
+                steps.append(n)
+            else:
+                print(f"✗ {n} steps/hour failed, skipping")
+
+    # The first three go to the pool together, then refine one level at a time
+    run(ladder[:3])
+    for n in ladder[3:]:
+        if last_change(metrics, steps) < tolerance:
+            break
+        run([n])
+    converged = last_change(metrics, steps) < tolerance
+
+    if len(steps) < 2:
+        print("Not enough successful runs to estimate convergence")
+        return pd.DataFrame()
+
+    extrapolated = {}
+    for output in OUTPUTS:
+        extrapolated[output] = extrapolate([metrics[n][output] for n in steps], steps)
+
+    rows = []
+    for n in steps:
+        row = {'steps_per_hour': n}
+        within = True
+        for output in OUTPUTS:
+            value = metrics[n][output]
+            target = extrapolated[output][0]
+            error = abs(value - target) / abs(target) * 100 if target else 0.0
+            row[output] = value
+            row[f"{output}_error_pct"] = error
+            within = within and error <= tolerance
+        row['within_tolerance'] = within
+        rows.append(row)
+    df = pd.DataFrame(rows)
+
+    recommended = df[df['within_tolerance']]['steps_per_hour'].min() if df['within_tolerance'].any() else None
+
+    results_dir = Path.cwd() / "parametric" / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    df.to_csv(results_dir / "timestep_convergence.csv", index=False)
+
+    with open(results_dir / "timestep_convergence.txt", 'w') as f:
+        f.write("Timestep Convergence\n\n")
+        f.write(f"Tolerance {tolerance}%, ran {', '.join(map(str, steps))} steps/hour"
+                f"{' (converged, stopped early)' if converged and steps[-1] != ladder[-1] else ''}\n\n")
+        for output in OUTPUTS:
+            value, order = extrapolated[output]
+            f.write(f"{output}: extrapolated {value:.4f} (observed order {order:.2f})\n")
+        f.write("\n")
+        for row in rows:
+            errors = ', '.join(f"{row[f'{o}_error_pct']:.3f}%" for o in OUTPUTS)
+            f.write(f"  {row['steps_per_hour']:>3} steps/hour: {errors}{' ✓' if row['within_tolerance'] else ''}\n")
+        f.write("\n")
+        if recommended is not None:
+            f.write(f"Cheapest timestep within tolerance: {recommended} steps/hour\n")
+        else:
+            f.write("No timestep run is within tolerance of the extrapolated value\n")
+
+    if recommended is not None:
+        print(f"Cheapest timestep within {tolerance}% of the extrapolated loads: {recommended} steps/hour")
+    else:
+        print(f"No timestep within {tolerance}% of the extrapolated loads; extend convergence_timesteps")
+    print(f"Convergence study written to {results_dir / 'timestep_convergence.txt'}")
+    return df
@@ -0,0 +1,239 @@
+import os
+import sys
+import json
+import time
+import queue
+import threading
+import shutil
+import pandas as pd
+from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from .config import CONFIG
+
+_BUDGET = None
+_BUDGET_LOCK = threading.Lock()
+
+def available_cores():
+    # Cores this process may run on (cgroup/taskset limits included where the OS reports them)
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def parse_cpulist(text):
+    # '0-3,8-11' -> [0, 1, 2, 3, 8, 9, 10, 11]
+    cores = []
+    for part in text.strip().split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            cores.extend(range(int(first), int(last) + 1))
+        elif part:
+            cores.append(int(part))
+    return cores
+
+def numa_nodes(cores):
+    # Allowed cores grouped by NUMA node; one group where the topology is not exposed
+    allowed = set(cores)
+    nodes = []
+    for cpulist in sorted(Path('/sys/devices/system/node').glob('node*/cpulist')):
+        node = [c for c in parse_cpulist(cpulist.read_text()) if c in allowed]
+        if node:
+            nodes.append(node)
+    listed = {c for node in nodes for c in node}
+    rest = [c for c in cores if c not in listed]
+    return nodes + [rest] if rest else nodes
+
+def chunks(cores, size):
+    return [cores[i:i + size] for i in range(0, len(cores) - size + 1, size)]
+
+def plan_slots(jobs, threads, cores=None, nodes=None):
+    # Core set for each concurrent job: contiguous blocks of `threads` cores inside one NUMA
+    # node where they fit, so a job's threads share a cache and local memory. The cores each
+    # node has left over make up cross-node blocks, and only more jobs x threads than cores
+    # wraps round and shares blocks between jobs.
+    cores = cores or available_cores()
+    blocks, leftover = [], []
+    for node in nodes or numa_nodes(cores):
+        full = len(node) // threads * threads
+        blocks += chunks(node[:full], threads)
+        leftover += node[full:]
+    blocks = blocks + chunks(leftover, threads) or [list(cores)]
+    return [blocks[i % len(blocks)] for i in range(jobs)]
+
+def threads_per_job():
+    # Explicit setting, else the cores split evenly across max_parallel jobs
+    if CONFIG['threads_per_job']:
+        return CONFIG['threads_per_job']
+    return max(1, len(available_cores()) // CONFIG['max_parallel'])
+
+def thread_env(threads):
+    # EnergyPlus threads its OpenMP sections; without a limit each job starts one thread per core
+    env = dict(os.environ)
+    env['OMP_NUM_THREADS'] = str(threads)
+    return env
+
+def pins(cores):
+    # Linux only: elsewhere jobs run wherever the scheduler puts them
+    return bool(cores) and CONFIG['pin_cpus'] and hasattr(os, 'sched_setaffinity')
+
+def pin(pid, cores):
+    if pins(cores):
+        try:
+            os.sched_setaffinity(pid, cores)
+        except OSError:
+            pass
+
+# Sets the mask in the child and execs the real command, so it starts already pinned
+PIN_AND_EXEC = ("import os, sys\n"
+                "try:\n"
+                "    os.sched_setaffinity(0, [int(c) for c in sys.argv[1].split(',')])\n"
+                "except OSError:\n"
+                "    pass\n"
+                "os.execvp(sys.argv[2], sys.argv[2:])")
+
+def pinned_command(cmd, cores):
+    # cmd wrapped so the affinity is in place before exec; unchanged when not pinning
+    if not pins(cores):
+        return list(cmd)
+    if shutil.which(cmd[0]) is None:
+        # As Popen would: a missing executable fails here, not as an exit code from the wrapper
+        raise FileNotFoundError(f"No such executable: '{cmd[0]}'")
+    return [sys.executable, '-c', PIN_AND_EXEC, ','.join(str(c) for c in cores)] + list(cmd)
+
+class CoreBudget:
+    def __init__(self, jobs, threads, cores=None):
+        self.jobs = jobs
+        self.threads = threads
+        self.slots = queue.Queue()
+        for slot in plan_slots(jobs, threads, cores):
+            self.slots.put(slot)
+
+    @contextmanager
+    def slot(self):
+        # Blocks while all slots are taken, e.g. daemon queries on top of a sweep
+        cores = self.slots.get()
+        try:
+            yield cores
+        finally:
+            self.slots.put(cores)
+
+def core_budget():
+    # One budget per process so every worker thread draws from the same slots
+    global _BUDGET
+    layout = (CONFIG['max_parallel'], threads_per_job())
+    with _BUDGET_LOCK:
+        if _BUDGET is None or (_BUDGET.jobs, _BUDGET.threads) != layout:
+            _BUDGET = CoreBudget(*layout)
+        return _BUDGET
+
+def load_layout():
+    # Calibrated jobs x threads for this machine; ignored if the allowed cores changed
+    layout_file = Path(CONFIG['cpu_layout_file'])
+    if not layout_file.exists():
+        return None
+    try:
+        layout = json.loads(layout_file.read_text())
+    except ValueError:
+        return None
+    if layout.get('cores') != len(available_cores()):
+        return None
+    return layout
+
+def apply_layout():
+    layout = load_layout()
+    if layout:
+        CONFIG['max_parallel'] = layout['jobs']
+        CONFIG['threads_per_job'] = layout['threads']
+        print(f"CPU layout: {layout['jobs']} jobs x {layout['threads']} threads (calibrated, {layout['sims_per_hour']:.0f} sims/hour)")
+    return layout
+
+def candidate_layouts(cores):
+    # Every power-of-two thread count with the cores shared out, plus the uncoordinated
+    # default: max_parallel unpinned jobs each free to use every core
+    layouts = []
+    threads = 1
+    while threads <= cores:
+        layouts.append((max(1, cores // threads), threads, True))
+        threads *= 2
+    layouts.append((CONFIG['max_parallel'], cores, False))
+    return layouts
+
+def calibrate_layouts(layouts=None, rounds=None, run=None):
+    # Throughput of the base case under each jobs x threads layout on this machine
+    from . import simulation
+    from .api_backend import start_api_pool, stop_api_pool
+    run = run or simulation.run_single_simulation
+
+    base_idf_path = Path.cwd() / CONFIG['base_case']
+    cores = available_cores()
+    layouts = layouts or candidate_layouts(len(cores))
+    rounds = rounds or CONFIG['cpu_layout_rounds']
+    original = {k: CONFIG[k] for k in ('max_parallel', 'threads_per_job', 'pin_cpus')}
+    variant_file = simulation.write_variant_idf('layout', {'modifications': {}}, base_idf_path)
+    outputs_dir = Path.cwd() / "parametric" / "outputs"
+    rows = []
+
+    print(f"Calibrating {len(layouts)} CPU layouts on {len(cores)} cores ({rounds} rounds each)...")
+    try:
+        for jobs, threads, pinned in layouts:
+            CONFIG.update(max_parallel=jobs, threads_per_job=threads, pin_cpus=pinned)
+            if CONFIG['backend'] == 'api':
+                # One warm API worker per concurrent job of this layout
+                stop_api_pool()
+                start_api_pool(jobs)
+            count = jobs * rounds
+            start = time.time()
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(lambda i: run(f"layout_{jobs}x{threads}_{i}", {'modifications': {}},
+                                                      base_idf_path, variant_file=variant_file), range(count)))
+            seconds = time.time() - start
+            ok = [r for r in results if r['status'] == 'success']
+            rows.append({
+                'jobs': jobs,
+                'threads': threads,
+                'pinned': pinned,
+                'simulations': count,
+                'failed': count - len(ok),
+                'seconds': seconds,
+                'sims_per_hour': len(ok) / seconds * 3600 if seconds else 0.0,
+                'mean_runtime': sum(r['runtime'] for r in ok) / len(ok) if ok else None
+            })
+            print(f"  {jobs} jobs x {threads} threads{'' if pinned else ' (unpinned)'}: "
+                  f"{rows[-1]['sims_per_hour']:.0f} sims/hour ({count - len(ok)} failed)")
+            for run_dir in outputs_dir.glob(f"Case600_layout_{jobs}x{threads}_*"):
+                shutil.rmtree(run_dir, ignore_errors=True)
+    finally:
+        CONFIG.update(original)
+        if CONFIG['backend'] == 'api':
+            stop_api_pool()
+        shutil.rmtree(variant_file.parent, ignore_errors=True)
+
+    df = pd.DataFrame(rows)
+    results_dir = Path.cwd() / "parametric" / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    df.to_csv(results_dir / "cpu_layout.csv", index=False)
+
+    usable = df[(df['failed'] == 0) & df['pinned']]
+    if usable.empty:
+        print("No layout completed without failures; keeping the current settings")
+        return df
+    best = usable.loc[usable['sims_per_hour'].idxmax()]
+    layout = {'cores': len(cores), 'jobs': int(best['jobs']), 'threads': int(best['threads']),
+              'sims_per_hour': float(best['sims_per_hour'])}
+    layout_file = Path(CONFIG['cpu_layout_file'])
+    layout_file.parent.mkdir(parents=True, exist_ok=True)
+    layout_file.write_text(json.dumps(layout, indent=2))
+
+    with open(results_dir / "cpu_layout.txt", 'w') as f:
+        f.write("CPU LAYOUT CALIBRATION\n")
+        f.write("=" * 50 + "\n\n")
+        f.write(f"Cores: {len(cores)} on {len(numa_nodes(cores))} NUMA node(s), {rounds} rounds per layout\n\n")
+        f.write(f"{'Jobs':>5} {'Threads':>8} {'Pinned':>7} {'Sims/hour':>10} {'Mean runtime':>13}\n")
+        for row in rows:
+            runtime = f"{row['mean_runtime']:.1f}s" if row['mean_runtime'] is not None else '-'
+            f.write(f"{row['jobs']:>5} {row['threads']:>8} {str(row['pinned']):>7} {row['sims_per_hour']:>10.0f} {runtime:>13}\n")
+        f.write(f"\nBest: {layout['jobs']} jobs x {layout['threads']} threads, saved to {layout_file}\n")
+
+    print(f"Best: {layout['jobs']} jobs x {layout['threads']} threads ({layout['sims_per_hour']:.0f} sims/hour), saved to {layout_file}")
+    return df
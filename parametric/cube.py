@@ -0,0 +1,229 @@
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from .config import STUDY_CASES, CONFIG
+from .diff import load_series, source_file, find_variant_output, find_base_output
+from .utils import get_parameter_group_info
+
+HOURS = 8760
+# BESTEST runs a non-leap year
+MONTH_DAYS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+MONTH_START = np.cumsum([0] + MONTH_DAYS[:-1])
+HOUR_MONTH = np.repeat(np.arange(12), np.array(MONTH_DAYS) * 24)
+HOUR_OF_DAY = np.tile(np.arange(24), 365)
+# Month x hour-of-day cell of every hour of the year
+HOUR_CELL = HOUR_MONTH * 24 + HOUR_OF_DAY
+
+def is_energy(variable):
+    return 'energy' in variable.lower()
+
+def hour_of_year(keys):
+    # Time keys from diff.time_key; EnergyPlus stamps a step with the hour (1-24) it ends in
+    month = keys // 1000000
+    day = keys // 10000 % 100
+    hour = keys // 100 % 100
+    index = (MONTH_START[np.clip(month - 1, 0, 11)] + day - 1) * 24 + hour - 1
+    return np.where((month >= 1) & (month <= 12), index, -1)
+
+def hourly(values, hours, energy):
+    # Sub-hourly steps collapse to the hour: energy is summed (J -> kWh), rates are averaged
+    valid = (hours >= 0) & (hours < HOURS) & ~np.isnan(values)
+    totals = np.bincount(hours[valid], weights=values[valid], minlength=HOURS)[:HOURS]
+    counts = np.bincount(hours[valid], minlength=HOURS)[:HOURS]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        series = totals / 3.6e6 if energy else totals / counts
+    series[counts == 0] = np.nan
+    return series
+
+def cube_sources(variants=None):
+    sources = {}
+    base = find_base_output()
+    if base is not None:
+        sources['base'] = base
+    missing = []
+    for variant in variants or STUDY_CASES:
+        source = find_variant_output(variant)
+        if source is None:
+            missing.append(variant)
+        else:
+            sources[variant] = source
+    if missing:
+        print(f"  No output for {', '.join(missing)} (reused, screened or not run)")
+    return sources
+
+def signature(source):
+    path = source_file(source)
+    stat = path.stat()
+    return [str(path), stat.st_size, stat.st_mtime]
+
+def build_cube(variants=None, variables=None, cube_dir=None):
+    # variant x variable x hour array, memory-mapped from parametric/results/cube; rebuilt
+    # only when an output changed, each series read from its .series.npy cache
+    cube_dir = Path(cube_dir or CONFIG['cube_dir'])
+    variables = variables or CONFIG['cube_variables']
+    sources = cube_sources(variants)
+    if not sources:
+        return None, [], []
+
+    meta_file = cube_dir / 'cube.json'
+    cube_file = cube_dir / 'cube.npy'
+    signatures = {name: signature(source) for name, source in sources.items()}
+    if meta_file.exists() and cube_file.exists():
+        meta = json.loads(meta_file.read_text())
+        if meta['signatures'] == signatures and meta['filter'] == variables:
+            return np.load(cube_file, mmap_mode='r'), meta['variants'], meta['variables']
+
+    # First pass only reads column names; the series are streamed in one run at a time below
+    names = {}
+    coverage = {}
+    for name, source in sources.items():
+        names[name] = load_series(source)[0]
+        for column in names[name]:
+            if not variables or any(v.lower() in column.lower() for v in variables):
+                coverage[column] = coverage.get(column, 0) + 1
+    with_data = [name for name in sources if any(column in coverage for column in names[name])]
+    print(f"  Hourly series in {len(with_data)}/{len(sources)} runs")
+    if len(with_data) < 2:
+        print(f"No cube: fewer than two runs have hourly series ({', '.join(with_data) or 'none'}); "
+              f"rerun the variants with CONFIG['series_variables'] set")
+        return None, [], []
+    # A variable only one run reports has nothing to compare against
+    sparse = [column for column, count in coverage.items() if count < 2]
+    if sparse:
+        print(f"  Dropped {len(sparse)} variables reported by a single run: {', '.join(sparse)}")
+    columns = [column for column, count in coverage.items() if count >= 2]
+    if not columns:
+        print("No cube: no hourly variable is reported by more than one run")
+        return None, [], []
+
+    # Runs without hourly series get no row: they would only dilute the statistics
+    runs = {name: sources[name] for name in with_data}
+    cube_dir.mkdir(parents=True, exist_ok=True)
+    cube = np.lib.format.open_memmap(cube_file, mode='w+', dtype=np.float64, shape=(len(runs), len(columns), HOURS))
+    cube[:] = np.nan
+    for i, source in enumerate(runs.values()):
+        run_columns, keys, values = load_series(source)
+        hours = hour_of_year(keys)
+        position = {column: j for j, column in enumerate(run_columns)}
+        for j, column in enumerate(columns):
+            if column in position:
+                cube[i, j] = hourly(np.asarray(values[position[column]]), hours, is_energy(column))
+        del values
+    cube.flush()
+    del cube
+
+    meta_file.write_text(json.dumps({'variants': list(runs), 'variables': columns,
+                                     'signatures': signatures, 'filter': variables}, indent=1))
+    print(f"Built hourly cube: {len(runs)} runs x {len(columns)} variables x {HOURS} hours")
+    return np.load(cube_file, mmap_mode='r'), list(runs), columns
+
+def cell_means(rows):
+    # Month x hour-of-day mean of each row of [n, HOURS] -> [n, 12, 24]
+    n = len(rows)
+    valid = ~np.isnan(rows)
+    cells = (np.arange(n)[:, None] * 288 + HOUR_CELL[None, :])[valid]
+    sums = np.bincount(cells, weights=rows[valid], minlength=n * 288)
+    counts = np.bincount(cells, minlength=n * 288)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (sums / counts).reshape(n, 12, 24)
+
+def cube_statistics(cube, variants, variables, percentiles=None, points=101):
+    # One pass over the cube, one variable slice [variants, hours] at a time
+    percentiles = percentiles or CONFIG['cube_percentiles']
+    groups = get_parameter_group_info()
+    exceedance = np.linspace(0, 100, points)
+    positions = np.round(exceedance / 100 * (HOURS - 1)).astype(int)
+    base = variants.index('base') if 'base' in variants else None
+    ldc, heatmap, peaks, bands, impact = [], [], [], [], []
+
+    for j, variable in enumerate(variables):
+        rows = np.asarray(cube[:, j, :])
+        present = ~np.all(np.isnan(rows), axis=1)
+        if not present.any():
+            continue
+
+        # Load-duration curves: every variant sorted at once, descending with gaps last
+        ordered = -np.sort(-rows, axis=1)[:, positions]
+        for i, variant in enumerate(variants):
+            if present[i]:
+                ldc.extend({'variant': variant, 'variable': variable, 'exceedance_pct': e, 'value': v}
+                           for e, v in zip(exceedance, ordered[i]))
+
+        means = cell_means(rows)
+        for i, variant in enumerate(variants):
+            if present[i]:
+                month, hour = np.indices((12, 24)).reshape(2, -1)
+                heatmap.extend({'variant': variant, 'variable': variable, 'month': m + 1, 'hour': h + 1, 'mean': v}
+                               for m, h, v in zip(month, hour, means[i].ravel()))
+
+        # Coincident peaks: each variant's own peak and its value at the base case's peak hour
+        filled = np.where(np.isnan(rows), -np.inf, rows)
+        peak_hour = filled.argmax(axis=1)
+        peak = rows[np.arange(len(rows)), peak_hour]
+        base_hour = peak_hour[base] if base is not None and present[base] else None
+        for i, variant in enumerate(variants):
+            if not present[i]:
+                continue
+            row = {'variant': variant, 'variable': variable, 'peak': peak[i], 'peak_hour': int(peak_hour[i]) + 1,
+                   'peak_month': int(HOUR_MONTH[peak_hour[i]]) + 1, 'peak_hour_of_day': int(HOUR_OF_DAY[peak_hour[i]]) + 1}
+            if base_hour is not None:
+                row['at_base_peak'] = rows[i, base_hour]
+                row['peak_change_pct'] = (peak[i] - peak[base]) / peak[base] * 100 if peak[base] else np.nan
+                row['peak_shift_hours'] = int(peak_hour[i]) - int(base_hour)
+            peaks.append(row)
+
+        # Percentile bands across variants, hour by hour
+        with np.errstate(invalid='ignore'):
+            band = np.nanpercentile(rows[present], percentiles, axis=0)
+        bands.append(pd.DataFrame({'variable': variable, 'hour': np.arange(1, HOURS + 1),
+                                   **{f"p{p:g}": band[k] for k, p in enumerate(percentiles)}}))
+
+        # Where each parameter group matters: mean |variant - base| by month and hour of day
+        reference = rows[base] if base is not None and present[base] else np.nanmedian(rows[present], axis=0)
+        group_rows, group_ids = [], []
+        for group_id, group_info in groups.items():
+            members = [variants.index(v) for v in group_info['variants'] if v in variants and present[variants.index(v)]]
+            if members:
+                group_rows.append(np.nanmean(np.abs(rows[members] - reference), axis=0))
+                group_ids.append(group_id)
+        if group_rows:
+            deviation = cell_means(np.vstack(group_rows))
+            for g, group_id in enumerate(group_ids):
+                month, hour = np.indices((12, 24)).reshape(2, -1)
+                impact.extend({'group': group_id, 'variable': variable, 'month': m + 1, 'hour': h + 1,
+                               'mean_abs_deviation': v} for m, h, v in zip(month, hour, deviation[g].ravel()))
+
+    return {
+        'load_duration': pd.DataFrame(ldc),
+        'heatmap': pd.DataFrame(heatmap),
+        'peaks': pd.DataFrame(peaks),
+        'bands': pd.concat(bands, ignore_index=True) if bands else pd.DataFrame(),
+        'group_impact': pd.DataFrame(impact)
+    }
+
+def run_cube(variants=None, variables=None):
+    from .plotting import create_cube_plots
+
+    cube, names, columns = build_cube(variants, variables)
+    if cube is None:
+        return {}
+    stats = cube_statistics(cube, names, columns)
+
+    results_dir = Path.cwd() / "parametric" / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    for name, df in stats.items():
+        df.to_csv(results_dir / f"cube_{name}.csv", index=False)
+    create_cube_plots(stats, results_dir)
+
+    impact = stats['group_impact']
+    if not impact.empty:
+        print("Largest hourly deviation from base by parameter group:")
+        for (variable, group_id), rows in impact.groupby(['variable', 'group'], sort=False):
+            worst = rows.loc[rows['mean_abs_deviation'].idxmax()] if rows['mean_abs_deviation'].notna().any() else None
+            if worst is not None:
+                print(f"  {variable} / {group_id}: month {worst['month']}, hour {worst['hour']} "
+                      f"({worst['mean_abs_deviation']:.3g} mean abs)")
+    print(f"Cube statistics written to {results_dir}")
+    return stats
@@ -0,0 +1,172 @@
+import json
+import time
+import threading
+import urllib.request
+import urllib.error
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from .config import STUDY_CASES, CONFIG
+from .utils import merge_modifications
+from .canonical import canonicalize_idf, canonical_hash
+from .api_backend import start_api_pool
+from .extraction_cache import EXTRACTOR_VERSION
+from .versions import detect_version
+
+class VariantService:
+    # Keeps the IDD, the base model's text and the worker pool warm between queries. Each query
+    # still parses that text with eppy (eppy models cannot be copied more cheaply than parsed)
+    def __init__(self, base_idf_path=None, cache_file=None):
+        from . import simulation
+        self.simulation = simulation
+        self.base_idf_path = Path.cwd() / (base_idf_path or CONFIG['base_case'])
+        self.cache_file = Path(cache_file or CONFIG['daemon_cache'])
+        self.pool = ThreadPoolExecutor(max_workers=CONFIG['max_parallel'])
+        if CONFIG['backend'] == 'api':
+            start_api_pool()
+            self.engine = f"{CONFIG['pyenergyplus_module']}@{Path(CONFIG['energyplus_exe']).parent}"
+        else:
+            self.engine = detect_version(CONFIG['energyplus_exe']) or CONFIG['energyplus_exe']
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.started = time.time()
+        self.runs = 0
+        self.hits = 0
+        self.results = {}
+        if self.cache_file.exists():
+            try:
+                self.results = json.loads(self.cache_file.read_text())
+            except ValueError:
+                self.results = {}
+        # Parsing the base once loads the IDD and fills the in-memory base model
+        simulation.load_base_idf(self.base_idf_path)
+
+    def resolve(self, spec):
+        # Study case ids (merged in order) or a STUDY_CASES-style config
+        if 'variants' in spec:
+            unknown = [v for v in spec['variants'] if v not in STUDY_CASES]
+            if unknown:
+                raise ValueError(f"Unknown variants: {', '.join(unknown)}")
+            return merge_modifications(spec['variants'])
+        if 'modifications' not in spec:
+            raise ValueError("Spec needs 'variants' or 'modifications'")
+        return {'description': spec.get('description', 'Ad-hoc variant'), 'modifications': spec['modifications']}
+
+    def query(self, spec):
+        variant_config = self.resolve(spec)
+        start = time.time()
+        # Write the variant once to find its canonical model; identical models share a result
+        staging_id = f"query_{threading.get_ident()}_{time.time_ns()}"
+        variant_file = self.simulation.write_variant_idf(staging_id, variant_config, self.base_idf_path)
+        model_hash = canonical_hash(canonicalize_idf(variant_file.read_text()))
+        # Results are only shared between runs of the same engine and metric extraction
+        key = (f"{model_hash}:{Path(CONFIG['weather_file']).name}:{CONFIG['backend']}:{self.engine}"
+               f":extractor{EXTRACTOR_VERSION}")
+
+        with self.lock:
+            if key in self.results:
+                self.hits += 1
+                future = None
+            else:
+                future = self.in_flight.get(key)
+                if future is None:
+                    variant_id = f"query_{model_hash[:12]}"
+                    future = self.in_flight[key] = self.pool.submit(
+                        self.simulation.run_single_simulation, variant_id, variant_config,
+                        self.base_idf_path, variant_file=variant_file)
+        if future is None:
+            self.discard(variant_file)
+            return {'status': 'success', 'cached': True, 'hash': model_hash,
+                    'metrics': self.results[key], 'seconds': time.time() - start}
+
+        result = future.result()
+        self.discard(variant_file)
+        metrics = self.simulation.result_metrics(result) if result['status'] == 'success' else {}
+        with self.lock:
+            self.in_flight.pop(key, None)
+            if not metrics:
+                return {'status': 'failed', 'reason': result.get('reason', 'no metrics extracted'), 'hash': model_hash}
+            if key not in self.results:
+                self.runs += 1
+                self.results[key] = metrics
+                self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+                self.cache_file.write_text(json.dumps(self.results, indent=2))
+        return {'status': 'success', 'cached': False, 'hash': model_hash, 'metrics': self.results[key],
+                'runtime': result.get('runtime'), 'seconds': time.time() - start}
+
+    def discard(self, variant_file):
+        # Each query stages its own IDF; it is removed once the run (or cache hit) is done
+        try:
+            variant_file.unlink()
+            variant_file.parent.rmdir()
+        except OSError:
+            pass
+
+    def health(self):
+        with self.lock:
+            return {'status': 'ok', 'uptime': time.time() - self.started, 'cached_results': len(self.results),
+                    'simulations': self.runs, 'cache_hits': self.hits, 'in_flight': len(self.in_flight),
+                    'backend': CONFIG['backend'], 'engine': self.engine}
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.reply(200, self.service.health())
+        else:
+            self.reply(404, {'status': 'failed', 'reason': 'not found'})
+
+    def do_POST(self):
+        if self.path != '/variant':
+            self.reply(404, {'status': 'failed', 'reason': 'not found'})
+            return
+        try:
+            spec = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            result = self.service.query(spec)
+        except (ValueError, KeyError) as e:
+            self.reply(400, {'status': 'failed', 'reason': str(e)})
+            return
+        except Exception as e:
+            self.reply(500, {'status': 'failed', 'reason': f"{type(e).__name__}: {e}"})
+            return
+        self.reply(200 if result['status'] == 'success' else 500, result)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(port=None, host='127.0.0.1'):
+    port = CONFIG['daemon_port'] if port is None else port
+    DaemonHandler.service = VariantService()
+    server = ThreadingHTTPServer((host, port), DaemonHandler)
+    server.daemon_threads = True
+    print(f"Variant daemon on http://{host}:{server.server_address[1]} ({len(DaemonHandler.service.results)} cached results)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        DaemonHandler.service.pool.shutdown()
+    return True
+
+def query(spec, port=None, host='127.0.0.1', timeout=None):
+    port = CONFIG['daemon_port'] if port is None else port
+    request = urllib.request.Request(f"http://{host}:{port}/variant", data=json.dumps(spec).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read() or b'{}') or {'status': 'failed', 'reason': str(e)}
+    except urllib.error.URLError as e:
+        return {'status': 'failed', 'reason': f"no daemon on port {port} ({e.reason}); start it with 'parametric_analysis.py serve'"}
@@ -0,0 +1,234 @@
+import json
+import numpy as np
+import pandas as pd
+from array import array
+from pathlib import Path
+
+from .config import STUDY_CASES, CONFIG
+from .artifacts import open_eso, resolve_eso, base_run_dirs
+
+# ESO variables reported on the time-step/hourly record (record 2)
+SERIES_FREQUENCIES = ('!hourly', '!timestep', '!each call')
+
+def column_name(key, variable):
+    # Same naming as the cached CSV columns written by extract_results.py
+    return f"{key}_{variable}".replace(" ", "_").replace(":", "_")
+
+def time_key(month, day, hour, minute):
+    return ((month * 100 + day) * 100 + hour) * 100 + minute
+
+def parse_eso_series(eso_file):
+    columns = {}
+    with open_eso(eso_file) as f:
+        for line in f:
+            line = line.strip()
+            if line == "End of Data Dictionary":
+                break
+            parts = line.split(',')
+            if len(parts) >= 4 and parts[0].isdigit() and any(freq in line.lower() for freq in SERIES_FREQUENCIES):
+                columns[parts[0]] = column_name(parts[2], parts[3].split('[')[0].strip())
+
+        # array('d') keeps a sub-hourly year compact while it is being read
+        index = {record: i for i, record in enumerate(columns)}
+        values = [array('d') for _ in columns]
+        times = array('q')
+        keep = False
+        for line in f:
+            parts = line.strip().split(',')
+            if parts[0] == '2' and len(parts) >= 9:
+                # Design days are not part of the annual series
+                keep = not parts[8].strip().endswith('DesignDay')
+                if keep:
+                    times.append(time_key(int(parts[2]), int(parts[3]), int(parts[5]), int(float(parts[6]))))
+                    for column in values:
+                        column.append(np.nan)
+            elif parts[0] == '1' or (parts[0].isdigit() and int(parts[0]) <= 5):
+                keep = False
+            elif keep and parts[0] in index:
+                try:
+                    values[index[parts[0]]][-1] = float(parts[1])
+                except ValueError:
+                    continue
+
+    data = np.vstack([np.frombuffer(column, dtype=float) for column in values]) if values else np.empty((0, len(times)))
+    return list(columns.values()), np.frombuffer(times, dtype=np.int64), data
+
+def parse_csv_series(csv_file):
+    df = pd.read_csv(csv_file)
+    keys = time_key(df['Month'].to_numpy(), df['DayOfMonth'].to_numpy(), df['Hour'].to_numpy(),
+                    df['Minute'].fillna(0).to_numpy().astype(int))
+    columns = [c for c in df.columns if c not in ('Month', 'DayOfMonth', 'Hour', 'Minute')]
+    return columns, keys.astype(np.int64), df[columns].to_numpy(dtype=float).T
+
+def source_file(source):
+    source = Path(source)
+    if source.is_dir():
+        return resolve_eso(source / 'eplusout.eso')
+    return resolve_eso(source) if source.suffix != '.csv' else source
+
+def load_series(source):
+    # Returns (columns, time keys, values memmap of shape [variables, steps]), cached next to the source
+    path = source_file(source)
+    if not path.exists():
+        raise FileNotFoundError(f"No ESO or CSV at {source}")
+    stem = path.parent / path.name.split('.')[0]
+    meta_file = Path(f"{stem}.series.json")
+    values_file = Path(f"{stem}.series.npy")
+    times_file = Path(f"{stem}.series_time.npy")
+    stat = path.stat()
+    signature = {'source': path.name, 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    meta = None
+    if meta_file.exists():
+        with open(meta_file, 'r') as f:
+            meta = json.load(f)
+    if not meta or meta.get('signature') != signature or not values_file.exists():
+        columns, times, values = parse_csv_series(path) if path.suffix == '.csv' else parse_eso_series(path)
+        np.save(values_file, np.ascontiguousarray(values))
+        np.save(times_file, times)
+        meta = {'signature': signature, 'columns': columns}
+        with open(meta_file, 'w') as f:
+            json.dump(meta, f)
+
+    # Row-per-variable layout: each variable is one contiguous slice of the memmap
+    return meta['columns'], np.load(times_file), np.load(values_file, mmap_mode='r')
+
+def variable_diff(keys, a, b, top_n):
+    month = keys // 1000000
+    day = keys // 10000 % 100
+    hour = keys // 100 % 100
+    valid = ~(np.isnan(a) | np.isnan(b))
+    a, b, month, day, hour = a[valid], b[valid], month[valid], day[valid], hour[valid]
+    if not len(a):
+        return None
+    diff = b - a
+
+    mean_a = a.mean()
+    rmse = float(np.sqrt(np.mean(diff ** 2)))
+    stats = {
+        'steps': int(len(a)),
+        'mae': float(np.abs(diff).mean()),
+        'rmse': rmse,
+        'bias': float(diff.mean()),
+        'cv_rmse_pct': float(rmse / abs(mean_a) * 100) if mean_a else np.nan,
+        'max_abs': float(np.abs(diff).max()),
+        'total_a': float(a.sum()),
+        'total_b': float(b.sum()),
+        'total_change_pct': float(diff.sum() / a.sum() * 100) if a.sum() else np.nan
+    }
+
+    monthly_dev = np.bincount(month, weights=diff, minlength=13)[1:]
+    monthly_base = np.bincount(month, weights=a, minlength=13)[1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        monthly_pct = np.where(monthly_base != 0, monthly_dev / monthly_base * 100, np.nan)
+    # EnergyPlus hours run 1-24
+    hour_counts = np.bincount(hour, minlength=25)[1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hourly_dev = np.bincount(hour, weights=diff, minlength=25)[1:] / hour_counts
+
+    day_code = month * 100 + day
+    days, inverse = np.unique(day_code, return_inverse=True)
+    day_abs = np.bincount(inverse, weights=np.abs(diff))
+    day_signed = np.bincount(inverse, weights=diff)
+    top = np.argsort(day_abs)[::-1][:top_n]
+    top_days = [(int(days[i] // 100), int(days[i] % 100), float(day_abs[i]), float(day_signed[i])) for i in top]
+
+    return stats, monthly_dev, monthly_pct, hourly_dev, top_days
+
+def diff_runs(base, other, top_n=10, variables=None):
+    base_columns, base_keys, base_values = load_series(base)
+    columns, keys, values = load_series(other)
+
+    # Align on timestamps: runs may differ in timestep or run period
+    common, ia, ib = np.intersect1d(base_keys, keys, return_indices=True)
+    if not len(common):
+        raise ValueError(f"No common timestamps between {base} and {other}")
+
+    position = {column: i for i, column in enumerate(columns)}
+    results = {}
+    for i, column in enumerate(base_columns):
+        if column not in position or (variables and not any(v.lower() in column.lower() for v in variables)):
+            continue
+        # One variable at a time keeps memory bounded by a pair of series
+        outcome = variable_diff(common, np.asarray(base_values[i])[ia], np.asarray(values[position[column]])[ib], top_n)
+        if outcome:
+            results[column] = outcome
+    return results
+
+def find_variant_output(variant_id):
+    local = Path.cwd() / "parametric" / "outputs" / f"Case600_{variant_id}"
+    if resolve_eso(local / 'eplusout.eso').exists():
+        return local
+    # Otherwise the newest harvested run that holds the variant
+    store = Path(CONFIG['artifact_store'] or '')
+    if CONFIG['artifact_store'] and store.exists():
+        for run_dir in sorted((d for d in store.iterdir() if d.is_dir()), reverse=True):
+            if resolve_eso(run_dir / f"Case600_{variant_id}" / 'eplusout.eso').exists():
+                return run_dir / f"Case600_{variant_id}"
+    return None
+
+def find_base_output():
+    for candidate in base_candidates():
+        if source_file(candidate).exists():
+            return candidate
+    return None
+
+def base_candidates():
+    # Base runs first, then the CSVs extract_results.py wrote for the configured weather
+    weather = Path(CONFIG['weather_file']).stem
+    return [str(d) for d in base_run_dirs()] + [f"results/{weather}/Case600.csv", 'results/Case600.csv']
+
+def diff_sweep(variants=None, base=None, top_n=10, variables=None):
+    base = base or find_base_output()
+    if base is None:
+        print(f"No base run found ({', '.join(base_candidates())})")
+        return pd.DataFrame()
+
+    sources = {}
+    for variant in variants or STUDY_CASES:
+        # Variant ids or explicit run directories / ESO / CSV paths
+        path = Path(variant)
+        source = variant if path.exists() else find_variant_output(variant)
+        if source is None:
+            print(f"  {variant}: no output found")
+        else:
+            sources[path.name if path.exists() else variant] = source
+
+    stats_rows, monthly_rows, hourly_rows, top_rows = [], [], [], []
+    for name, source in sources.items():
+        try:
+            results = diff_runs(base, source, top_n, variables)
+        except ValueError as e:
+            print(f"  {name}: {e}")
+            continue
+        if not results:
+            print(f"  {name}: no hourly series in common with the base "
+                  f"(variants reported before series_variables existed: rerun them)")
+            continue
+
+        for variable, (stats, monthly_dev, monthly_pct, hourly_dev, top_days) in results.items():
+            stats_rows.append(dict(variant=name, variable=variable, **stats))
+            for m in range(12):
+                monthly_rows.append({'variant': name, 'variable': variable, 'month': m + 1,
+                                     'deviation': monthly_dev[m], 'deviation_pct': monthly_pct[m]})
+            for h in range(24):
+                hourly_rows.append({'variant': name, 'variable': variable, 'hour': h + 1, 'mean_deviation': hourly_dev[h]})
+            for rank, (month, day, abs_dev, dev) in enumerate(top_days, 1):
+                top_rows.append({'variant': name, 'variable': variable, 'rank': rank, 'month': month, 'day': day,
+                                 'abs_deviation': abs_dev, 'deviation': dev})
+
+        worst = max(results.items(), key=lambda item: abs(item[1][0]['total_change_pct']) if np.isfinite(item[1][0]['total_change_pct']) else 0)
+        stats, monthly_dev, _, _, top_days = worst[1]
+        month, day = top_days[0][:2] if top_days else (0, 0)
+        print(f"  {name}: {worst[0]} {stats['total_change_pct']:+.2f}%, CV(RMSE) {stats['cv_rmse_pct']:.1f}%, "
+              f"largest month {np.argmax(np.abs(monthly_dev)) + 1}, most divergent day {month}/{day}")
+
+    results_dir = Path.cwd() / "parametric" / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    df = pd.DataFrame(stats_rows)
+    df.to_csv(results_dir / "hourly_diff.csv", index=False)
+    pd.DataFrame(monthly_rows).to_csv(results_dir / "hourly_diff_monthly.csv", index=False)
+    pd.DataFrame(hourly_rows).to_csv(results_dir / "hourly_diff_hour_of_day.csv", index=False)
+    pd.DataFrame(top_rows).to_csv(results_dir / "hourly_diff_top_days.csv", index=False)
+    print(f"Hourly diffs against {base} written to {results_dir}")
+    return df
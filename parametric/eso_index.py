@@ -0,0 +1,206 @@
+import io
+import re
+import gzip
+import json
+import numpy as np
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .artifacts import resolve_eso, open_eso
+
+# Environment names EnergyPlus gives SizingPeriod:DesignDay runs, e.g. "DENVER ANN HTG 99.6% CONDNS DB"
+DESIGN_DAY_NAME = re.compile(r'\b(htg|clg|hum_n|condns|design)\b', re.IGNORECASE)
+
+# Engine version in the ESO header line
+VERSION_PATTERN = re.compile(r'Version (\d+\.\d+\.\d+)')
+
+# Bump when the sidecar layout changes
+INDEX_VERSION = 2
+
+# Time record that precedes a variable's values at each reporting frequency
+FREQUENCY_RECORDS = {'timestep': 2, 'hourly': 2, 'each call': 2, 'detailed': 2,
+                     'daily': 3, 'monthly': 4, 'runperiod': 5, 'annual': 6}
+TIME_RECORDS = (2, 3, 4, 5, 6)
+
+def open_binary(eso_path):
+    # gzip seeks by decompressing from the start, zstd only forwards; plain files seek directly
+    eso_path = Path(eso_path)
+    if eso_path.suffix == '.gz':
+        return gzip.open(eso_path, 'rb')
+    if eso_path.suffix == '.zst':
+        if zstandard is None:
+            raise ImportError("zstandard is required to read .zst artifacts")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(eso_path, 'rb'), closefd=True))
+    return open(eso_path, 'rb')
+
+def sidecar(eso_path):
+    return eso_path.with_name(eso_path.name + '.idx.npz')
+
+def eso_version(eso_file):
+    # The engine that actually wrote the file: "Program Version,EnergyPlus, Version 25.1.0-68a4a7c774, YMD=..."
+    try:
+        with open_eso(eso_file) as f:
+            match = VERSION_PATTERN.search(f.readline())
+    except (OSError, EOFError):
+        return None
+    return match.group(1) if match else None
+
+class EsoIndex:
+    def __init__(self, path, variables, env_names, env_bounds, design_day, blocks):
+        self.path = path
+        self.variables = variables  # id -> {'key', 'name', 'unit', 'record'}
+        self.env_names = env_names
+        self.env_bounds = env_bounds  # [environments, 2] byte range of each environment
+        self.design_day = design_day  # [environments] bool
+        self.blocks = blocks  # time record -> [n, 2] (environment, byte offset of the time line)
+
+    @classmethod
+    def build(cls, eso_file):
+        path = resolve_eso(eso_file)
+        variables = {}
+        env_names, env_starts, design_day = [], [], []
+        blocks = {record: [] for record in TIME_RECORDS}
+        end_of_data = None
+        offset = 0
+        in_dictionary = True
+
+        with open_binary(path) as f:
+            for raw in f:
+                if in_dictionary:
+                    line = raw.decode(errors='replace').strip()
+                    if line == "End of Data Dictionary":
+                        in_dictionary = False
+                    else:
+                        parts = line.split(',')
+                        if len(parts) >= 4 and parts[0].isdigit() and int(parts[0]) > 6 and '!' in line:
+                            name, _, unit = parts[3].split('!')[0].partition('[')
+                            frequency = line.split('!')[1].split('[')[0].strip().lower()
+                            variables[parts[0]] = {'key': parts[2], 'name': name.strip(), 'unit': unit.strip(' ]'),
+                                                   'record': FREQUENCY_RECORDS.get(frequency, 2)}
+                else:
+                    comma = raw.find(b',')
+                    code = raw[:comma] if comma > 0 else b''
+                    if code == b'1':
+                        env_names.append(raw.decode(errors='replace').split(',')[1].strip())
+                        env_starts.append(offset)
+                        design_day.append(None)
+                    elif code in (b'2', b'3', b'4', b'5', b'6') and env_starts:
+                        record = int(code)
+                        blocks[record].append((len(env_starts) - 1, offset))
+                        if record in (2, 3) and design_day[-1] is None:
+                            design_day[-1] = raw.rstrip().endswith(b'DesignDay')
+                    elif raw.startswith(b'End of Data'):
+                        end_of_data = offset
+                offset += len(raw)
+
+        ends = env_starts[1:] + [end_of_data if end_of_data is not None else offset]
+        # Without hourly or daily lines there is no day type: design days are told apart by name,
+        # since a weather-file run period can be a single day too
+        design_day = [flag if flag is not None else bool(DESIGN_DAY_NAME.search(name))
+                      for flag, name in zip(design_day, env_names)]
+        return cls(path, variables, env_names,
+                   np.array(list(zip(env_starts, ends)), dtype=np.int64).reshape(-1, 2),
+                   np.array(design_day, dtype=bool),
+                   {record: np.array(rows, dtype=np.int64).reshape(-1, 2) for record, rows in blocks.items()})
+
+    def save(self):
+        stat = self.path.stat()
+        meta = {'version': INDEX_VERSION, 'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+                'variables': self.variables, 'environments': self.env_names}
+        arrays = {f"blocks_{record}": rows for record, rows in self.blocks.items()}
+        np.savez_compressed(sidecar(self.path), meta=np.array(json.dumps(meta)), env_bounds=self.env_bounds,
+                 design_day=self.design_day, **arrays)
+
+    @classmethod
+    def load(cls, eso_file):
+        # One pass over the ESO builds the index; later calls read the .idx.npz sidecar
+        path = resolve_eso(eso_file)
+        index_file = sidecar(path)
+        if index_file.exists():
+            try:
+                with np.load(index_file) as data:
+                    meta = json.loads(str(data['meta']))
+                    stat = path.stat()
+                    if (meta['version'], meta['size'], meta['mtime']) == (INDEX_VERSION, stat.st_size, stat.st_mtime_ns):
+                        return cls(path, meta['variables'], meta['environments'], data['env_bounds'], data['design_day'],
+                                   {record: data[f"blocks_{record}"] for record in TIME_RECORDS})
+            except (OSError, ValueError, KeyError):
+                pass
+        index = cls.build(path)
+        try:
+            index.save()
+        except OSError:
+            pass  # read-only location: the index still serves this call
+        return index
+
+    def environments(self, which='run_period'):
+        # 'run_period': every weather-file run period (several for screening weeks); 'all' adds design days
+        if which == 'all':
+            return list(range(len(self.env_names)))
+        return [i for i, design in enumerate(self.design_day) if not design]
+
+    def find(self, name):
+        # Variable ids whose name matches, case-insensitively
+        return [vid for vid, var in self.variables.items() if var['name'].lower() == name.lower()]
+
+    def lines(self, environments):
+        # Decoded data lines of the given environments, read from their byte ranges only
+        with open_binary(self.path) as f:
+            for env in sorted(environments):
+                start, end = (int(b) for b in self.env_bounds[env])
+                f.seek(start)
+                position = start
+                while position < end:
+                    raw = f.readline()
+                    if not raw:
+                        break
+                    position += len(raw)
+                    yield raw.decode(errors='replace')
+
+    def block_values(self, record, environments, ids):
+        # Values of ids after each time line of one record type: seeks per block, so a monthly
+        # or run-period value is read without touching the timestep data around it
+        ids = set(ids)
+        values = {vid: [] for vid in ids}
+        rows = self.blocks[record]
+        rows = rows[np.isin(rows[:, 0], list(environments))]
+        with open_binary(self.path) as f:
+            for offset in rows[:, 1]:
+                f.seek(int(offset))
+                f.readline()
+                while True:
+                    raw = f.readline()
+                    comma = raw.find(b',')
+                    if comma <= 0:
+                        break
+                    code = raw[:comma].decode(errors='replace')
+                    # Next time line, or anything that is not a data line (truncated or foreign text)
+                    if not code.isdigit() or int(code) <= 6:
+                        break
+                    if code in ids:
+                        values[code].append(float(raw[comma + 1:].split(b',')[0]))
+        return values
+
+    def totals(self, ids, environments):
+        # Sum of each variable over the environments, read at its own reporting frequency
+        totals = {vid: 0.0 for vid in ids}
+        coarse = [vid for vid in ids if self.variables[vid]['record'] >= 4]
+        fine = [vid for vid in ids if self.variables[vid]['record'] < 4]
+        for record in sorted({self.variables[vid]['record'] for vid in coarse}):
+            for vid, values in self.block_values(record, environments, [v for v in coarse if self.variables[v]['record'] == record]).items():
+                totals[vid] += sum(values)
+        if fine:
+            # Hourly and daily data fill the environment anyway: stream its byte range once
+            fine = set(fine)
+            for line in self.lines(environments):
+                parts = line.split(',', 2)
+                if parts[0] in fine:
+                    try:
+                        totals[parts[0]] += float(parts[1])
+                    except ValueError:
+                        continue
+        return totals
@@ -1,120 +1,202 @@
+import os
+import time
+import numpy as np
 import pandas as pd
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 
-def extract_eso_metrics(eso_file_path):
-    if not Path(eso_file_path).exists():
+from .config import CONFIG
+from .artifacts import resolve_eso, base_run_dirs
+from .eso_index import EsoIndex
+from .extraction_cache import EXTRACTION_CACHE, EXTRACTOR_VERSION, file_hash
+
+# Output:Variable each metric is summed from (J -> MWh)
+METRIC_VARIABLES = {
+    'annual_heating_load': 'Zone Ideal Loads Supply Air Total Heating Energy',
+    'annual_sensible_cooling_load': 'Zone Ideal Loads Supply Air Sensible Cooling Energy'
+}
+
+def extract_eso_metrics(eso_file_path, environments='run_period'):
+    if not resolve_eso(eso_file_path).exists():
         return {}
     
     try:
-        with open(eso_file_path, 'r') as f:
-            lines = f.readlines()
-        
-        var_dict = {}
-        data_lines = []
-        in_data = False
+        # Design days are skipped and only the needed record blocks are read
+        index = EsoIndex.load(eso_file_path)
+        envs = index.environments(environments)
+        metrics = {}
+        for metric, variable in METRIC_VARIABLES.items():
+            ids = index.find(variable)
+            # A variable reported at several frequencies is summed once, at the coarsest
+            coarsest = max((index.variables[vid]['record'] for vid in ids), default=None)
+            ids = [vid for vid in ids if index.variables[vid]['record'] == coarsest]
+            metrics[metric] = sum(index.totals(ids, envs).values()) / 3.6e9
+        return metrics
         
-        for line in lines:
-            line = line.strip()
-            if line == "End of Data Dictionary":
-                in_data = True
-                continue
-            
-            if not in_data and line and line[0].isdigit() and ',' in line:
-                parts = line.split(',')
-                if len(parts) >= 4:
-                    var_id = parts[0]
-                    var_name = parts[3].split('[')[0].strip()
-                    var_dict[var_id] = var_name
-            elif in_data and line and ',' in line:
-                parts = line.split(',')
-                if len(parts) >= 2 and parts[0].isdigit():
-                    data_lines.append(parts)
+    except Exception:
+        return {}
+
+def cached_eso_metrics(eso_file_path):
+    # Unchanged ESOs (same size/mtime or content hash) are not parsed again
+    return dict(EXTRACTION_CACHE.fetch(eso_file_path, 'eso_metrics', EXTRACTOR_VERSION,
+                                       lambda: extract_eso_metrics(eso_file_path)))
+
+def parse_worker(eso_file_path):
+    # Runs in a pool process: returns a float array in METRIC_VARIABLES order, not a dict or frame,
+    # and the ESO's SHA-256 so the parent never reads the file itself
+    start = time.perf_counter()
+    digest = file_hash(resolve_eso(eso_file_path))
+    metrics = extract_eso_metrics(eso_file_path)
+    values = np.array([metrics[m] for m in METRIC_VARIABLES]) if metrics else None
+    return values, digest, time.perf_counter() - start
+
+def prefetch_metrics(eso_files, workers=None):
+    # Parse every uncached ESO across a process pool; results land in the extraction cache.
+    # Only ESOs whose size and mtime match the cache's path map count as cached here; the
+    # rest are hashed by the workers. Hit counts are left to the lookups that follow
+    pending = []
+    for eso_file in eso_files:
+        path = resolve_eso(eso_file)
+        if not path.exists():
+            continue
+        digest = EXTRACTION_CACHE.peek_digest(path)
+        if digest is None or EXTRACTION_CACHE.cached(digest, 'eso_metrics', EXTRACTOR_VERSION) is None:
+            pending.append(Path(eso_file))
+    if not pending:
+        return 0
+    workers = min(workers or CONFIG['extract_workers'] or os.cpu_count() or 1, len(pending))
+    
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map keeps input order, so the cache and any report are deterministic
+            parsed = list(pool.map(parse_worker, pending, chunksize=max(1, len(pending) // (workers * 4))))
+    else:
+        parsed = [parse_worker(f) for f in pending]
+    wall = time.perf_counter() - start
+    
+    sizes = []
+    for eso_file, (values, digest, _) in zip(pending, parsed):
+        sizes.append(resolve_eso(eso_file).stat().st_size / 1e6)
+        if values is not None:
+            EXTRACTION_CACHE.put(eso_file, 'eso_metrics', EXTRACTOR_VERSION,
+                                 dict(zip(METRIC_VARIABLES, values.tolist())), sha256=digest)
+    EXTRACTION_CACHE.flush()
+    
+    total_mb = sum(sizes)
+    rates = sorted(mb / seconds for mb, (_, _, seconds) in zip(sizes, parsed) if seconds > 0)
+    median_rate = rates[len(rates) // 2] if rates else 0
+    print(f"Parsed {len(pending)} ESOs ({total_mb:.1f} MB) on {workers} workers in {wall:.1f}s: "
+          f"{median_rate:.1f} MB/s per file, {total_mb / wall if wall else 0:.1f} MB/s overall")
+    return len(pending)
+
+def result_metrics(result):
+    # API-backend results carry their metrics; subprocess results are parsed from the ESO
+    if 'metrics' in result:
+        return dict(result['metrics'])
+    return cached_eso_metrics(Path(result['output_dir']) / 'eplusout.eso')
+
+def find_base_eso():
+    # run_simulation.py's run of the configured weather, else the legacy Case600_output
+    candidates = [resolve_eso(run_dir / 'eplusout.eso') for run_dir in base_run_dirs()]
+    return next((eso for eso in candidates if eso.exists()), candidates[0])
+
+def base_row(base_metrics):
+    return dict(base_metrics, **{
+        'variant': 'base',
+        'param_group': 'baseline',
+        'param_name': 'Base Case',
+        'description': 'Original Case 600 configuration',
+        'value': 'default',
+        'fidelity': 'full'
+    })
+
+def result_row(result, base_metrics, extracted, groups):
+    # One results.csv row for a simulation result; {} while it has nothing to report
+    from .config import STUDY_CASES
+    
+    metrics = {}
+    if result['status'] == 'success':
+        metrics = result_metrics(result)
+        if metrics:
+            metrics['fidelity'] = 'full'
+    elif result['status'] == 'screened' and base_metrics:
+        # Screened out as no-effect: carry the base annual values
+        metrics = dict(base_metrics, fidelity='screened')
+    elif result['status'] == 'reused' and result['reused_from'] in extracted:
+        # Canonically identical model: copy the source's values
+        source = extracted[result['reused_from']]
+        metrics = {key: source[key] for key in METRIC_VARIABLES}
+        metrics.update(fidelity='reused', reused_from=result['reused_from'], reuse_reason=result['reason'])
+    
+    if metrics:
+        variant = result['variant']
+        metrics['variant'] = variant
+        extracted[variant] = metrics
         
-        heating_energy = 0
-        cooling_energy = 0
+        # Find parameter info
+        variant_config = STUDY_CASES.get(variant, {})
+        metrics['description'] = variant_config.get('description', '')
         
-        for parts in data_lines:
-            var_id = parts[0]
-            try:
-                value = float(parts[1])
-            except:
-                continue
-                
-            var_name = var_dict.get(var_id, '').lower()
-            
-            if 'zone ideal loads supply air total heating energy' in var_name:
-                heating_energy += value
-            elif 'zone ideal loads supply air sensible cooling energy' in var_name:
-                cooling_energy += value
+        # Find which parameter group this variant belongs to
+        param_group = param_name = value = ''
+        for group_id, group_info in groups.items():
+            if variant in group_info['variants']:
+                param_group = group_id
+                param_name = group_info['name']
+                variant_idx = group_info['variants'].index(variant)
+                value = group_info['labels'][variant_idx]
+                break
         
-        return {
-            'annual_heating_load': heating_energy / 3.6e9,
-            'annual_sensible_cooling_load': cooling_energy / 3.6e9
-        }
+        metrics['param_group'] = param_group
+        metrics['param_name'] = param_name
+        metrics['value'] = value
+        if result.get('screening_note'):
+            metrics['screening_note'] = result['screening_note']
+    
+    return metrics
+
+def write_results_csv(rows):
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        # Reorder columns for better readability
+        column_order = ['variant', 'param_group', 'param_name', 'value', 'description', 
+                       'annual_heating_load', 'annual_sensible_cooling_load', 'fidelity',
+                       'reused_from', 'reuse_reason', 'screening_note']
+        df = df.reindex(columns=column_order)
         
-    except Exception:
-        return {}
+        csv_file = Path.cwd() / "parametric" / "results" / "results.csv"
+        df.to_csv(csv_file, index=False)
+    return df
 
 def extract_all_results(sim_results):
-    from .config import STUDY_CASES
     from .utils import get_parameter_group_info
     
     all_results = []
     groups = get_parameter_group_info()
     
-    base_eso = Path('Case600_output/eplusout.eso')
+    base_eso = find_base_eso()
+    base_metrics = {}
+    extracted = {}
+    eso_files = [base_eso] + [Path(r['output_dir']) / 'eplusout.eso' for r in sim_results
+                              if r['status'] == 'success' and 'metrics' not in r]
+    eso_files = [f for f in eso_files if resolve_eso(f).exists()]
+    parsed = prefetch_metrics(eso_files)
     if base_eso.exists():
-        base_metrics = extract_eso_metrics(base_eso)
+        base_metrics = cached_eso_metrics(base_eso)
         if base_metrics:
-            base_metrics.update({
-                'variant': 'base',
-                'param_group': 'baseline',
-                'param_name': 'Base Case',
-                'description': 'Original Case 600 configuration',
-                'value': 'default'
-            })
-            all_results.append(base_metrics)
+            all_results.append(base_row(base_metrics))
+            extracted['base'] = base_metrics
     
     for result in sim_results:
-        if result['status'] == 'success':
-            variant = result['variant']
-            eso_file = Path(result['output_dir']) / 'eplusout.eso'
-            
-            if eso_file.exists():
-                metrics = extract_eso_metrics(eso_file)
-                if metrics:
-                    metrics['variant'] = variant
-                    
-                    # Find parameter info
-                    variant_config = STUDY_CASES.get(variant, {})
-                    metrics['description'] = variant_config.get('description', '')
-                    
-                    # Find which parameter group this variant belongs to
-                    param_group = param_name = value = ''
-                    for group_id, group_info in groups.items():
-                        if variant in group_info['variants']:
-                            param_group = group_id
-                            param_name = group_info['name']
-                            variant_idx = group_info['variants'].index(variant)
-                            value = group_info['labels'][variant_idx]
-                            break
-                    
-                    metrics['param_group'] = param_group
-                    metrics['param_name'] = param_name
-                    metrics['value'] = value
-                    
-                    all_results.append(metrics)
+        metrics = result_row(result, base_metrics, extracted, groups)
+        if metrics:
+            all_results.append(metrics)
     
-    df = pd.DataFrame(all_results)
+    df = write_results_csv(all_results)
     if not df.empty:
-        # Reorder columns for better readability
-        column_order = ['variant', 'param_group', 'param_name', 'value', 'description', 
-                       'annual_heating_load', 'annual_sensible_cooling_load']
-        df = df[column_order]
-        
-        csv_file = Path.cwd() / "parametric" / "results" / "results.csv"
-        df.to_csv(csv_file, index=False)
-        print(f"Extracted {len(df)} results")
+        EXTRACTION_CACHE.prune()
+        print(f"Extracted {len(df)} results ({parsed} ESOs parsed, {len(eso_files) - parsed} from cache)")
         return df
     
-    return pd.DataFrame()
\ No newline at end of file
+    return pd.DataFrame()
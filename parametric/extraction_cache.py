@@ -0,0 +1,178 @@
+import os
+import json
+import atexit
+import threading
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from .config import CONFIG
+from .artifacts import resolve_eso
+from .utils import file_hash
+
+# Bump when extract_results.py or parametric/extraction.py change how cached values are computed
+EXTRACTOR_VERSION = 3
+
+def json_value(value):
+    # numpy scalars from pandas reductions
+    return value.item() if hasattr(value, 'item') else str(value)
+
+class ExtractionCache:
+    # Values are keyed by ESO content (SHA-256), so copied or moved outputs still hit. A path
+    # map of size/mtime -> SHA-256 spares re-hashing unchanged files. The index lives in memory
+    # and is written by flush(), once per extraction pass rather than on every lookup
+    def __init__(self, cache_dir=None):
+        self.dir = Path(cache_dir or CONFIG['extraction_cache'])
+        self.index_file = self.dir / 'index.json'
+        self.lock = threading.Lock()
+        self.files = None
+        self.entries = None
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        if self.entries is None:
+            self.files, self.entries = {}, {}
+            if self.index_file.exists():
+                try:
+                    index = json.loads(self.index_file.read_text())
+                    # Indexes from before content keys are dropped wholesale
+                    if 'files' in index:
+                        self.files, self.entries = index['files'], index['entries']
+                except ValueError:
+                    pass
+        return self.entries
+
+    def flush(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            self.dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_file.with_suffix('.tmp')
+            tmp.write_text(json.dumps({'files': self.files, 'entries': self.entries}, indent=1, default=json_value))
+            os.replace(tmp, self.index_file)
+            self.dirty = False
+
+    def peek_digest(self, path):
+        # Content hash from the path map while size and mtime are unchanged, else None
+        stat = path.stat()
+        with self.lock:
+            self.load()
+            known = self.files.get(str(path.resolve()))
+        if known and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime_ns:
+            return known['sha256']
+        return None
+
+    def record_digest(self, path, sha256):
+        stat = path.stat()
+        with self.lock:
+            self.load()
+            self.files[str(path.resolve())] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': sha256}
+            self.dirty = True
+        return sha256
+
+    def digest(self, path):
+        return self.peek_digest(path) or self.record_digest(path, file_hash(path))
+
+    def key(self, sha256, kind):
+        return f"{kind}|{sha256}"
+
+    def forget(self, eso_file, kind):
+        path = resolve_eso(eso_file)
+        if path.exists():
+            key = self.key(self.digest(path), kind)
+            with self.lock:
+                self.dirty |= self.load().pop(key, None) is not None
+
+    def cached(self, sha256, kind, version):
+        with self.lock:
+            entry = self.load().get(self.key(sha256, kind))
+        return entry['value'] if entry and entry['version'] == version else None
+
+    def get(self, eso_file, kind, version):
+        path = resolve_eso(eso_file)
+        if not path.exists():
+            return None
+        value = self.cached(self.digest(path), kind, version)
+        if value is not None:
+            self.hits += 1
+        return value
+
+    def put(self, eso_file, kind, version, value, sha256=None):
+        # Failed (empty) extractions are not stored; sha256 when the caller already hashed the file
+        path = resolve_eso(eso_file)
+        if not value or not path.exists():
+            return value
+        sha256 = self.record_digest(path, sha256) if sha256 else self.digest(path)
+        # Round-trip through JSON so hits and misses return the same types
+        value = json.loads(json.dumps(value, default=json_value))
+        with self.lock:
+            self.load()[self.key(sha256, kind)] = {'version': version, 'value': value}
+            self.dirty = True
+        return value
+
+    def fetch(self, eso_file, kind, version, extract):
+        # Cached value of extract() for this ESO
+        path = resolve_eso(eso_file)
+        if not path.exists():
+            return extract()
+        value = self.get(path, kind, version)
+        if value is not None:
+            return value
+        self.misses += 1
+        return self.put(path, kind, version, extract())
+
+    def fetch_frame(self, eso_file, kind, version, extract):
+        # Parsed numeric columns as one float64 .npy per ESO content, names and dtypes in the index
+        path = resolve_eso(eso_file)
+        if not path.exists():
+            return extract()
+        frame_file = self.dir / f"{kind}-{self.digest(path)[:16]}.npy"
+        parsed = {}
+
+        def parse():
+            frame = extract()
+            if frame is None:
+                return None
+            self.dir.mkdir(parents=True, exist_ok=True)
+            np.save(frame_file, frame.to_numpy(dtype=np.float64))
+            parsed['frame'] = frame
+            return {'frame': frame_file.name, 'columns': list(frame.columns),
+                    'dtypes': [str(dtype) for dtype in frame.dtypes]}
+
+        value = self.fetch(path, kind, version, parse)
+        if not value:
+            return None
+        if 'frame' in parsed:
+            return parsed['frame']
+        if frame_file.exists():
+            frame = pd.DataFrame(np.load(frame_file), columns=value['columns'])
+            return frame.astype(dict(zip(value['columns'], value['dtypes'])))
+        # Frame file was removed: forget the entry and parse again
+        self.forget(path, kind)
+        return self.fetch_frame(path, kind, version, extract)
+
+    def prune(self):
+        # Forget ESOs that were deleted or harvested elsewhere, and values no live ESO has
+        with self.lock:
+            entries = self.load()
+            stale = [name for name in self.files if not Path(name).exists()]
+            for name in stale:
+                self.files.pop(name)
+            live = {known['sha256'] for known in self.files.values()}
+            orphans = [key for key in entries if key.rsplit('|', 1)[1] not in live]
+            for key in orphans:
+                entries.pop(key)
+            frames = {entry['value']['frame'] for entry in entries.values()
+                      if isinstance(entry['value'], dict) and 'frame' in entry['value']}
+            for frame_file in list(self.dir.glob('*.npy')) + list(self.dir.glob('*.pkl')):
+                if frame_file.name not in frames:
+                    frame_file.unlink()
+            self.dirty |= bool(stale or orphans)
+        self.flush()
+        return len(stale)
+
+EXTRACTION_CACHE = ExtractionCache()
+# Anything not flushed by the end of an extraction pass is written on exit
+atexit.register(EXTRACTION_CACHE.flush)
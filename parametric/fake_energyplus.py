@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import os
+import sys
+import math
+import zlib
+from pathlib import Path
+
+# Stand-in for the energyplus executable with the CLI the sweeps use (--version, -w, -d, -j).
+# It writes a small ESO with a design day and a synthetic hourly ideal-loads year, so the
+# subprocess path and the version matrix can be exercised without EnergyPlus. The variable
+# names match parametric.extraction.METRIC_VARIABLES; this file imports nothing from the
+# package so install() can point an executable straight at it.
+
+HEATING = 'Zone Ideal Loads Supply Air Total Heating Energy'
+COOLING = 'Zone Ideal Loads Supply Air Sensible Cooling Energy'
+TEMPERATURE = 'Zone Mean Air Temperature'
+# Annual Case 600 loads (MWh) the base model lands on, inside the BESTEST reference ranges
+BASE_HEATING = 4.25
+BASE_COOLING = 6.0
+MONTH_DAYS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+def scale(idf_text, version):
+    # Deterministic per model (about +-5%) and per version (a few tenths of a percent)
+    model = (zlib.crc32(idf_text.encode()) % 21 - 10) / 200
+    engine = (zlib.crc32(version.encode()) % 7) / 1000
+    return 1 + model + engine
+
+def profile(days, weight):
+    # One value per hour of the year, normalised to sum to 1
+    values = [max(0.0, weight(day)) * (1 + 0.5 * math.sin(2 * math.pi * (hour - 9) / 24))
+              for day in range(days) for hour in range(24)]
+    total = sum(values)
+    return [v / total for v in values]
+
+def write_eso(eso_file, version, factor):
+    heating = [v * BASE_HEATING * factor * 3.6e9 for v in profile(365, lambda d: math.cos(2 * math.pi * d / 365))]
+    cooling = [v * BASE_COOLING * factor * 3.6e9 for v in profile(365, lambda d: -math.cos(2 * math.pi * d / 365))]
+    lines = [
+        f"Program Version,EnergyPlus, Version {version}-fake, YMD=2025.01.01 00:00",
+        "1,5,Environment Title[],Latitude[deg],Longitude[deg],Time Zone[],Elevation[m]",
+        "2,8,Day of Simulation[],Month[],Day of Month[],DST Indicator[1=yes 0=no],Hour[],StartMinute[],EndMinute[],DayType",
+        "5,1,Cumulative Days of Simulation[] ! When Run Period Report Variables Requested",
+        f"7,1,MAIN_ZONE IDEAL LOADS AIR,{HEATING} [J] !Hourly",
+        f"8,1,MAIN_ZONE IDEAL LOADS AIR,{HEATING} [J] !RunPeriod [Value,Min,Month,Day,Hour,Minute,Max,Month,Day,Hour,Minute]",
+        f"9,1,MAIN_ZONE IDEAL LOADS AIR,{COOLING} [J] !Hourly",
+        f"10,1,MAIN_ZONE,{TEMPERATURE} [C] !Hourly",
+        "End of Data Dictionary",
+        # Design day values must never reach the annual totals
+        "1,DENVER ANN HTG 99.6% CONDNS DB,39.83,-104.65,-7.00,1650.00",
+        "2,1,12,21,0,1,0.00,60.00,WinterDesignDay",
+        "7,9.9E+12",
+        "9,9.9E+12",
+        "10,20.0",
+        "1,RUN PERIOD 1,39.83,-104.65,-7.00,1650.00",
+    ]
+    hour = 0
+    for month, days in enumerate(MONTH_DAYS, 1):
+        for day in range(1, days + 1):
+            for h in range(1, 25):
+                lines.append(f"2,{hour // 24 + 1},{month},{day},0,{h},0.00,60.00,Sunday")
+                lines.append(f"7,{heating[hour]:.6g}")
+                lines.append(f"9,{cooling[hour]:.6g}")
+                lines.append(f"10,{20 + 7 * (cooling[hour] > 0) - 2 * (heating[hour] > 0):.2f}")
+                hour += 1
+    lines.append("5,365")
+    lines.append(f"8,{sum(heating):.6g},0.0,1,1,1,0,{max(heating):.6g},1,1,1,60")
+    lines += ["End of Data", f" Number of Records Written={len(lines)}"]
+    Path(eso_file).write_text('\n'.join(lines) + '\n')
+
+def main(args):
+    # Set by the install() wrapper
+    version = os.environ.get('FAKE_ENERGYPLUS_VERSION', '25.1.0')
+    if '--version' in args:
+        print(f"EnergyPlus, Version {version}-fake")
+        return 0
+    output_dir = Path(args[args.index('-d') + 1]) if '-d' in args else Path.cwd()
+    idf_file = Path(args[-1])
+    output_dir.mkdir(parents=True, exist_ok=True)
+    err = output_dir / 'eplusout.err'
+    if not idf_file.exists():
+        err.write_text(f"   ** Severe  ** Could not find input data file: {idf_file}\n"
+                       "   **  Fatal  ** EnergyPlus Terminated--Fatal Error Detected.\n")
+        return 1
+    write_eso(output_dir / 'eplusout.eso', version, scale(idf_file.read_text(), version))
+    err.write_text(f"Program Version,EnergyPlus, Version {version}-fake\n"
+                   "   ************* EnergyPlus Completed Successfully-- 0 Warning; 0 Severe Errors\n")
+    print("EnergyPlus Completed Successfully.")
+    return 0
+
+def install(directory, version):
+    # <directory>/EnergyPlus-24-2-0/energyplus running this script; returns the executable path
+    install_dir = Path(directory) / f"EnergyPlus-{version.replace('.', '-')}"
+    install_dir.mkdir(parents=True, exist_ok=True)
+    exe = install_dir / 'energyplus'
+    exe.write_text(f"#!/bin/sh\nFAKE_ENERGYPLUS_VERSION={version} exec \"{sys.executable}\" \"{Path(__file__).resolve()}\" \"$@\"\n")
+    exe.chmod(0o755)
+    return exe
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,90 @@
+import math
+from pathlib import Path
+
+from .canonical import parse_objects
+
+# Stand-in for pyenergyplus.api with the calls api_backend uses. It produces a smooth
+# synthetic ideal-loads year so the API path can be exercised without EnergyPlus.
+
+WARMUP_DAYS = 6
+UA = 45.0  # W/K
+
+class FakeState:
+    def __init__(self):
+        self.requests = []
+        self.callback = None
+        self.warmup = False
+        self.ready = False
+        self.stopped = False
+        self.values = {}
+
+class StateManager:
+    def new_state(self):
+        return FakeState()
+
+    def delete_state(self, state):
+        state.callback = None
+
+class Runtime:
+    def set_console_output_status(self, state, print_output):
+        pass
+
+    def callback_end_system_timestep_after_hvac_reporting(self, state, callback):
+        state.callback = callback
+
+    def stop_simulation(self, state):
+        state.stopped = True
+
+    def run_energyplus(self, state, args):
+        idf_file = Path(args[-1])
+        if not idf_file.exists():
+            return 1
+
+        timesteps = 4
+        for fields in parse_objects(idf_file.read_text()):
+            if fields[0] == 'timestep' and len(fields) > 1:
+                timesteps = int(float(fields[1]))
+        dt = 3600 / timesteps
+
+        state.ready = True
+        days = [(True, d) for d in range(WARMUP_DAYS)] + [(False, d) for d in range(365)]
+        for warmup, day in days:
+            state.warmup = warmup
+            for step in range(24 * timesteps):
+                hour = step / timesteps
+                outdoor = 10 - 12 * math.cos(2 * math.pi * day / 365) + 6 * math.sin(2 * math.pi * (hour - 9) / 24)
+                state.values['heating energy'] = max(0.0, 20 - outdoor) * UA * dt
+                state.values['cooling energy'] = max(0.0, outdoor + 16 - 27) * UA * dt
+                if state.callback:
+                    state.callback(state)
+                if state.stopped:
+                    return 1
+        return 0
+
+class DataExchange:
+    def request_variable(self, state, variable_name, variable_key):
+        state.requests.append((variable_name.lower(), variable_key.lower()))
+
+    def api_data_fully_ready(self, state):
+        return state.ready
+
+    def warmup_flag(self, state):
+        return state.warmup
+
+    def get_variable_handle(self, state, variable_name, variable_key):
+        request = (variable_name.lower(), variable_key.lower())
+        return state.requests.index(request) if request in state.requests else -1
+
+    def get_variable_value(self, state, handle):
+        variable_name = state.requests[handle][0]
+        if 'heating energy' in variable_name:
+            return state.values['heating energy']
+        if 'cooling energy' in variable_name:
+            return state.values['cooling energy']
+        return 0.0
+
+class EnergyPlusAPI:
+    def __init__(self):
+        self.state_manager = StateManager()
+        self.runtime = Runtime()
+        self.exchange = DataExchange()
@@ -0,0 +1,64 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+
+from .config import STUDY_CASES, CONFIG
+
+# Job states that never need to run again on resume
+DONE_STATUSES = ('success', 'reused', 'screened')
+
+class Journal:
+    def __init__(self, path=None):
+        self.path = Path(path or CONFIG['journal_file'])
+        self.lock = threading.Lock()
+
+    def record(self, event, **fields):
+        entry = dict(fields, event=event, time=time.time())
+        line = json.dumps(entry, default=str)
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def new_sweep(self, run_id):
+        self.record('sweep', run_id=run_id)
+
+    def start(self, variant, attempt):
+        self.record('start', variant=variant, attempt=attempt)
+
+    def complete(self, result):
+        self.record('complete', **result)
+
+    def replay(self):
+        # State of the most recent sweep: run id and latest entry per variant
+        run_id = None
+        jobs = {}
+        if not self.path.exists():
+            return run_id, jobs
+
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash
+                if entry['event'] == 'sweep':
+                    run_id = entry['run_id']
+                    jobs = {}
+                elif entry['event'] == 'start':
+                    jobs[entry['variant']] = {'variant': entry['variant'], 'status': 'in_flight'}
+                elif entry['event'] == 'complete':
+                    jobs[entry['variant']] = {k: v for k, v in entry.items() if k not in ('event', 'time')}
+
+        return run_id, jobs
+
+    def pending_run(self):
+        # Run id of the latest sweep while `resume` still has variants to run in it, else None
+        run_id, jobs = self.replay()
+        if run_id and any(jobs.get(v, {}).get('status') not in DONE_STATUSES for v in STUDY_CASES):
+            return run_id
+        return None
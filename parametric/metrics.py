@@ -0,0 +1,136 @@
+import time
+import threading
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from .config import CONFIG
+from .scratch import dir_size_mb
+
+# Upper bounds (seconds) of the per-job runtime histogram
+RUNTIME_BUCKETS = (5, 10, 30, 60, 120, 300, 600, 1800)
+
+class SweepMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.queued = 0
+            self.running = 0
+            self.completed = 0
+            self.failed = 0
+            self.retries = 0
+            self.cache_hits = 0
+            self.cache_lookups = 0
+            self.buckets = [0] * len(RUNTIME_BUCKETS)
+            self.runtime_count = 0
+            self.runtime_sum = 0.0
+
+    def cached(self, hits, lookups):
+        # Hits are jobs answered without simulating (resumed or reused results)
+        with self.lock:
+            self.cache_hits += hits
+            self.cache_lookups += lookups
+
+    def enqueue(self, n):
+        with self.lock:
+            self.queued += n
+
+    def start(self, attempt):
+        with self.lock:
+            if attempt == 1:
+                self.queued -= 1
+            else:
+                self.retries += 1
+            self.running += 1
+
+    def finish(self, result):
+        with self.lock:
+            self.running -= 1
+            runtime = result.get('runtime')
+            if runtime is not None:
+                self.runtime_count += 1
+                self.runtime_sum += runtime
+                for i, bound in enumerate(RUNTIME_BUCKETS):
+                    if runtime <= bound:
+                        self.buckets[i] += 1
+
+    def done(self, result):
+        with self.lock:
+            if result['status'] == 'success':
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def render(self):
+        outputs = Path.cwd() / "parametric" / "outputs"
+        try:
+            disk_bytes = dir_size_mb(outputs) * 1e6 if outputs.exists() else 0
+        except FileNotFoundError:
+            disk_bytes = 0  # a run was harvested mid-walk; the next scrape catches up
+        with self.lock:
+            hours = (time.time() - self.started) / 3600
+            rate = self.completed / hours if hours else 0
+            hit_ratio = self.cache_hits / self.cache_lookups if self.cache_lookups else 0
+            lines = [
+                '# HELP parametric_jobs_queued Simulations waiting for a worker',
+                '# TYPE parametric_jobs_queued gauge',
+                f'parametric_jobs_queued {self.queued}',
+                '# HELP parametric_jobs_running Simulations in progress',
+                '# TYPE parametric_jobs_running gauge',
+                f'parametric_jobs_running {self.running}',
+                '# HELP parametric_jobs_completed_total Simulations finished successfully',
+                '# TYPE parametric_jobs_completed_total counter',
+                f'parametric_jobs_completed_total {self.completed}',
+                '# HELP parametric_jobs_failed_total Simulations that failed after all retries',
+                '# TYPE parametric_jobs_failed_total counter',
+                f'parametric_jobs_failed_total {self.failed}',
+                '# HELP parametric_job_retries_total Retry attempts',
+                '# TYPE parametric_job_retries_total counter',
+                f'parametric_job_retries_total {self.retries}',
+                '# HELP parametric_job_runtime_seconds Runtime of each simulation attempt',
+                '# TYPE parametric_job_runtime_seconds histogram',
+            ]
+            lines += [f'parametric_job_runtime_seconds_bucket{{le="{bound}"}} {count}'
+                      for bound, count in zip(RUNTIME_BUCKETS, self.buckets)]
+            lines += [
+                f'parametric_job_runtime_seconds_bucket{{le="+Inf"}} {self.runtime_count}',
+                f'parametric_job_runtime_seconds_sum {self.runtime_sum:.3f}',
+                f'parametric_job_runtime_seconds_count {self.runtime_count}',
+                '# HELP parametric_simulations_per_hour Successful simulations per hour since the sweep started',
+                '# TYPE parametric_simulations_per_hour gauge',
+                f'parametric_simulations_per_hour {rate:.3f}',
+                '# HELP parametric_cache_hit_ratio Share of jobs answered by resumed or reused results',
+                '# TYPE parametric_cache_hit_ratio gauge',
+                f'parametric_cache_hit_ratio {hit_ratio:.4f}',
+                '# HELP parametric_outputs_disk_bytes Disk used by parametric/outputs',
+                '# TYPE parametric_outputs_disk_bytes gauge',
+                f'parametric_outputs_disk_bytes {disk_bytes:.0f}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+METRICS = SweepMetrics()
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = METRICS.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes would drown the sweep output
+
+def start_metrics_server(port=None, host='127.0.0.1'):
+    server = ThreadingHTTPServer((host, CONFIG['metrics_port'] if port is None else port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -0,0 +1,118 @@
+import queue
+import threading
+import pandas as pd
+import matplotlib.pyplot as plt
+from pathlib import Path
+
+from .config import STUDY_CASES
+from .simulation import run_simulations
+from .extraction import find_base_eso, base_row, result_row, write_results_csv, cached_eso_metrics
+from .extraction_cache import EXTRACTION_CACHE
+from .analysis import write_results_text
+from .plotting import create_academic_plots
+from .utils import get_parameter_group_info
+
+class Pipeline:
+    # Extracts each result as it arrives and analyses each parameter group once it is complete.
+    # Work runs on one consumer thread so simulations never wait for parsing or plotting.
+    def __init__(self):
+        # Figures are drawn off the main thread: file-only backend
+        plt.switch_backend('Agg')
+        self.plots_dir = Path.cwd() / "parametric" / "results"
+        self.plots_dir.mkdir(parents=True, exist_ok=True)
+        self.groups = get_parameter_group_info()
+        self.rows = {}
+        self.extracted = {}
+        self.waiting = []  # reused results whose source has not been extracted yet
+        self.finished = set()
+        self.analysed = set()
+
+        base_eso = find_base_eso()
+        self.base_metrics = cached_eso_metrics(base_eso) if base_eso.exists() else {}
+        if self.base_metrics:
+            self.rows['base'] = base_row(self.base_metrics)
+            self.extracted['base'] = self.base_metrics
+
+        self.queue = queue.Queue()
+        self.worker = threading.Thread(target=self.consume, daemon=True)
+        self.worker.start()
+
+    def submit(self, result):
+        # Called from the sweep loop; returns immediately
+        self.queue.put(result)
+
+    def consume(self):
+        while True:
+            result = self.queue.get()
+            if result is None:
+                break
+            try:
+                self.process(result)
+            except Exception as e:
+                print(f"Pipeline: {result['variant']} not processed ({type(e).__name__}: {e})")
+
+    def process(self, result):
+        self.finished.add(result['variant'])
+        pending = [result] + self.waiting
+        self.waiting = []
+        added = False
+        # Reused variants wait for their source; repeat until no chain makes progress
+        while pending:
+            progress = False
+            for r in pending:
+                row = result_row(r, self.base_metrics, self.extracted, self.groups)
+                if row:
+                    self.rows[r['variant']] = row
+                    added = progress = True
+                elif r['status'] == 'reused' and r['reused_from'] not in self.extracted:
+                    self.waiting.append(r)
+            if not progress or not self.waiting:
+                break
+            pending, self.waiting = self.waiting, []
+
+        if added:
+            self.frame()
+            self.analyse_complete_groups()
+
+    def frame(self):
+        # Base first, then STUDY_CASES order, as extract_all_results writes it
+        order = ['base'] + list(STUDY_CASES)
+        rows = [self.rows[v] for v in order if v in self.rows]
+        return write_results_csv(rows)
+
+    def analyse_complete_groups(self, final=False):
+        waiting = {r['variant'] for r in self.waiting}
+        df = None
+        for group_id, group_info in self.groups.items():
+            variants = [v for v in group_info['variants'] if v in STUDY_CASES]
+            if group_id in self.analysed or not variants:
+                continue
+            complete = all(v in self.finished and v not in waiting for v in variants)
+            if not (complete or final) or not any(v in self.rows for v in variants):
+                continue
+            if df is None:
+                df = self.frame()
+            create_academic_plots(df, self.plots_dir, only=[group_id])
+            self.analysed.add(group_id)
+            print(f"◆ {group_info['name']} analysed")
+        if df is not None and 'base' in self.rows:
+            write_results_text(df, self.plots_dir)
+
+    def finish(self):
+        self.queue.put(None)
+        self.worker.join()
+        # Groups cut short by failures or an interrupted sweep are analysed with what exists
+        self.analyse_complete_groups(final=True)
+        df = self.frame()
+        EXTRACTION_CACHE.prune()
+        if not df.empty:
+            print(f"Pipeline extracted {len(df)} results")
+        return df if not df.empty else pd.DataFrame()
+
+def run_pipelined(screening=False, resume=False):
+    pipeline = Pipeline()
+    try:
+        run_simulations(screening, resume, on_result=pipeline.submit)
+    finally:
+        df = pipeline.finish()
+    return df
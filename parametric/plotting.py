@@ -2,7 +2,7 @@ import matplotlib.pyplot as plt
 
 from .utils import get_parameter_group_info, get_base_parameter_value
 
-def create_academic_plots(df, plots_dir):
+def create_academic_plots(df, plots_dir, only=None):
     import matplotlib
     matplotlib.rcParams.update({
         'font.family': 'serif',
@@ -25,6 +25,8 @@ def create_academic_plots(df, plots_dir):
     base_cooling = df[df['variant'] == 'base']['annual_sensible_cooling_load'].iloc[0] if 'base' in df['variant'].values else None
     
     for group_id, group_info in groups.items():
+        if only is not None and group_id not in only:
+            continue
         group_variants = [v for v in group_info['variants'] if v in df['variant'].values]
         if not group_variants:
             continue
@@ -127,4 +129,81 @@ def create_academic_plots(df, plots_dir):
         plt.savefig(save_path, dpi=300, bbox_inches='tight', facecolor='white')
         plt.close()
         
-        print(f"  Created: {filename}")
\ No newline at end of file
+        print(f"  Created: {filename}")
+
+def create_cube_plots(stats, plots_dir):
+    # Load-duration curves, percentile bands and per-group month x hour deviation maps
+    import numpy as np
+    
+    groups = get_parameter_group_info()
+    group_of = {v: group_id for group_id, info in groups.items() for v in info['variants']}
+    colors = {group_id: plt.cm.tab10(i % 10) for i, group_id in enumerate(groups)}
+    ldc, bands, impact = stats['load_duration'], stats['bands'], stats['group_impact']
+    
+    for variable in ldc['variable'].unique() if not ldc.empty else []:
+        safe_name = variable.replace('/', '_').replace(' ', '_')
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+        fig.patch.set_facecolor('white')
+        
+        curves = ldc[ldc['variable'] == variable]
+        labelled = set()
+        for variant, curve in curves.groupby('variant', sort=False):
+            if variant == 'base':
+                ax1.plot(curve['exceedance_pct'], curve['value'], color='black', linewidth=2.0, label='Baseline', zorder=3)
+                continue
+            group_id = group_of.get(variant)
+            label = groups[group_id]['name'] if group_id and group_id not in labelled else None
+            labelled.add(group_id)
+            ax1.plot(curve['exceedance_pct'], curve['value'], color=colors.get(group_id, 'grey'), alpha=0.7, linewidth=1.0, label=label)
+        ax1.set_title('(a) Load-Duration Curves', fontweight='bold', loc='left', pad=15)
+        ax1.set_xlabel('Hours Exceeded (%)', fontweight='bold')
+        ax1.set_ylabel(variable, fontweight='bold')
+        ax1.legend(fontsize=7, frameon=False)
+        
+        band = bands[bands['variable'] == variable]
+        columns = [c for c in band.columns if c.startswith('p')]
+        # Daily means keep a full year readable
+        daily = band[columns].to_numpy().reshape(365, 24, len(columns)).mean(axis=1)
+        days = np.arange(1, 366)
+        if len(columns) >= 2:
+            ax2.fill_between(days, daily[:, 0], daily[:, -1], color='#5D6D7E', alpha=0.25, label=f"{columns[0]}-{columns[-1]}")
+        if len(columns) >= 4:
+            ax2.fill_between(days, daily[:, 1], daily[:, -2], color='#5D6D7E', alpha=0.45, label=f"{columns[1]}-{columns[-2]}")
+        ax2.plot(days, daily[:, len(columns) // 2], color='#34495E', linewidth=1.2, label=columns[len(columns) // 2])
+        ax2.set_title('(b) Spread Across Variants (daily mean)', fontweight='bold', loc='left', pad=15)
+        ax2.set_xlabel('Day of Year', fontweight='bold')
+        ax2.legend(fontsize=8, frameon=False)
+        
+        for ax in [ax1, ax2]:
+            ax.grid(True, alpha=0.3, linestyle='-', linewidth=0.5)
+            ax.spines['top'].set_visible(False)
+            ax.spines['right'].set_visible(False)
+        
+        plt.tight_layout()
+        filename = f"Cube_{safe_name}_duration.png"
+        plt.savefig(plots_dir / filename, dpi=300, bbox_inches='tight', facecolor='white')
+        plt.close()
+        print(f"  Created: {filename}")
+        
+        maps = impact[impact['variable'] == variable] if not impact.empty else impact
+        group_ids = list(maps['group'].unique()) if not maps.empty else []
+        if not group_ids:
+            continue
+        cols = min(4, len(group_ids))
+        rows = (len(group_ids) + cols - 1) // cols
+        fig, axes = plt.subplots(rows, cols, figsize=(4 * cols, 3 * rows), squeeze=False)
+        vmax = np.nanmax(maps['mean_abs_deviation'].to_numpy()) or 1.0
+        for ax, group_id in zip(axes.flat, group_ids):
+            grid = maps[maps['group'] == group_id].sort_values(['month', 'hour'])['mean_abs_deviation'].to_numpy().reshape(12, 24)
+            image = ax.imshow(grid, aspect='auto', origin='lower', cmap='viridis', vmin=0, vmax=vmax,
+                              extent=(0.5, 24.5, 0.5, 12.5))
+            ax.set_title(groups[group_id]['name'], fontsize=9, fontweight='bold')
+            ax.set_xlabel('Hour', fontsize=8)
+            ax.set_ylabel('Month', fontsize=8)
+        for ax in list(axes.flat)[len(group_ids):]:
+            ax.axis('off')
+        fig.colorbar(image, ax=axes, shrink=0.8, label='Mean |variant - baseline|')
+        filename = f"Cube_{safe_name}_group_impact.png"
+        plt.savefig(plots_dir / filename, dpi=300, bbox_inches='tight', facecolor='white')
+        plt.close()
+        print(f"  Created: {filename}")
@@ -0,0 +1,72 @@
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+from .config import CONFIG
+from .artifacts import KEEP_FILES
+
+_MANAGER = None
+_MANAGER_LOCK = threading.Lock()
+
+def dir_size_mb(path):
+    return sum(f.stat().st_size for f in Path(path).rglob('*') if f.is_file()) / 1e6
+
+class ScratchManager:
+    def __init__(self, root=None, limit_mb=None):
+        self.root = Path(root or CONFIG['scratch_dir'])
+        self.limit_mb = limit_mb or CONFIG['scratch_limit_mb']
+        self.cond = threading.Condition()
+        self.reserved_mb = 0.0
+        self.sizes = {}  # job key -> largest scratch footprint seen (MB)
+
+    def estimate_mb(self, key):
+        seen = self.sizes.get(key)
+        return seen * 1.2 if seen else CONFIG['scratch_job_mb']
+
+    def free_mb(self):
+        return shutil.disk_usage(self.root).free / 1e6
+
+    def can_reserve(self, size_mb):
+        # A job larger than the whole budget may still run alone
+        if self.reserved_mb == 0:
+            return True
+        within_budget = self.reserved_mb + size_mb <= self.limit_mb
+        return within_budget and self.free_mb() - self.reserved_mb >= size_mb
+
+    @contextmanager
+    def job(self, key):
+        self.root.mkdir(parents=True, exist_ok=True)
+        size_mb = self.estimate_mb(key)
+        with self.cond:
+            self.cond.wait_for(lambda: self.can_reserve(size_mb))
+            self.reserved_mb += size_mb
+
+        path = Path(tempfile.mkdtemp(prefix=f"{key}_", dir=self.root))
+        try:
+            yield path
+        finally:
+            used_mb = dir_size_mb(path)
+            shutil.rmtree(path, ignore_errors=True)
+            with self.cond:
+                self.sizes[key] = max(self.sizes.get(key, 0), used_mb)
+                self.reserved_mb -= size_mb
+                self.cond.notify_all()
+
+def copy_back(scratch_dir, output_dir, files=KEEP_FILES + ['energyplus.log']):
+    # Only what extraction and diagnosis need leaves the fast local disk
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name in files:
+        src = Path(scratch_dir) / name
+        if src.exists():
+            shutil.copy2(src, output_dir / name)
+
+def scratch_manager():
+    # One manager per process so every worker thread shares the same budget
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is None or _MANAGER.root != Path(CONFIG['scratch_dir']):
+            _MANAGER = ScratchManager()
+        return _MANAGER
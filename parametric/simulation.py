@@ -1,15 +1,46 @@
-import subprocess
+import io
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
 from pathlib import Path
 from eppy.modeleditor import IDF
 
 from .config import STUDY_CASES, CONFIG
+from .extraction import result_metrics, METRIC_VARIABLES
+from .artifacts import new_run_id, harvest, apply_retention
+from .canonical import canonicalize_idf, canonical_hash, describe_modifications
+from .journal import Journal, DONE_STATUSES
+from .supervision import RuntimeHistory, estimate_cost, run_energyplus
+from .api_backend import run_api, start_api_pool
+from .scratch import scratch_manager, copy_back
+from .cpu_budget import core_budget
+from .metrics import METRICS, start_metrics_server
 
-# Set EnergyPlus IDD file
-IDF.setiddname("/Applications/EnergyPlus-25-1-0/Energy+.idd")
+RUNTIME_HISTORY = RuntimeHistory()
+_BASE_TEXT = {}
+# eppy's IDD and object model are class-level state shared by every IDF: one build at a time
+_EPPY_LOCK = threading.Lock()
 
-def create_variant_idf(base_idf_path, variant_id, variant_config):
+def ensure_idd():
+    # eppy holds one IDD per process: the one that ships with the configured EnergyPlus, set on first use
+    if IDF.getiddname() is None:
+        IDF.setiddname(CONFIG['energyplus_idd'] or str(Path(CONFIG['energyplus_exe']).parent / 'Energy+.idd'))
+    return IDF.getiddname()
+
+def load_base_idf(base_idf_path):
+    # The base file is read once per process (and again only if it changes); eppy parses from memory
+    path = Path(base_idf_path)
+    mtime = path.stat().st_mtime_ns
+    cached = _BASE_TEXT.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _BASE_TEXT[path] = (mtime, path.read_text())
+    ensure_idd()
+    return IDF(io.StringIO(cached[1]))
+
+def create_variant_idf(base_idf_path, variant_id, variant_config, series=True):
     # Load IDF using eppy
-    idf = IDF(str(base_idf_path))
+    idf = load_base_idf(base_idf_path)
     
     for object_type, mod_config in variant_config['modifications'].items():
         fields = mod_config['fields']
@@ -24,12 +55,13 @@ def create_variant_idf(base_idf_path, variant_id, variant_config):
             shadows = idf.idfobjects['SHADOWCALCULATION']
             if shadows:
                 shadow = shadows[0]
-                if fields[0] == 0:  # method
-                    shadow.Shading_Calculation_Method = values[0]
-                elif fields[0] == 1:  # frequency method
-                    shadow.Shading_Calculation_Update_Frequency_Method = values[0]
-                elif fields[0] == 2:  # frequency
-                    shadow.Shading_Calculation_Update_Frequency = values[0]
+                for idx, field_idx in enumerate(fields):
+                    if field_idx == 0:  # method
+                        shadow.Shading_Calculation_Method = values[idx]
+                    elif field_idx == 1:  # frequency method
+                        shadow.Shading_Calculation_Update_Frequency_Method = values[idx]
+                    elif field_idx == 2:  # frequency
+                        shadow.Shading_Calculation_Update_Frequency = values[idx]
         
         elif object_type == 'BUILDING':
             buildings = idf.idfobjects['BUILDING']
@@ -64,39 +96,283 @@ def create_variant_idf(base_idf_path, variant_id, variant_config):
             if outside_algs:
                 outside_algs[0].Algorithm = values[0]
     
+    prune_outputs(idf, CONFIG['output_metrics'], CONFIG['output_frequency'],
+                  CONFIG['series_variables'] if series else [])
+    return idf
+
+def prune_outputs(idf, metrics, frequency, series=()):
+    # Drop every report, then request only what the metrics are summed from
+    for object_type in ['OUTPUT:VARIABLE', 'OUTPUT:METER', 'OUTPUT:METER:METERFILEONLY',
+                        'OUTPUT:TABLE:SUMMARYREPORTS', 'OUTPUT:TABLE:MONTHLY', 'OUTPUTCONTROL:TABLE:STYLE',
+                        'OUTPUT:VARIABLEDICTIONARY', 'OUTPUT:SQLITE']:
+        for obj in list(idf.idfobjects[object_type]):
+            idf.removeidfobject(obj)
+    
+    # Ideal loads variables are keyed by the ideal loads system name
+    keys = [system.Name for system in idf.idfobjects['ZONEHVAC:IDEALLOADSAIRSYSTEM']] or ['*']
+    
+    for metric in metrics:
+        for key in keys:
+            idf.newidfobject('OUTPUT:VARIABLE',
+                             Key_Value=key,
+                             Variable_Name=METRIC_VARIABLES[metric],
+                             Reporting_Frequency=frequency)
+    
+    # Hourly series read by diff and cube; metrics still come from the coarsest frequency
+    for variable in series:
+        idf.newidfobject('OUTPUT:VARIABLE',
+                         Key_Value='*',
+                         Variable_Name=variable,
+                         Reporting_Frequency='Hourly')
     return idf
 
-def run_single_simulation(variant_id, variant_config, base_idf_path):
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+def weather_weekday(weather_file, month, day):
+    # Weekday of month/day in the EPW calendar: "DATA PERIODS,1,1,Data,Sunday, 1/ 1,12/31"
     try:
-        parametric_dir = Path.cwd() / "parametric"
-        variant_dir = parametric_dir / "idf_variants" / f"Case600_{variant_id}"
-        variant_dir.mkdir(exist_ok=True, parents=True)
-        variant_file = variant_dir / f"Case600_{variant_id}.idf"
-        
-        variant_idf = create_variant_idf(base_idf_path, variant_id, variant_config)
+        with open(weather_file, 'r', errors='replace') as f:
+            for line in f:
+                if line.upper().startswith('DATA PERIODS'):
+                    fields = [field.strip() for field in line.split(',')]
+                    start_month, start_day = fields[5].split('/')
+                    start = date(2001, int(start_month), int(start_day))
+                    return (WEEKDAYS.index(fields[4].capitalize()) + (date(2001, month, day) - start).days) % 7
+                if line[:1].isdigit():
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def set_screening_run_periods(idf, weeks):
+    runperiods = idf.idfobjects['RUNPERIOD']
+    if not runperiods:
+        return idf
+    annual = runperiods[0]
+    
+    # Keep the weekday calendar of the annual run (BESTEST year is non-leap)
+    year_start = date(2001, int(annual.Begin_Month), int(annual.Begin_Day_of_Month))
+    start_day = str(annual.Day_of_Week_for_Start_Day).strip().capitalize()
+    if start_day in WEEKDAYS:
+        start_weekday = WEEKDAYS.index(start_day)
+    else:
+        # Blank or UseWeatherFile: the annual run follows the weather file's calendar
+        start_weekday = weather_weekday(CONFIG['weather_file'], year_start.month, year_start.day)
+        if start_weekday is None:
+            raise ValueError(f"Cannot screen: start weekday '{annual.Day_of_Week_for_Start_Day}' "
+                             f"and no DATA PERIODS weekday in {CONFIG['weather_file']}")
+    
+    for i, (month, day) in enumerate(weeks):
+        begin = date(2001, month, day)
+        end = begin + timedelta(days=6)
+        week = idf.newidfobject('RUNPERIOD')
+        for field in annual.fieldnames[1:]:
+            week[field] = annual[field]
+        week.Name = f"Screening Week {i + 1}"
+        week.Begin_Month = begin.month
+        week.Begin_Day_of_Month = begin.day
+        week.End_Month = end.month
+        week.End_Day_of_Month = end.day
+        week.Day_of_Week_for_Start_Day = WEEKDAYS[(start_weekday + (begin - year_start).days) % 7]
+    
+    idf.removeidfobject(annual)
+    return idf
+
+def write_variant_idf(variant_id, variant_config, base_idf_path, screening=False):
+    parametric_dir = Path.cwd() / "parametric"
+    suffix = "_screen" if screening else ""
+    variant_dir = parametric_dir / "idf_variants" / f"Case600_{variant_id}{suffix}"
+    variant_dir.mkdir(exist_ok=True, parents=True)
+    variant_file = variant_dir / f"Case600_{variant_id}{suffix}.idf"
+    
+    # Screening runs only feed annual totals, so they skip the hourly series
+    series = [] if screening else CONFIG['series_variables']
+    with _EPPY_LOCK:
+        variant_idf = create_variant_idf(base_idf_path, variant_id, variant_config, series=not screening)
+        if CONFIG['backend'] == 'api':
+            # Metric variables are requested through the API instead
+            prune_outputs(variant_idf, [], CONFIG['output_frequency'], series)
+        if screening:
+            set_screening_run_periods(variant_idf, CONFIG['screening_weeks'])
         variant_idf.save(str(variant_file))
+    return variant_file
+
+def find_reusable_variants(base_idf_path, variant_ids):
+    # Canonical model -> first variant (or base) that produced it
+    # Also returns the variant files it wrote, so the pool runs them without rebuilding
+    seen = {canonical_hash(canonicalize_idf(Path(base_idf_path).read_text())): 'base'}
+    reused = {}
+    variant_files = {}
+    
+    for variant_id in variant_ids:
+        variant_config = STUDY_CASES[variant_id]
+        try:
+            variant_file = write_variant_idf(variant_id, variant_config, base_idf_path)
+        except Exception:
+            continue
+        variant_files[variant_id] = variant_file
+        key = canonical_hash(canonicalize_idf(variant_file.read_text()))
         
-        output_dir = parametric_dir / "outputs" / f"Case600_{variant_id}"
-        output_dir.mkdir(exist_ok=True, parents=True)
+        if key in seen:
+            source = seen[key]
+            reason = f"{describe_modifications(variant_config)} gives a model identical to {source}"
+            reused[variant_id] = (source, reason)
+            print(f"= {variant_id} reuses {source} ({reason})")
+        else:
+            seen[key] = variant_id
+    
+    return reused, variant_files
+
+def execute(variant_file, run_dir, timeout, energyplus_exe=None):
+    # Each job holds a slot of cores for its whole run; its EnergyPlus threads stay on them
+    budget = core_budget()
+    with budget.slot() as cores:
+        if CONFIG['backend'] == 'api':
+            # In-process run: metrics come back from runtime callbacks, no ESO to parse
+            start = time.time()
+            outcome = run_api(variant_file, run_dir, CONFIG['weather_file'], CONFIG['output_metrics'],
+                              cores, budget.threads, timeout)
+            outcome['runtime'] = time.time() - start
+            return outcome
         
         cmd = [
-            CONFIG['energyplus_exe'],
+            energyplus_exe or CONFIG['energyplus_exe'],
             '-w', CONFIG['weather_file'],
-            '-d', str(output_dir),
+            '-d', str(run_dir),
+            '-j', str(budget.threads),
             str(variant_file)
         ]
+        return run_energyplus(cmd, run_dir, timeout, cores=cores, threads=budget.threads)
+
+def run_single_simulation(variant_id, variant_config, base_idf_path, screening=False, run_id=None, variant_file=None, energyplus_exe=None):
+    try:
+        parametric_dir = Path.cwd() / "parametric"
+        suffix = "_screen" if screening else ""
+        variant_file = variant_file or write_variant_idf(variant_id, variant_config, base_idf_path, screening)
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        output_dir = parametric_dir / "outputs" / f"Case600_{variant_id}{suffix}"
+        output_dir.mkdir(exist_ok=True, parents=True)
         
-        if result.returncode == 0:
-            return {'variant': variant_id, 'status': 'success', 'output_dir': str(output_dir)}
+        history_key = f"{variant_id}{suffix}"
+        cost = estimate_cost(variant_config, screening)
+        timeout = RUNTIME_HISTORY.timeout_for(history_key, cost)
+        
+        if CONFIG['scratch_dir']:
+            # Run on fast local scratch, keep only what extraction needs
+            with scratch_manager().job(history_key) as run_dir:
+                outcome = execute(variant_file, run_dir, timeout, energyplus_exe)
+                copy_back(run_dir, output_dir)
+        else:
+            outcome = execute(variant_file, output_dir, timeout, energyplus_exe)
+        
+        if outcome['status'] == 'success':
+            RUNTIME_HISTORY.record(history_key, outcome['runtime'], cost)
+            if run_id and CONFIG['artifact_store']:
+                output_dir = harvest(output_dir, run_id)
+            result = {'variant': variant_id, 'status': 'success', 'output_dir': str(output_dir), 'runtime': outcome['runtime']}
+            if 'metrics' in outcome:
+                result['metrics'] = outcome['metrics']
+            return result
         else:
-            return {'variant': variant_id, 'status': 'failed'}
+            return {'variant': variant_id, 'status': 'failed', 'reason': outcome['reason'], 'runtime': outcome['runtime']}
+            
+    except Exception as e:
+        return {'variant': variant_id, 'status': 'failed', 'reason': f"{type(e).__name__}: {e}"}
+
+def screen_variants(base_idf_path, variant_ids, run_id=None):
+    print(f"Screening {len(variant_ids)} variants over {len(CONFIG['screening_weeks'])} weeks...")
+    
+    base = run_single_simulation('base', {'modifications': {}}, base_idf_path, screening=True, run_id=run_id)
+    base_metrics = {}
+    if base['status'] == 'success':
+        base_metrics = result_metrics(base)
+    if not base_metrics:
+        # Nothing was screened: every variant runs the full year and says why in results.csv
+        note = f"base screening run failed ({base.get('reason', 'no metrics')}), not screened"
+        print(f"WARNING: {note}; promoting all {len(variant_ids)} variants")
+        return list(variant_ids), {}, note
+    
+    def screen(variant_id):
+        result = run_single_simulation(variant_id, STUDY_CASES[variant_id], base_idf_path, screening=True, run_id=run_id)
+        return variant_id, result_metrics(result) if result['status'] == 'success' else {}
+    
+    # The variants' week runs share the pool and core budget like a full sweep; only the base had to go first
+    promoted = []
+    screened = {}
+    with ThreadPoolExecutor(max_workers=CONFIG['max_parallel']) as pool:
+        futures = [pool.submit(screen, variant_id) for variant_id in variant_ids]
+        for future in as_completed(futures):
+            variant_id, metrics = future.result()
+            if not metrics:
+                promoted.append(variant_id)
+                print(f"↑ {variant_id} (screening run failed)")
+                continue
+            
+            changes = []
+            for key in ['annual_heating_load', 'annual_sensible_cooling_load']:
+                if base_metrics[key]:
+                    changes.append(abs(metrics[key] - base_metrics[key]) / base_metrics[key] * 100)
+            max_change = max(changes) if changes else 0
             
-    except Exception:
-        return {'variant': variant_id, 'status': 'failed'}
+            if max_change > CONFIG['screening_tolerance']:
+                promoted.append(variant_id)
+                print(f"↑ {variant_id} ({max_change:.2f}% change)")
+            else:
+                screened[variant_id] = max_change
+                print(f"= {variant_id} ({max_change:.2f}% change)")
+    
+    promoted.sort(key=list(variant_ids).index)
+    print(f"Promoted {len(promoted)}/{len(variant_ids)} variants to full-year runs")
+    return promoted, screened, None
+
+def evaluate_variants(variant_configs, run_id=None):
+    # Run ad-hoc variant configs (id -> config) on the pool and return id -> metrics
+    base_idf_path = Path.cwd() / CONFIG['base_case']
+    run_id = run_id or new_run_id()
+    
+    if CONFIG['backend'] == 'api':
+        start_api_pool()
+    # Variant IDFs are built here, one after another, and the pool only runs them
+    variant_files = {}
+    for variant_id, variant_config in variant_configs.items():
+        try:
+            variant_files[variant_id] = write_variant_idf(variant_id, variant_config, base_idf_path)
+        except Exception as e:
+            print(f"✗ {variant_id} ({type(e).__name__}: {e})")
+    
+    def evaluate(variant_id):
+        if variant_id not in variant_files:
+            return variant_id, {}
+        result = run_single_simulation(variant_id, variant_configs[variant_id], base_idf_path, run_id=run_id,
+                                       variant_file=variant_files[variant_id])
+        if result['status'] != 'success':
+            print(f"✗ {variant_id} ({result.get('reason', 'unknown')})")
+            return variant_id, {}
+        return variant_id, result_metrics(result)
+    
+    with ThreadPoolExecutor(max_workers=CONFIG['max_parallel']) as pool:
+        return dict(pool.map(evaluate, list(variant_configs)))
 
-def run_simulations():
+def run_job(variant_id, base_idf_path, run_id, journal, variant_file=None):
+    # One journaled job, retried up to max_retries times on failure
+    for attempt in range(1, CONFIG['max_retries'] + 2):
+        journal.start(variant_id, attempt)
+        METRICS.start(attempt)
+        result = run_single_simulation(variant_id, STUDY_CASES[variant_id], base_idf_path, run_id=run_id,
+                                       variant_file=variant_file)
+        result['attempt'] = attempt
+        METRICS.finish(result)
+        journal.complete(result)
+        if result['status'] == 'success':
+            break
+    METRICS.done(result)
+    if result['status'] == 'success':
+        print(f"✓ {result['variant']}")
+    else:
+        print(f"✗ {result['variant']} ({result.get('reason', 'unknown')})")
+    return result
+
+def run_simulations(screening=False, resume=False, on_result=None):
     base_dir = Path.cwd()
     parametric_dir = base_dir / "parametric"
     
@@ -110,17 +386,76 @@ def run_simulations():
         print(f"Error: Base IDF not found at {base_idf_path}")
         return []
     
-    print(f"Running {len(STUDY_CASES)} simulations...")
-    
+    METRICS.reset()
+    if CONFIG['backend'] == 'api':
+        start_api_pool()
+    server = start_metrics_server() if CONFIG['metrics_port'] else None
+    try:
+        return run_sweep(base_idf_path, screening, resume, on_result)
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+
+def run_sweep(base_idf_path, screening=False, resume=False, on_result=None):
+    journal = Journal()
     results = []
-    for variant_id, config in STUDY_CASES.items():
-        print(f"Running {variant_id}...")
-        result = run_single_simulation(variant_id, config, base_idf_path)
+    
+    screening_note = None
+    
+    def add(result):
+        # on_result sees every final result as soon as it exists, e.g. to extract while others run
+        if screening_note and result['status'] not in ('reused', 'screened'):
+            result['screening_note'] = screening_note
         results.append(result)
-        status = "✓" if result['status'] == 'success' else "✗"
-        print(f"{status} {result['variant']}")
+        if on_result:
+            on_result(result)
+    
+    pending = list(STUDY_CASES)
+    run_id = None
+    if resume:
+        run_id, jobs = journal.replay()
+        done = [job for job in jobs.values() if job['status'] in DONE_STATUSES and job['variant'] in STUDY_CASES]
+        for job in done:
+            add(job)
+        pending = [v for v in STUDY_CASES if v not in {job['variant'] for job in done}]
+        print(f"Resuming: {len(done)} done, {len(pending)} to run")
+    if run_id is None:
+        run_id = new_run_id()
+        journal.new_sweep(run_id)
+    
+    reused, variant_files = find_reusable_variants(base_idf_path, pending)
+    for variant_id, (source, reason) in reused.items():
+        result = {'variant': variant_id, 'status': 'reused', 'reused_from': source, 'reason': reason}
+        journal.complete(result)
+        add(result)
+    
+    to_run = [v for v in pending if v not in reused]
+    METRICS.cached(len(results), len(STUDY_CASES))
+    if screening:
+        to_run, screened, screening_note = screen_variants(base_idf_path, to_run, run_id)
+        for variant_id, change in screened.items():
+            # Below tolerance: reuse the base case annual values
+            result = {'variant': variant_id, 'status': 'screened', 'screening_change': change}
+            journal.complete(result)
+            add(result)
+    
+    print(f"Running {len(to_run)} simulations...")
+    METRICS.enqueue(len(to_run))
+    
+    with ThreadPoolExecutor(max_workers=CONFIG['max_parallel']) as pool:
+        futures = [pool.submit(run_job, variant_id, base_idf_path, run_id, journal, variant_files.get(variant_id))
+                   for variant_id in to_run]
+        for future in as_completed(futures):
+            add(future.result())
+    
+    order = list(STUDY_CASES)
+    results.sort(key=lambda r: order.index(r['variant']))
     
     successful = len([r for r in results if r['status'] == 'success'])
     print(f"Completed {successful}/{len(results)} simulations")
     
+    if CONFIG['artifact_store']:
+        apply_retention()
+    
     return results
\ No newline at end of file
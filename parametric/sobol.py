@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from .config import SOBOL_FACTORS
+from .utils import merge_modifications
+
+OUTPUTS = ['annual_heating_load', 'annual_sensible_cooling_load']
+
+def saltelli_matrices(n_samples, n_factors, rng):
+    # A, B and the k AB_i matrices (A with column i taken from B), on the unit hypercube
+    a = rng.random((n_samples, n_factors))
+    b = rng.random((n_samples, n_factors))
+    ab = np.repeat(a[np.newaxis], n_factors, axis=0)
+    idx = np.arange(n_factors)
+    ab[idx, :, idx] = b[:, idx].T
+    return a, b, ab
+
+def to_levels(unit, n_levels):
+    # Discrete factors: split [0, 1) evenly between the levels
+    return np.minimum((unit * n_levels).astype(int), n_levels - 1)
+
+def design_config(levels, factors):
+    variant_ids = [factors[name][level - 1] for name, level in zip(factors, levels) if level > 0]
+    return merge_modifications(variant_ids)
+
+def sobol_indices(f_a, f_b, f_ab):
+    # First order (Saltelli 2010) and total (Jansen) estimators, vectorised over
+    # factors (axis 0 of f_ab) and any leading resample axes
+    both = np.concatenate([f_a, f_b], axis=-1)
+    var = np.var(both, axis=-1)
+    # Centring leaves the indices unchanged but cuts estimator variance
+    mean = np.mean(both, axis=-1, keepdims=True)
+    f_a, f_b, f_ab = f_a - mean, f_b - mean, f_ab - mean
+    first = np.mean(f_b * (f_ab - f_a), axis=-1) / var
+    total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=-1) / var
+    return first, total
+
+def bootstrap_indices(f_a, f_b, f_ab, n_resamples, rng, batch=100, confidence=0.95):
+    n = f_a.shape[0]
+    firsts, totals = [], []
+    # Batched so memory stays bounded for tens of thousands of evaluations
+    for start in range(0, n_resamples, batch):
+        idx = rng.integers(0, n, (min(batch, n_resamples - start), n))
+        first, total = sobol_indices(f_a[idx], f_b[idx], f_ab[:, idx])
+        firsts.append(first)
+        totals.append(total)
+    firsts = np.concatenate(firsts, axis=-1)
+    totals = np.concatenate(totals, axis=-1)
+
+    tail = (1 - confidence) / 2 * 100
+    return (np.percentile(firsts, [tail, 100 - tail], axis=-1),
+            np.percentile(totals, [tail, 100 - tail], axis=-1))
+
+def run_sobol(n_samples=64, n_resamples=1000, seed=0, evaluate=None):
+    if evaluate is None:
+        from .simulation import evaluate_variants as evaluate
+
+    factors = SOBOL_FACTORS
+    names = list(factors)
+    n_levels = np.array([len(factors[name]) + 1 for name in names])
+    rng = np.random.default_rng(seed)
+
+    a, b, ab = saltelli_matrices(n_samples, len(names), rng)
+    levels_a = to_levels(a, n_levels)
+    levels_b = to_levels(b, n_levels)
+    levels_ab = to_levels(ab, n_levels)
+
+    # Discrete factors repeat points: simulate each distinct design once
+    all_levels = np.concatenate([levels_a, levels_b, levels_ab.reshape(-1, len(names))])
+    unique, inverse = np.unique(all_levels, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    print(f"Sobol design: {len(all_levels)} evaluations, {len(unique)} distinct simulations")
+
+    configs = {'sobol_' + '-'.join(map(str, row)): design_config(row, factors) for row in unique}
+    metrics = evaluate(configs)
+
+    results_dir = Path.cwd() / "parametric" / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    evaluations = pd.DataFrame(unique, columns=names)
+    evaluations.insert(0, 'design', list(configs))
+    for output in OUTPUTS:
+        evaluations[output] = [metrics.get(key, {}).get(output, np.nan) for key in configs]
+    evaluations.to_csv(results_dir / "sobol_evaluations.csv", index=False)
+
+    rows = []
+    n = n_samples
+    for output in OUTPUTS:
+        y = evaluations[output].to_numpy()[inverse]
+        if np.isnan(y).any():
+            print(f"Skipping {output}: some simulations failed")
+            continue
+        f_a, f_b = y[:n], y[n:2 * n]
+        f_ab = y[2 * n:].reshape(len(names), n)
+
+        first, total = sobol_indices(f_a, f_b, f_ab)
+        first_ci, total_ci = bootstrap_indices(f_a, f_b, f_ab, n_resamples, rng)
+        for i, name in enumerate(names):
+            rows.append({
+                'output': output, 'factor': name,
+                'S1': first[i], 'S1_low': first_ci[0, i], 'S1_high': first_ci[1, i],
+                'ST': total[i], 'ST_low': total_ci[0, i], 'ST_high': total_ci[1, i]
+            })
+
+    df = pd.DataFrame(rows)
+    df.to_csv(results_dir / "sobol.csv", index=False)
+
+    with open(results_dir / "sobol.txt", 'w') as f:
+        f.write("Sobol Sensitivity Indices\n\n")
+        f.write(f"{n_samples} base samples, {len(names)} factors, {len(unique)} simulations, {n_resamples} bootstrap resamples (95% CI)\n\n")
+        for output in (df['output'].unique() if not df.empty else []):
+            group = df[df['output'] == output]
+            f.write(f"{output}:\n")
+            for _, row in group.sort_values('ST', ascending=False).iterrows():
+                f.write(f"  {row['factor']}: S1 {row['S1']:.3f} [{row['S1_low']:.3f}, {row['S1_high']:.3f}], "
+                        f"ST {row['ST']:.3f} [{row['ST_low']:.3f}, {row['ST_high']:.3f}]\n")
+            f.write("\n")
+
+    print(f"Sobol indices written to {results_dir / 'sobol.txt'}")
+    return df
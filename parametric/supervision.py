@@ -0,0 +1,112 @@
+import re
+import json
+import time
+import threading
+import subprocess
+from pathlib import Path
+
+from .config import CONFIG
+from .cpu_budget import thread_env, pinned_command
+
+def estimate_cost(variant_config, screening=False):
+    # Relative runtime of a variant against the 4 steps/hour CTF base case
+    cost = 1.0
+    mods = variant_config.get('modifications', {})
+    if 'TIMESTEP' in mods:
+        cost *= mods['TIMESTEP']['values'][0] / 4
+    if mods.get('HEATBALANCEALGORITHM', {}).get('values', [''])[0] == 'ConductionFiniteDifference':
+        cost *= 5
+    if screening:
+        cost *= len(CONFIG['screening_weeks']) * 7 / 365
+    return cost
+
+class RuntimeHistory:
+    def __init__(self, path=None, keep=10):
+        self.path = Path(path or CONFIG['runtime_history_file'])
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.entries = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text())
+            except ValueError:
+                self.entries = {}
+
+    def record(self, key, seconds, cost):
+        with self.lock:
+            runs = self.entries.setdefault(key, [])
+            runs.append({'seconds': seconds, 'cost': cost})
+            del runs[:-self.keep]
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self.entries, indent=2))
+
+    def timeout_for(self, key, cost):
+        with self.lock:
+            own = [r['seconds'] for r in self.entries.get(key, [])]
+            per_cost = sorted(r['seconds'] / r['cost'] for runs in self.entries.values() for r in runs if r['cost'])
+
+        if own:
+            estimate = max(own)
+        elif per_cost:
+            # No history for this job: scale the median seconds per unit cost
+            estimate = per_cost[len(per_cost) // 2] * cost
+        else:
+            return max(CONFIG['timeout_min'], CONFIG['timeout_default'] * max(cost, 1.0))
+
+        return max(CONFIG['timeout_min'], estimate * CONFIG['timeout_factor'])
+
+def read_new(path, offset):
+    if not path.exists():
+        return '', offset
+    with open(path, 'r', errors='replace') as f:
+        f.seek(offset)
+        text = f.read()
+        return text, f.tell()
+
+def run_energyplus(cmd, output_dir, timeout, poll_interval=0.5, cores=None, threads=None):
+    # Run EnergyPlus, tailing eplusout.err so fatal errors kill the process at once
+    output_dir = Path(output_dir)
+    err_file = output_dir / 'eplusout.err'
+    patterns = [re.compile(p) for p in CONFIG['kill_patterns']]
+    if err_file.exists():
+        err_file.unlink()
+
+    start = time.time()
+    offset = 0
+    buffer = ''
+    with open(output_dir / 'energyplus.log', 'w') as log:
+        env = thread_env(threads) if threads else None
+        # Pinned in the child before exec, so EnergyPlus and its worker threads start on the slot
+        process = subprocess.Popen(pinned_command(cmd, cores), stdout=log, stderr=subprocess.STDOUT, env=env)
+        while True:
+            try:
+                returncode = process.wait(timeout=poll_interval)
+            except subprocess.TimeoutExpired:
+                returncode = None
+
+            text, offset = read_new(err_file, offset)
+            buffer += text
+            lines = buffer.split('\n')
+            buffer = lines.pop()
+            for line in lines:
+                if any(p.search(line) for p in patterns):
+                    process.kill()
+                    process.wait()
+                    return {'status': 'failed', 'reason': f"killed on error: {line.strip()}", 'runtime': time.time() - start}
+
+            if returncode is not None:
+                break
+            if time.time() - start > timeout:
+                process.kill()
+                process.wait()
+                return {'status': 'failed', 'reason': f"timeout after {timeout:.0f}s", 'runtime': time.time() - start}
+
+    runtime = time.time() - start
+    if returncode != 0:
+        reason = f"exit code {returncode}"
+        text, _ = read_new(err_file, 0)
+        errors = [line.strip() for line in text.splitlines() if any(p.search(line) for p in patterns)]
+        if errors:
+            reason += f": {errors[0]}"
+        return {'status': 'failed', 'reason': reason, 'runtime': runtime}
+    return {'status': 'success', 'runtime': runtime}
@@ -1,3 +1,5 @@
+import hashlib
+
 def get_parameter_group_info():
     return {
         'timestep': {
@@ -8,7 +10,7 @@ def get_parameter_group_info():
         'shadow_freq': {
             'name': 'Shadow Frequency (days)',
             'variants': ['2a', '2b', '2c'],
-            'labels': ['7 days', '20 days', '30 days']
+            'labels': ['7 days', '1 day', '30 days']
         },
         'shadow_calc': {
             'name': 'Shadow Calculation',
@@ -18,7 +20,7 @@ def get_parameter_group_info():
         'solar_dist': {
             'name': 'Solar Distribution',
             'variants': ['5a', '5b', '5c'],
-            'labels': ['MinimalShadowing', 'FullExterior', 'FullExt+Reflections']
+            'labels': ['MinimalShadowing', 'FullInteriorAndExterior', 'FullExt+Reflections']
         },
         'terrain': {
             'name': 'Terrain Type',
@@ -55,9 +57,9 @@ def get_parameter_group_info():
 def get_base_parameter_value(group_id):
     base_values = {
         'timestep': '4 steps/hr',
-        'shadow_freq': '1 day',
+        'shadow_freq': '20 days',
         'shadow_calc': 'PolygonClipping, Periodic',
-        'solar_dist': 'FullInteriorAndExterior',
+        'solar_dist': 'FullExterior',
         'terrain': 'Country',
         'convergence': 'Default (0.04W, 0.4C)',
         'warmup': 'Max: 30, Min: 6',
@@ -66,4 +68,31 @@ def get_base_parameter_value(group_id):
         'outside_conv': 'DOE-2',
         'zone_air': 'ThirdOrderBackwardDiff'
     }
-    return base_values.get(group_id, 'Default')
\ No newline at end of file
+    return base_values.get(group_id, 'Default')
+
+def merge_modifications(variant_ids):
+    from .config import STUDY_CASES
+    
+    # Later variants win when two variants set the same field
+    merged = {}
+    for variant_id in variant_ids:
+        for object_type, mod in STUDY_CASES[variant_id]['modifications'].items():
+            fields = merged.setdefault(object_type, {})
+            for field, value in zip(mod['fields'], mod['values']):
+                fields[field] = value
+    
+    return {
+        'description': ' + '.join(STUDY_CASES[v]['description'] for v in variant_ids) or 'Base case',
+        'modifications': {
+            object_type: {'fields': list(fields), 'values': list(fields.values())}
+            for object_type, fields in merged.items()
+        }
+    }
+
+def file_hash(path):
+    # SHA-256 of a file's content, read in 1 MB chunks
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
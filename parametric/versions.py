@@ -0,0 +1,218 @@
+import re
+import json
+import subprocess
+import multiprocessing
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from .config import STUDY_CASES, CONFIG
+from .artifacts import new_run_id
+from .eso_index import VERSION_PATTERN, eso_version
+from .extraction import METRIC_VARIABLES
+
+_VERSIONS = {}
+
+def detect_version(energyplus_exe):
+    # `energyplus --version`, else the install directory name (EnergyPlus-25-1-0)
+    if energyplus_exe not in _VERSIONS:
+        version = None
+        try:
+            output = subprocess.run([energyplus_exe, '--version'], capture_output=True, text=True, timeout=30).stdout
+            match = VERSION_PATTERN.search(output)
+            version = match.group(1) if match else None
+        except (OSError, subprocess.SubprocessError):
+            pass
+        if version is None:
+            match = re.search(r'(\d+)-(\d+)-(\d+)', Path(energyplus_exe).parent.name)
+            version = '.'.join(match.groups()) if match else None
+        _VERSIONS[energyplus_exe] = version
+    return _VERSIONS[energyplus_exe]
+
+def versioned_idf(idf_file, version):
+    # Case600_EnergyPlus-25-1-0.idf -> Case600_EnergyPlus-24-2-0.idf when that transition exists
+    idf_file = Path(idf_file)
+    if version is None:
+        return idf_file
+    candidate = idf_file.with_name(f"{idf_file.stem.split('_')[0]}_EnergyPlus-{version.replace('.', '-')}.idf")
+    return candidate if candidate.exists() else idf_file
+
+def installed_engines(executables=None, skipped=None):
+    # version -> executable for every installed engine, in the order given; executables left
+    # out are appended to skipped as {'executable', 'version', 'skipped'} for the reports
+    engines = {}
+    for exe in executables or CONFIG['energyplus_versions'] or [CONFIG['energyplus_exe']]:
+        if not Path(exe).exists():
+            reason, version = 'not installed', None
+        else:
+            version = detect_version(exe) or Path(exe).parent.name
+            if version not in engines:
+                engines[version] = exe
+                continue
+            reason = f"version {version} already covered by {engines[version]}"
+        print(f"  {exe}: {reason}, skipped")
+        if skipped is not None:
+            skipped.append({'executable': exe, 'version': version, 'skipped': reason})
+    return engines
+
+def reference_ranges(reference_file=None):
+    with open(reference_file or CONFIG['reference_file'], 'r') as f:
+        reference = json.load(f)
+    ranges = {}
+    for metric in METRIC_VARIABLES:
+        stats = reference['metrics'].get(metric, {}).get('statistics')
+        if stats:
+            ranges[metric] = (stats['min'], stats['max'])
+    return ranges
+
+def write_engine_variants(settings, exe, version, configs, idf_file):
+    # Runs in a fresh process per engine: eppy loads one IDD per process, here the one beside exe
+    from . import simulation
+    CONFIG.update(settings, energyplus_exe=exe, energyplus_idd=None)
+    return {variant: simulation.write_variant_idf(f"{variant}@{version}", config, idf_file)
+            for variant, config in configs.items()}
+
+def prepare_variants(exe, version, configs, idf_file):
+    # variant -> IDF file built with this engine's IDD
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(write_engine_variants, dict(CONFIG), exe, version, configs, idf_file).result()
+
+def run_version_matrix(executables=None, variants=None, run=None, prepare=None):
+    # Base case and variants on every installed engine, all on the one worker pool
+    from . import simulation
+    run = run or simulation.run_single_simulation
+    prepare = prepare or prepare_variants
+
+    skipped = []
+    engines = installed_engines(executables, skipped)
+    if not engines:
+        print("No EnergyPlus executables found (set CONFIG['energyplus_versions'])")
+        return pd.DataFrame()
+    variants = ['base'] + [v for v in variants or STUDY_CASES if v != 'base']
+    configs = {v: {'modifications': {}} if v == 'base' else STUDY_CASES[v] for v in variants}
+    base_idf = Path.cwd() / CONFIG['base_case']
+    run_id = new_run_id()
+    print(f"Running {len(variants)} variants on {len(engines)} EnergyPlus versions: {', '.join(engines)}")
+
+    rows = []
+    # Each engine runs as its own process: the in-process API binds one EnergyPlus library per worker
+    backend = CONFIG['backend']
+    CONFIG['backend'] = 'subprocess'
+    try:
+        # Every engine's variants are written first, each with its own IDD, then all run together
+        files = {}
+        for version, exe in engines.items():
+            try:
+                files[version] = prepare(exe, version, configs, versioned_idf(base_idf, version))
+            except Exception as e:
+                print(f"✗ {version}: could not build variants ({type(e).__name__}: {e})")
+                rows.extend({'version': version, 'variant': variant, 'status': 'failed',
+                             'reason': f"variant build failed: {e}"} for variant in variants)
+        with ThreadPoolExecutor(max_workers=CONFIG['max_parallel']) as pool:
+            futures = {}
+            for version, exe in engines.items():
+                for variant in variants if version in files else []:
+                    future = pool.submit(run, f"{variant}@{version}", configs[variant], versioned_idf(base_idf, version),
+                                         run_id=run_id, energyplus_exe=exe, variant_file=files[version][variant])
+                    futures[future] = (version, variant)
+            for future in as_completed(futures):
+                version, variant = futures[future]
+                result = future.result()
+                row = {'version': version, 'variant': variant, 'status': result['status'], 'runtime': result.get('runtime')}
+                if result['status'] == 'success':
+                    row.update(simulation.result_metrics(result))
+                    if 'output_dir' in result:
+                        row['eso_version'] = eso_version(Path(result['output_dir']) / 'eplusout.eso')
+                    print(f"✓ {variant} @ {version}")
+                else:
+                    row['reason'] = result.get('reason', 'unknown')
+                    print(f"✗ {variant} @ {version} ({row['reason']})")
+                rows.append(row)
+    finally:
+        CONFIG['backend'] = backend
+
+    order = {(version, variant): i for i, (version, variant) in
+             enumerate((version, variant) for version in engines for variant in variants)}
+    df = pd.DataFrame(sorted(rows, key=lambda r: order[(r['version'], r['variant'])]))
+    results_dir = Path.cwd() / "parametric" / "results"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    df.to_csv(results_dir / "version_matrix.csv", index=False)
+    write_version_comparison(df, engines, results_dir, skipped)
+    return df
+
+def write_version_comparison(df, engines, results_dir, skipped=()):
+    # Each version against the first: metric changes per variant, runtimes and reference passes
+    versions = list(engines)
+    metrics = [m for m in METRIC_VARIABLES if m in df.columns]
+    ok = df[df['status'] == 'success']
+    reference = versions[0]
+    try:
+        ranges = reference_ranges()
+    except (OSError, ValueError, KeyError):
+        ranges = {}
+
+    rows = []
+    ref = ok[ok['version'] == reference].set_index('variant')
+    for version in versions:
+        runs = ok[ok['version'] == version].set_index('variant')
+        common = runs.index.intersection(ref.index)
+        row = {'version': version, 'executable': engines[version], 'succeeded': len(runs),
+               'failed': int((df['version'] == version).sum()) - len(runs), 'compared': len(common),
+               'mean_runtime': runs['runtime'].mean() if len(runs) else np.nan,
+               'total_runtime': runs['runtime'].sum() if len(runs) else np.nan}
+        for metric in metrics:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                change = (runs.loc[common, metric] - ref.loc[common, metric]) / ref.loc[common, metric] * 100
+            row[f"{metric}_mean_abs_change_pct"] = change.abs().mean() if len(common) else np.nan
+            row[f"{metric}_max_abs_change_pct"] = change.abs().max() if len(common) else np.nan
+            if 'base' in runs.index:
+                row[f"base_{metric}"] = runs.loc['base', metric]
+        if ranges and 'base' in runs.index:
+            # Only the base model is Case 600; variants are meant to move away from its range
+            row['base_within_reference'] = all(low <= runs.loc['base', metric] <= high
+                                               for metric, (low, high) in ranges.items() if metric in runs.columns)
+        rows.append(row)
+
+    # Skipped executables stay on record next to the versions that ran
+    summary = pd.DataFrame(rows + list(skipped))
+    summary.to_csv(results_dir / "version_comparison.csv", index=False)
+
+    with open(results_dir / "version_comparison.txt", 'w') as f:
+        f.write("ENERGYPLUS VERSION MATRIX\n")
+        f.write("=" * 50 + "\n\n")
+        f.write(f"Reference version: {reference}\n\n")
+        for row in rows:
+            if not row['succeeded']:
+                f.write(f"{row['version']}: no successful runs, {row['failed']} failed\n\n")
+                continue
+            f.write(f"{row['version']}: {row['succeeded']} succeeded, {row['failed']} failed, "
+                    f"mean runtime {row['mean_runtime']:.1f}s")
+            if 'base_within_reference' in row:
+                f.write(f", base {'within' if row['base_within_reference'] else 'outside'} the Case 600 reference range")
+            f.write("\n")
+            for metric in metrics:
+                parts = [f"base {row['base_' + metric]:.3f}"] if 'base_' + metric in row else []
+                if row['compared']:
+                    parts.append(f"mean |change| {row[metric + '_mean_abs_change_pct']:.2f}%, "
+                                 f"max {row[metric + '_max_abs_change_pct']:.2f}%")
+                if parts:
+                    f.write(f"  {metric}: {', '.join(parts)}\n")
+            if not row['compared']:
+                f.write(f"  no successful runs in common with {reference}, no changes to report\n")
+            f.write("\n")
+        if skipped:
+            f.write("Skipped executables\n")
+            f.write("-" * 19 + "\n")
+            for entry in skipped:
+                f.write(f"{entry['executable']}: {entry['skipped']}\n")
+
+    for row in rows:
+        if not row['succeeded']:
+            print(f"  {row['version']}: no successful runs")
+            continue
+        passes = (f", base {'passes' if row['base_within_reference'] else 'fails'} BESTEST"
+                  if 'base_within_reference' in row else '')
+        print(f"  {row['version']}: {row['succeeded']} runs, mean {row['mean_runtime']:.1f}s{passes}")
+    print(f"Version comparison written to {results_dir / 'version_comparison.txt'}")
+    return summary
@@ -5,13 +5,13 @@ import argparse
 import shutil
 from pathlib import Path
 
-from parametric import run_simulations, extract_all_results, analyze_results, CONFIG
+from parametric import run_simulations, extract_all_results, analyze_results, run_sobol, CONFIG
 
 def clean():
     parametric_dir = Path("parametric")
     if parametric_dir.exists():
         for item in parametric_dir.iterdir():
-            if item.name not in ['__init__.py', 'config.py', 'simulation.py', 'extraction.py', 'plotting.py', 'analysis.py', 'utils.py']:
+            if item.suffix != '.py':
                 if item.is_dir():
                     shutil.rmtree(item)
                 else:
@@ -19,8 +19,11 @@ def clean():
         print("Cleaned")
     return True
 
-def run():
-    sim_results = run_simulations()
+def run(screening=False, resume=False, pipeline=False):
+    if pipeline:
+        from parametric.pipeline import run_pipelined
+        return not run_pipelined(screening, resume).empty
+    sim_results = run_simulations(screening, resume)
     if not sim_results:
         return False
     df = extract_all_results(sim_results)
@@ -28,16 +31,60 @@ def run():
 
 def main():
     parser = argparse.ArgumentParser(description='BESTEST Parametric Analysis')
-    parser.add_argument('command', choices=['clean', 'run', 'analyze', 'run_full'])
-    parser.add_argument('--parallel', type=int, default=4, help='Max parallel simulations')
+    parser.add_argument('command', choices=['clean', 'run', 'resume', 'analyze', 'run_full', 'sobol', 'benchmark', 'diff', 'converge', 'calibrate', 'serve', 'query', 'cpu_layout', 'cube', 'versions'])
+    parser.add_argument('--parallel', type=int, default=None, help='Max parallel simulations (default: calibrated layout, else 4)')
+    parser.add_argument('--threads', type=int, default=None, help='EnergyPlus threads per simulation (default: cores / parallel)')
+    parser.add_argument('--no-pin', action='store_true', help='Do not pin simulations to their cores')
+    parser.add_argument('--screen', action='store_true', help='Screen variants over representative weeks before full-year runs')
+    parser.add_argument('--pipeline', action='store_true', help='Extract each result as it finishes and analyse each group once complete')
+    parser.add_argument('--screen-tolerance', type=float, default=CONFIG['screening_tolerance'], help='Percent change that promotes a screened variant')
+    parser.add_argument('--retries', type=int, default=CONFIG['max_retries'], help='Retries per failed simulation')
+    parser.add_argument('--samples', type=int, default=64, help='Sobol base samples (N); runs up to N x (factors + 2) simulations')
+    parser.add_argument('--resamples', type=int, default=1000, help='Sobol bootstrap resamples')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for sampling')
+    parser.add_argument('--backend', choices=['subprocess', 'api'], default=CONFIG['backend'], help='How EnergyPlus is run')
+    parser.add_argument('--artifact-store', default=CONFIG['artifact_store'], help='Compress finished runs into this store (removes parametric/outputs/<variant>)')
+    parser.add_argument('--scratch', default=CONFIG['scratch_dir'], help='Fast local directory (e.g. /dev/shm) to run simulations in')
+    parser.add_argument('--scratch-limit', type=int, default=CONFIG['scratch_limit_mb'], help='MB of scratch space concurrent jobs may use')
+    parser.add_argument('--metrics-port', type=int, default=CONFIG['metrics_port'], help='Serve Prometheus metrics on this localhost port during run/resume')
+    parser.add_argument('--variants', nargs='*', default=None, help='Variant ids or run directories/ESO/CSV files to diff, or variant ids for cube (default: all variants)')
+    parser.add_argument('--base', default=None, help='Run to diff against (default: the Case 600 base run)')
+    parser.add_argument('--top', type=int, default=10, help='Most divergent days reported per variable')
+    parser.add_argument('--tolerance', type=float, default=CONFIG['convergence_tolerance'], help='Percent change in annual loads that counts as converged')
+    parser.add_argument('--budget', type=int, default=CONFIG['calibration_budget'], help='Max new simulations for calibrate')
+    parser.add_argument('--population', type=int, default=CONFIG['calibration_population'], help='Designs per calibration generation')
+    parser.add_argument('--port', type=int, default=CONFIG['daemon_port'], help='Variant daemon port for serve/query')
+    parser.add_argument('--spec', default=None, help="query: JSON variant spec, e.g. '{\"modifications\": {\"TIMESTEP\": {\"fields\": [0], \"values\": [12]}}}'")
+    parser.add_argument('--energyplus', nargs='+', default=CONFIG['energyplus_versions'], help='versions: EnergyPlus executables to compare, reference first')
+    parser.add_argument('--fake-api', action='store_true', help='Use the local pyenergyplus stand-in for the api backend')
     
     args = parser.parse_args()
-    CONFIG['max_parallel'] = args.parallel
+    # The calibrated layout only matters to commands that launch simulations (cpu_layout measures it)
+    simulates = args.command in ('run', 'resume', 'run_full', 'sobol', 'benchmark', 'converge', 'calibrate', 'serve', 'versions')
+    if simulates and args.parallel is None and args.threads is None:
+        from parametric.cpu_budget import apply_layout
+        apply_layout()
+    if args.parallel is not None:
+        CONFIG['max_parallel'] = args.parallel
+    if args.threads is not None:
+        CONFIG['threads_per_job'] = args.threads
+    CONFIG['pin_cpus'] = not args.no_pin
+    CONFIG['screening_tolerance'] = args.screen_tolerance
+    CONFIG['max_retries'] = args.retries
+    CONFIG['backend'] = args.backend
+    CONFIG['artifact_store'] = args.artifact_store
+    CONFIG['scratch_dir'] = args.scratch
+    CONFIG['scratch_limit_mb'] = args.scratch_limit
+    CONFIG['metrics_port'] = args.metrics_port
+    if args.fake_api:
+        CONFIG['pyenergyplus_module'] = 'parametric.fake_pyenergyplus'
     
     if args.command == 'clean':
         return clean()
     elif args.command == 'run':
-        return run()
+        return run(args.screen, pipeline=args.pipeline)
+    elif args.command == 'resume':
+        return run(args.screen, resume=True, pipeline=args.pipeline)
     elif args.command == 'analyze':
         csv_file = Path("parametric/results/results.csv")
         if csv_file.exists():
@@ -47,9 +94,55 @@ def main():
         else:
             print("No results.csv found. Run simulations first.")
             return False
+    elif args.command == 'sobol':
+        df = run_sobol(args.samples, args.resamples, args.seed)
+        return not df.empty
+    elif args.command == 'benchmark':
+        from parametric.benchmark import benchmark_backends
+        df = benchmark_backends()
+        return not df.empty
+    elif args.command == 'diff':
+        from parametric.diff import diff_sweep
+        df = diff_sweep(args.variants, args.base, args.top)
+        return not df.empty
+    elif args.command == 'converge':
+        from parametric.convergence import run_convergence
+        df = run_convergence(args.tolerance)
+        return not df.empty
+    elif args.command == 'calibrate':
+        from parametric.calibration import run_calibration
+        df = run_calibration(args.budget, args.population, args.seed)
+        return not df.empty
+    elif args.command == 'serve':
+        from parametric.daemon import serve
+        return serve(args.port)
+    elif args.command == 'query':
+        import json
+        from parametric.daemon import query
+        spec = json.loads(args.spec) if args.spec else {'variants': args.variants or []}
+        result = query(spec, args.port)
+        print(json.dumps(result, indent=2))
+        return result['status'] == 'success'
+    elif args.command == 'cube':
+        from parametric.cube import run_cube
+        stats = run_cube(args.variants)
+        return bool(stats) and not stats['peaks'].empty
+    elif args.command == 'versions':
+        from parametric.versions import run_version_matrix
+        df = run_version_matrix(args.energyplus, args.variants)
+        return not df.empty
+    elif args.command == 'cpu_layout':
+        from parametric.cpu_budget import calibrate_layouts
+        df = calibrate_layouts()
+        return not df.empty
     elif args.command == 'run_full':
         clean()
-        sim_results = run_simulations()
+        if args.pipeline:
+            if run(args.screen, pipeline=True):
+                print("Complete")
+                return True
+            return False
+        sim_results = run_simulations(args.screen)
         if sim_results:
             df = extract_all_results(sim_results)
             if not df.empty and analyze_results(df):
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+
+import json
+import zipfile
+import numpy as np
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from parametric.utils import file_hash
+
+WORKBOOK = 'results/RESULTS5-2A-Update.xlsx'
+CACHE_DIR = 'results/reference_cache'
+# Bump when compile_reference changes what it writes to the cache
+REFERENCE_CACHE_VERSION = 2
+
+NS = {'m': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+      'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+      'rel': 'http://schemas.openxmlformats.org/package/2006/relationships'}
+
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june',
+          'july', 'august', 'september', 'october', 'november', 'december']
+MONTH_CODES = {m[:3]: i + 1 for i, m in enumerate(MONTHS)}
+
+# Per-tool sheets follow the Standard 140 output template (Sec5-2Aout):
+# (metric, value column, first time column, unit, category, type)
+ANNUAL_COLUMNS = [
+    ('annual_heating_load', 'C', None, 'MWh', 'annual_loads', 'total'),
+    ('annual_sensible_cooling_load', 'D', None, 'MWh', 'annual_loads', 'total'),
+    ('peak_heating_load', 'E', 'F', 'kW', 'annual_peak_loads', 'peak_with_time'),
+    ('peak_sensible_cooling_load', 'I', 'J', 'kW', 'annual_peak_loads', 'peak_with_time')
+]
+FREE_FLOAT_COLUMNS = [
+    ('free_float_mean_temperature', 'C', None, '°C', 'free_float_temperatures', 'total'),
+    ('free_float_min_temperature', 'D', 'E', '°C', 'free_float_temperatures', 'peak_with_time'),
+    ('free_float_max_temperature', 'H', 'I', '°C', 'free_float_temperatures', 'peak_with_time')
+]
+SKY_COLUMNS = [
+    ('sky_temperature_average', 'C', None, '°C', 'sky_temperature', 'total'),
+    ('sky_temperature_minimum', 'D', 'E', '°C', 'sky_temperature', 'peak_with_time'),
+    ('sky_temperature_maximum', 'H', 'I', '°C', 'sky_temperature', 'peak_with_time')
+]
+# (data type, value column, first time column, unit) for Case 600 and Case 900
+MONTHLY_COLUMNS = {
+    '600': [('heating_loads', 'C', None, 'kWh'), ('cooling_loads', 'D', None, 'kWh'),
+            ('peak_heating_loads', 'E', 'F', 'kW'), ('peak_cooling_loads', 'H', 'I', 'kW')],
+    '900': [('heating_loads', 'K', None, 'kWh'), ('cooling_loads', 'L', None, 'kWh'),
+            ('peak_heating_loads', 'M', 'N', 'kW'), ('peak_cooling_loads', 'P', 'Q', 'kW')]
+}
+# Specific-day hourly blocks, in sheet order: (first column, last column, quantity, day)
+HOURLY_BLOCKS = [
+    [('C', 'E', 'incident_solar', 'may04'), ('F', 'H', 'incident_solar', 'jul14'),
+     ('I', 'I', 'sky_temperature', 'feb01'), ('J', 'J', 'sky_temperature', 'may04'),
+     ('K', 'K', 'sky_temperature', 'jul14'), ('L', 'N', 'transmitted_solar', 'feb01'),
+     ('O', 'Q', 'transmitted_solar', 'may04'), ('R', 'T', 'transmitted_solar', 'jul14')],
+    [('C', 'N', 'zone_load', 'feb01'), ('O', 'X', 'zone_load', 'jul14'),
+     ('Y', 'Z', 'zone_temperature', 'feb01')],
+    [('C', 'D', 'free_float_temperature', 'feb01'), ('E', 'F', 'free_float_temperature', 'jul14'),
+     ('G', 'H', 'free_float_temperature', 'feb01')]
+]
+SURFACES = {'HORZ.': 'horizontal', 'NORTH': 'north', 'EAST': 'east', 'SOUTH': 'south', 'WEST': 'west'}
+
+def col_index(letters):
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    return index
+
+class Workbook:
+    # Just enough of the xlsx format to read cell values, without openpyxl
+    def __init__(self, path):
+        self.zip = zipfile.ZipFile(path)
+        self.strings = [''.join(t.text or '' for t in si.iter(f"{{{NS['m']}}}t"))
+                        for si in ET.fromstring(self.zip.read('xl/sharedStrings.xml')).findall('m:si', NS)]
+        rels = ET.fromstring(self.zip.read('xl/_rels/workbook.xml.rels'))
+        targets = {rel.get('Id'): rel.get('Target') for rel in rels.findall('rel:Relationship', NS)}
+        workbook = ET.fromstring(self.zip.read('xl/workbook.xml'))
+        self.sheets = {sheet.get('name'): 'xl/' + targets[sheet.get(f"{{{NS['r']}}}id")]
+                       for sheet in workbook.find('m:sheets', NS)}
+
+    def rows(self, name):
+        rows = {}
+        for _, cell in ET.iterparse(self.zip.open(self.sheets[name])):
+            if cell.tag != f"{{{NS['m']}}}c":
+                continue
+            value = cell.find('m:v', NS)
+            if value is not None:
+                ref = cell.get('r')
+                split = len(ref.rstrip('0123456789'))
+                text = self.strings[int(value.text)] if cell.get('t') == 's' else value.text
+                rows.setdefault(int(ref[split:]), {})[col_index(ref[:split])] = text
+            cell.clear()
+        return rows
+
+def number(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return np.nan
+
+def timestamp(row, column, with_month=True):
+    # Peak times are month code, day, hour (monthly tables omit the month)
+    if column is None:
+        return (np.nan, np.nan, np.nan)
+    start = col_index(column)
+    month = MONTH_CODES.get(str(row.get(start, '')).strip()[:3].lower(), np.nan) if with_month else np.nan
+    offset = 1 if with_month else 0
+    return (month, number(row.get(start + offset)), number(row.get(start + offset + 1)))
+
+def label(row, column='B'):
+    return str(row.get(col_index(column), '') or '').strip()
+
+def block_after(rows, header):
+    # Data rows follow a header row until the first row with an empty label
+    r = header + 1
+    while label(rows.get(r, {})):
+        yield r, rows[r]
+        r += 1
+
+def tool_sheet(rows):
+    # Returns {(case, metric, month): (unit, category, type, (value, month, day, hour))} and hourly series
+    values = {}
+    hourly = {}
+
+    def put(case, metric, month, unit, category, kind, row, value_col, time_col, with_month=True):
+        values[(case, metric, month)] = (unit, category, kind,
+                                         (number(row.get(col_index(value_col))),) + timestamp(row, time_col, with_month))
+
+    case_headers = [r for r in sorted(rows) if label(rows[r]) == 'CASE#']
+    conditioned, free_float, sky = case_headers[:3]
+
+    for _, row in block_after(rows, conditioned):
+        for metric, value_col, time_col, unit, category, kind in ANNUAL_COLUMNS:
+            put(label(row), metric, '', unit, category, kind, row, value_col, time_col)
+    for _, row in block_after(rows, free_float):
+        for metric, value_col, time_col, unit, category, kind in FREE_FLOAT_COLUMNS:
+            put(label(row), metric, '', unit, category, kind, row, value_col, time_col)
+    for _, row in block_after(rows, sky):
+        for metric, value_col, time_col, unit, category, kind in SKY_COLUMNS:
+            put(label(row), metric, '', unit, category, kind, row, value_col, time_col)
+
+    # Solar: incident by surface for Case 600, transmitted as "case/surface" rows
+    transmitted = {}
+    for r in sorted(rows):
+        text = label(rows[r])
+        if text in SURFACES:
+            put('600', f"annual_incident_solar_{SURFACES[text]}", '', 'kWh/m2', 'solar_radiation', 'total',
+                rows[r], 'C', None)
+        elif '/' in text and text.split('/')[0].isdigit():
+            case, surface = text.split('/')
+            surface = surface.strip().lower()
+            put(case, f"annual_transmitted_solar_{surface}", '', 'kWh/m2', 'solar_radiation', 'total',
+                rows[r], 'C', None)
+            transmitted[(case, surface)] = number(rows[r].get(col_index('C')))
+
+    # Derived as in Tables B8-11 and B8-12
+    incident = {s: values[('600', f"annual_incident_solar_{s}", '')][3][0]
+                for s in SURFACES.values() if ('600', f"annual_incident_solar_{s}", '') in values}
+    shaded_pairs = {'610': '600', '630': '620'}
+    for (case, surface), value in transmitted.items():
+        nan_time = (np.nan, np.nan, np.nan)
+        if case in shaded_pairs:
+            unshaded = transmitted.get((shaded_pairs[case], surface), np.nan)
+            values[(case, f"shading_coefficient_{surface}", '')] = (
+                'dimensionless', 'solar_radiation', 'total', (1 - value / unshaded,) + nan_time)
+        elif surface in incident:
+            values[(case, f"transmissivity_coefficient_{surface}", '')] = (
+                'dimensionless', 'solar_radiation', 'total', (value / incident[surface],) + nan_time)
+
+    month_header = next(r for r in sorted(rows) if label(rows[r]) == 'Month')
+    for r in range(month_header + 1, month_header + 13):
+        month = MONTHS[MONTH_CODES[label(rows[r])[:3].lower()] - 1]
+        for case, columns in MONTHLY_COLUMNS.items():
+            for data_type, value_col, time_col, unit in columns:
+                kind = 'peak_with_time' if time_col else 'total'
+                category = 'monthly_peak_loads' if time_col else 'monthly_loads'
+                put(case, f"monthly_{data_type}", month, unit, category, kind, rows[r], value_col, time_col, with_month=False)
+
+    hour_headers = [r for r in sorted(rows) if label(rows[r]) == 'HOUR']
+    for header, block in zip(hour_headers, HOURLY_BLOCKS):
+        names, units = rows.get(header - 1, {}), rows[header]
+        for first, last, quantity, day in block:
+            for col in range(col_index(first), col_index(last) + 1):
+                name = str(names.get(col, '')).strip()
+                if not name:
+                    continue
+                if quantity == 'incident_solar':
+                    case, series = '600', f"incident_solar_{name.lower()}"
+                else:
+                    case, series = name, quantity
+                hourly[(case, series, day)] = (str(units.get(col, '')).strip(),
+                                               [number(rows.get(header + h, {}).get(col)) for h in range(1, 25)])
+
+    return values, hourly
+
+def compile_reference(workbook=WORKBOOK, cache_dir=CACHE_DIR):
+    book = Workbook(workbook)
+
+    # The results tables list the reference programs in their header row
+    header = book.rows('Tables 1')[8]
+    tools = [header[c].strip() for c in sorted(header) if c > 2 and header[c].strip() in book.sheets]
+
+    per_tool = {tool: tool_sheet(book.rows(tool)) for tool in tools}
+    keys = sorted({k for values, _ in per_tool.values() for k in values})
+    series = sorted({k for _, hourly in per_tool.values() for k in hourly})
+
+    values = np.full((len(keys), len(tools), 4), np.nan)
+    hourly = np.full((len(series), len(tools), 24), np.nan)
+    entries = []
+    for i, key in enumerate(keys):
+        meta = None
+        for j, tool in enumerate(tools):
+            found = per_tool[tool][0].get(key)
+            if found:
+                meta = found[:3]
+                values[i, j] = found[3]
+        entries.append(list(key) + list(meta))
+    hourly_entries = []
+    for i, key in enumerate(series):
+        unit = ''
+        for j, tool in enumerate(tools):
+            found = per_tool[tool][1].get(key)
+            if found:
+                unit = found[0]
+                hourly[i, j] = found[1]
+        hourly_entries.append(list(key) + [unit])
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(cache_dir / 'reference.npz', values=values, hourly=hourly)
+    index = {
+        'workbook': Path(workbook).name,
+        'workbook_sha256': file_hash(workbook),
+        'cache_version': REFERENCE_CACHE_VERSION,
+        'tools': tools,
+        'entries': entries,
+        'hourly': hourly_entries
+    }
+    # Index last: a cache without a matching index is always rebuilt
+    with open(cache_dir / 'index.json', 'w') as f:
+        json.dump(index, f)
+    return index
+
+def cache_is_current(workbook=WORKBOOK, cache_dir=CACHE_DIR):
+    index_file = Path(cache_dir) / 'index.json'
+    if not index_file.exists() or not (Path(cache_dir) / 'reference.npz').exists():
+        return False
+    with open(index_file, 'r') as f:
+        index = json.load(f)
+    return index.get('cache_version') == REFERENCE_CACHE_VERSION and index.get('workbook_sha256') == file_hash(workbook)
+
+def ingest(workbook=WORKBOOK, cache_dir=CACHE_DIR, force=False):
+    if not force and cache_is_current(workbook, cache_dir):
+        return False
+    compile_reference(workbook, cache_dir)
+    return True
+
+def statistics(values):
+    valid = values[~np.isnan(values)]
+    if not len(valid):
+        return None
+    low, high, mean = float(valid.min()), float(valid.max()), float(valid.mean())
+    return {'min': low, 'max': high, 'mean': mean,
+            'range_percent': round(abs(high - low) / abs(mean) * 100, 1) if mean else None}
+
+def reference_value(row, kind, monthly):
+    value, month, day, hour = (None if np.isnan(x) else float(x) for x in row)
+    if kind != 'peak_with_time':
+        return value
+    entry = {'value': value}
+    if not monthly:
+        entry['month'] = MONTHS[int(month) - 1][:3].title() if month else None
+    entry['day'] = int(day) if day is not None else None
+    entry['hour'] = int(hour) if hour is not None else None
+    return entry
+
+def load_reference(workbook=WORKBOOK, cache_dir=CACHE_DIR):
+    # Same layout as OTHER_TOOLS.json, plus every case under 'cases' and the hourly series
+    if Path(workbook).exists():
+        ingest(workbook, cache_dir)
+    cache_dir = Path(cache_dir)
+    with open(cache_dir / 'index.json', 'r') as f:
+        index = json.load(f)
+    arrays = np.load(cache_dir / 'reference.npz')
+    values, hourly_values = arrays['values'], arrays['hourly']
+    tools = index['tools']
+
+    cases = {}
+    for row, (case, metric, month, unit, category, kind) in zip(values, index['entries']):
+        present = ~np.isnan(row[:, 0])
+        stats = statistics(row[:, 0])
+        if stats is None:
+            continue
+        ref_values = {tool: reference_value(row[j], kind, bool(month)) for j, tool in enumerate(tools) if present[j]}
+        case_ref = cases.setdefault(case, {'metrics': {}, 'monthly_data': {}})
+        if month:
+            data_type = metric[len('monthly_'):]
+            monthly = case_ref['monthly_data'].setdefault(data_type, {
+                'case': case, 'unit': unit, 'category': category, 'required_output': False, 'months': {}})
+            monthly['months'][month] = {'reference_values': ref_values, 'statistics': stats}
+        else:
+            case_ref['metrics'][metric] = {
+                'case': case, 'unit': unit, 'category': category, 'type': kind,
+                'required_output': case in ('600', '600FF'), 'reference_values': ref_values, 'statistics': stats}
+
+    hourly = {}
+    for series, (case, quantity, day, unit) in zip(hourly_values, index['hourly']):
+        hourly.setdefault(case, {}).setdefault(quantity, {})[day] = {'unit': unit, 'tools': tools, 'values': series}
+
+    # Month order matters for plots and reports
+    for case_ref in cases.values():
+        for monthly in case_ref['monthly_data'].values():
+            monthly['months'] = {m: monthly['months'][m] for m in MONTHS if m in monthly['months']}
+
+    return {
+        'metadata': {
+            'title': 'BESTEST Complete Reference Data',
+            'description': f"Compiled from {index['workbook']}",
+            'reference_tools': tools,
+            'cases': sorted(cases),
+            'workbook_sha256': index['workbook_sha256']
+        },
+        # Cases 600/600FF at the top level keep the OTHER_TOOLS.json layout
+        'metrics': {**cases.get('600', {}).get('metrics', {}), **cases.get('600FF', {}).get('metrics', {})},
+        'monthly_data': cases.get('600', {}).get('monthly_data', {}),
+        'cases': cases,
+        'hourly': hourly
+    }
+
+def main():
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compile the ASHRAE 140 results workbook into a reference cache')
+    parser.add_argument('--workbook', default=WORKBOOK, help='RESULTS5-2A workbook (.xlsx)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='Where to write index.json and reference.npz')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if the workbook is unchanged')
+    args = parser.parse_args()
+
+    start = time.time()
+    if not ingest(args.workbook, args.cache_dir, args.force):
+        print(f"Reference cache up to date ({args.cache_dir})")
+        return
+    elapsed = time.time() - start
+
+    start = time.time()
+    reference = load_reference(args.workbook, args.cache_dir)
+    load_time = time.time() - start
+
+    n_metrics = sum(len(c['metrics']) + sum(len(m['months']) for m in c['monthly_data'].values())
+                    for c in reference['cases'].values())
+    n_hourly = sum(len(days) for case in reference['hourly'].values() for days in case.values())
+    print(f"Compiled {n_metrics} metrics and {n_hourly} hourly series for {len(reference['cases'])} cases "
+          f"from {len(reference['metadata']['reference_tools'])} tools in {elapsed:.2f}s")
+    print(f"Cache loads in {load_time * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
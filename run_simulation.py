@@ -2,12 +2,22 @@
 
 import subprocess
 import os
+import time
 import sys
+import json
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def run_simulation(idf_file, output_dir):
-    energyplus = "/Applications/EnergyPlus-25-1-0/energyplus"
-    weather = "weather_files/BESTEST.epw"
-    
+import pandas as pd
+
+import extract_results
+from parametric.versions import detect_version, eso_version, versioned_idf
+
+ENERGYPLUS = os.environ.get('ENERGYPLUS_EXE', "/Applications/EnergyPlus-25-1-0/energyplus")
+WEATHER = "weather_files/BESTEST.epw"
+
+def run_simulation(idf_file, output_dir, weather=WEATHER, energyplus=ENERGYPLUS):
     if not os.path.exists(idf_file):
         print(f"Missing: {idf_file}")
         return False
@@ -17,13 +27,13 @@ def run_simulation(idf_file, output_dir):
     if not os.path.exists(energyplus):
         print(f"Missing: {energyplus}")
         return False
-    
+
     os.makedirs(output_dir, exist_ok=True)
-    
+
     try:
         cmd = [energyplus, "-w", weather, "-d", output_dir, idf_file]
         result = subprocess.run(cmd, capture_output=True, text=True)
-        
+
         if result.returncode == 0:
             print(f"Done: {output_dir}")
             return True
@@ -36,19 +46,164 @@ def run_simulation(idf_file, output_dir):
         print(f"Error: {e}")
         return False
 
-def main():
-    cases = [
-        ("idf_files/Case600_EnergyPlus-25-1-0.idf", "Case600_output"),
-        ("idf_files/Case600FF_EnergyPlus-25-1-0.idf", "Case600FF_output")
-    ]
-    
+def case_name(idf_file):
+    # idf_files/Case600FF_EnergyPlus-25-1-0.idf -> Case600FF
+    return Path(idf_file).stem.split('_')[0]
+
+def expand_matrix(idf_files, weather_files, output_root, version=None):
+    cells = []
+    for weather in weather_files:
+        for idf in idf_files:
+            case = case_name(idf)
+            cells.append({
+                'case': case,
+                'weather': Path(weather).stem,
+                # A case file written for this version is preferred when it exists
+                'idf': str(versioned_idf(idf, version)),
+                'epw': str(weather),
+                'output_dir': str(Path(output_root) / Path(weather).stem / case)
+            })
+    return cells
+
+def run_cell(cell):
+    start = time.time()
+    ok = run_simulation(cell['idf'], cell['output_dir'], cell['epw'], cell['energyplus'])
+    return cell, ok, time.time() - start
+
+def extract_cell(cell):
+    results_dir = Path(cell['results_root']) / cell['weather']
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    eso_file = Path(cell['output_dir']) / 'eplusout.eso'
+    try:
+        metrics = extract_results.extract_case(eso_file, cell['case'], results_dir / f"{cell['case']}.csv")
+    except Exception as e:
+        print(f"Error extracting {cell['output_dir']}: {e}")
+        return None
+    if metrics is None:
+        return None
+
+    with open(Path(cell['output_dir']) / 'metrics.json', 'w') as f:
+        json.dump(metrics, f, indent=2, default=float)
+    return metrics
+
+def run_matrix(idf_files, weather_files, output_root='outputs', results_root='results', parallel=4, energyplus=ENERGYPLUS):
+    # Several executables make a version matrix: outputs/<version>/<weather>/<case> and
+    # results/<version>/<weather>/, every cell on the same pool
+    executables = [energyplus] if isinstance(energyplus, str) else list(energyplus)
+    engines = {}
+    for exe in executables:
+        version = detect_version(exe) or Path(exe).parent.name
+        if version in engines:
+            print(f"  {exe}: version {version} already covered by {engines[version]}")
+            continue
+        engines[version] = exe
+    matrix = len(engines) > 1
+
+    cells = []
+    for version, exe in engines.items():
+        root = Path(output_root) / version if matrix else Path(output_root)
+        for cell in expand_matrix(idf_files, weather_files, root, version):
+            cell.update(version=version, energyplus=exe,
+                        results_root=str(Path(results_root) / version if matrix else Path(results_root)))
+            cells.append(cell)
+    versions = f" x {len(engines)} EnergyPlus versions" if matrix else ""
+    print(f"Running {len(cells)} simulations ({len(idf_files)} cases x {len(weather_files)} weather files{versions})...")
+
+    remaining = {}
+    for cell in cells:
+        key = (cell['version'], cell['weather'])
+        remaining[key] = remaining.get(key, 0) + 1
+    weather_data = {key: {} for key in remaining}
+    eso_versions = {key: set() for key in remaining}
+    runs = []
+
     success = 0
-    for idf, output in cases:
-        if run_simulation(idf, output):
-            success += 1
-    
-    print(f"Completed {success}/{len(cases)} simulations")
-    return success == len(cases)
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        futures = [pool.submit(run_cell, cell) for cell in cells]
+        for future in as_completed(futures):
+            cell, ok, seconds = future.result()
+            key = (cell['version'], cell['weather'])
+            runs.append({'version': cell['version'], 'weather': cell['weather'], 'case': cell['case'],
+                         'status': 'success' if ok else 'failed', 'runtime': seconds})
+            if ok:
+                success += 1
+                metrics = extract_cell(cell)
+                if metrics:
+                    weather_data[key][cell['case']] = metrics
+                    eso_versions[key].add(eso_version(Path(cell['output_dir']) / 'eplusout.eso'))
+
+            # Write the weather's results once all of its cases are done
+            remaining[key] -= 1
+            if remaining[key] == 0 and weather_data[key]:
+                json_file = Path(cell['results_root']) / cell['weather'] / 'FORMATTED_RESULTS.json'
+                # The version the ESOs report, else the one the executable reported
+                version = ', '.join(sorted(v for v in eso_versions[key] if v)) or cell['version']
+                extract_results.generate_bestest_json(weather_data[key], json_file, version)
+                print(f"Results: {json_file}")
+
+    extract_results.EXTRACTION_CACHE.flush()
+    print(f"Completed {success}/{len(cells)} simulations")
+    if matrix:
+        compare_versions(runs, weather_data, list(engines), results_root)
+    return success == len(cells)
+
+def compare_versions(runs, weather_data, versions, results_root='results'):
+    # Metrics and runtimes side by side per case, plus BESTEST pass counts per version
+    from analyze import BatchValidation
+
+    rows = []
+    for (version, weather), cases in weather_data.items():
+        for case, metrics in cases.items():
+            for metric, value in metrics.items():
+                if isinstance(value, (int, float)):
+                    rows.append({'weather': weather, 'case': case, 'metric': metric, 'version': version, 'value': value})
+    runtimes = pd.DataFrame(runs)
+    for _, run in runtimes.iterrows():
+        rows.append({'weather': run['weather'], 'case': run['case'], 'metric': 'runtime_seconds',
+                     'version': run['version'], 'value': run['runtime']})
+    table = pd.DataFrame(rows).pivot_table(index=['weather', 'case', 'metric'], columns='version', values='value')
+    table = table[[v for v in versions if v in table.columns]]
+    reference = table.columns[0]
+    for version in table.columns[1:]:
+        table[f"{version} vs {reference} (%)"] = (table[version] - table[reference]) / table[reference].abs() * 100
+    table.to_csv(Path(results_root) / 'version_comparison.csv')
+
+    json_files = [Path(results_root) / version / weather / 'FORMATTED_RESULTS.json'
+                  for version in versions for weather in sorted({w for v, w in weather_data if v == version})]
+    json_files = [path for path in json_files if path.exists()]
+    if json_files:
+        matrix, passes = BatchValidation().run(json_files, Path(results_root) / 'version_validation')
+        evaluated = (matrix != '').sum(axis=1)
+        passed = (matrix == 'pass').sum(axis=1)
+        for name in matrix.index:
+            print(f"  {name}: {passed[name]}/{evaluated[name]} BESTEST metrics within range")
+
+    for version in table.columns[:len(versions)]:
+        runtime = runtimes[(runtimes['version'] == version) & (runtimes['status'] == 'success')]['runtime']
+        print(f"  {version}: mean runtime {runtime.mean():.1f}s over {len(runtime)} runs")
+    print(f"Version comparison: {Path(results_root) / 'version_comparison.csv'}")
+    return table
+
+def main():
+    parser = argparse.ArgumentParser(description='Run BESTEST cases against one or more weather files')
+    parser.add_argument('--cases', nargs='+', default=None, help='Case IDFs (default: all in idf_files/)')
+    parser.add_argument('--weather', nargs='+', default=[WEATHER], help='Weather files (EPW)')
+    parser.add_argument('--output-root', default='outputs', help='Simulation output root')
+    parser.add_argument('--results-root', default='results', help='Extracted results root')
+    parser.add_argument('--parallel', type=int, default=4, help='Max parallel simulations')
+    parser.add_argument('--energyplus', nargs='+', default=[ENERGYPLUS], help='EnergyPlus executable(s); several run a version matrix')
+
+    args = parser.parse_args()
+    cases = args.cases
+    if not cases:
+        # One file per case; versioned_idf picks the copy written for each engine
+        found = {}
+        for path in sorted(Path('idf_files').glob('*.idf')):
+            found.setdefault(case_name(path), str(path))
+        cases = list(found.values())
+
+    return run_matrix(cases, args.weather, args.output_root, args.results_root, args.parallel, args.energyplus)
 
 if __name__ == "__main__":
-    sys.exit(0 if main() else 1)
\ No newline at end of file
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,34 @@
+import sys
+import shutil
+from pathlib import Path
+
+import pytest
+
+# The scripts and the parametric package import from the repository root
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+@pytest.fixture
+def sweep_dir(tmp_path, monkeypatch):
+    # A sweep tree in tmp_path: the base case and weather, the fake EnergyPlus, and the newest
+    # IDD eppy ships (eppy keeps one IDD per process, so every test uses this one)
+    import eppy
+    from parametric.config import CONFIG
+    from parametric.fake_energyplus import install
+
+    monkeypatch.chdir(tmp_path)
+    for name in (CONFIG['base_case'], CONFIG['weather_file']):
+        Path(name).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy(ROOT / name, name)
+    settings = {
+        'energyplus_exe': str(install(tmp_path / 'engines', '25.1.0')),
+        'energyplus_idd': str(Path(eppy.__file__).parent / 'resources' / 'iddfiles' / 'Energy+V9_2_0.idd'),
+        'max_parallel': 2,
+        'threads_per_job': 1,
+        'artifact_store': None,
+        'scratch_dir': None,
+        'metrics_port': None,
+    }
+    for key, value in settings.items():
+        monkeypatch.setitem(CONFIG, key, value)
+    return tmp_path
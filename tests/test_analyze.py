@@ -0,0 +1,30 @@
+import shutil
+import sys
+from pathlib import Path
+
+import analyze
+
+RESULTS = Path(__file__).resolve().parent.parent / 'results'
+
+def run_main(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ['analyze.py', '--reference', str(RESULTS / 'OTHER_TOOLS.json'), *args])
+    return analyze.main()
+
+def test_missing_results_fail(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    assert run_main(monkeypatch) == 1
+    assert f"No {analyze.LEGACY_RESULTS_FILE}" in capsys.readouterr().out
+
+def test_committed_results_are_the_fallback(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    Path('results').mkdir()
+    shutil.copy(RESULTS / 'FORMATTED_RESULTS.json', analyze.LEGACY_RESULTS_FILE)
+    assert analyze.default_results_file() == analyze.LEGACY_RESULTS_FILE
+    assert run_main(monkeypatch, '--output-dir', 'analysis') == 0
+    assert 'BESTEST validation: 14/14 passed' in capsys.readouterr().out
+    assert Path('analysis/results_report.txt').exists()
+
+    # Per-weather results take over once run_simulation.py has written them
+    Path(analyze.RESULTS_FILE).parent.mkdir()
+    shutil.copy(RESULTS / 'FORMATTED_RESULTS.json', analyze.RESULTS_FILE)
+    assert analyze.default_results_file() == analyze.RESULTS_FILE
@@ -0,0 +1,58 @@
+import pytest
+
+from parametric import api_backend
+from parametric.config import CONFIG
+
+FAKE_MODULE = 'parametric.fake_pyenergyplus'
+METRICS = ['annual_heating_load', 'annual_sensible_cooling_load']
+
+CASE_IDF = """
+Timestep,
+  4;                       !- Number of Timesteps per Hour
+
+ZoneHVAC:IdealLoadsAirSystem,
+  MAIN_ZONE Ideal Loads,   !- Name
+  ;                        !- Availability Schedule Name
+"""
+
+@pytest.fixture
+def idf_file(tmp_path):
+    path = tmp_path / 'Case600.idf'
+    path.write_text(CASE_IDF)
+    return path
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    monkeypatch.setitem(CONFIG, 'pyenergyplus_module', FAKE_MODULE)
+    monkeypatch.setitem(CONFIG, 'max_parallel', 1)
+    yield
+    api_backend.stop_api_pool(kill=True)
+
+def test_ideal_loads_keys(idf_file):
+    # parse_objects lowercases names; EnergyPlus matches keys case-insensitively
+    assert api_backend.ideal_loads_keys(idf_file) == ['main_zone ideal loads']
+
+def test_fake_simulation_collects_annual_metrics(idf_file, tmp_path):
+    outcome = api_backend.run_api_simulation(idf_file, tmp_path, 'BESTEST.epw', METRICS, FAKE_MODULE)
+    assert outcome['status'] == 'success'
+    # Warmup days are skipped: one value per system timestep of the year
+    assert outcome['steps'] == 365 * 24 * 4
+    assert outcome['metrics']['annual_heating_load'] > 0
+    assert outcome['metrics']['annual_sensible_cooling_load'] > 0
+
+def test_run_api_on_spawned_pool(fake_api, idf_file, tmp_path):
+    direct = api_backend.run_api_simulation(idf_file, tmp_path, 'BESTEST.epw', METRICS, FAKE_MODULE)
+    outcome = api_backend.run_api(idf_file, tmp_path, 'BESTEST.epw', METRICS, timeout=300)
+    assert outcome == direct
+    assert api_backend.api_pool()._mp_context.get_start_method() == 'spawn'
+
+def test_pool_is_created_once(fake_api):
+    pool = api_backend.start_api_pool()
+    assert api_backend.start_api_pool(4) is pool
+    assert api_backend.api_pool() is pool
+
+def test_run_api_timeout_stops_pool(fake_api, idf_file, tmp_path):
+    outcome = api_backend.run_api(idf_file, tmp_path, 'BESTEST.epw', METRICS, timeout=0.01)
+    assert outcome['status'] == 'failed'
+    assert outcome['reason'].startswith('timeout after')
+    assert api_backend._POOL is None
@@ -0,0 +1,41 @@
+import gzip
+from pathlib import Path
+
+from parametric import artifacts
+from parametric.config import CONFIG, STUDY_CASES
+from parametric.journal import Journal
+
+def test_store_is_opt_in():
+    assert CONFIG['artifact_store'] is None
+
+def test_harvest_keeps_compressed_eso_and_err(tmp_path):
+    output_dir = tmp_path / 'outputs' / 'Case600_1a'
+    output_dir.mkdir(parents=True)
+    for name in ('eplusout.eso', 'eplusout.err', 'eplusout.audit'):
+        (output_dir / name).write_text(f"{name}\n")
+
+    run_dir = artifacts.harvest(output_dir, '20250101-000000', store_dir=tmp_path / 'store')
+    assert sorted(p.name for p in run_dir.iterdir()) == ['eplusout.err.gz', 'eplusout.eso.gz']
+    assert not output_dir.exists()
+    with artifacts.open_eso(run_dir / 'eplusout.eso') as f:
+        assert f.read() == 'eplusout.eso\n'
+
+def test_retention_spares_the_run_resume_needs(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG, 'journal_file', str(tmp_path / 'journal.jsonl'))
+    store = tmp_path / 'store'
+    for run_id in ('20250101-000000', '20250201-000000', '20250301-000000'):
+        (store / run_id).mkdir(parents=True)
+
+    # The oldest run's sweep was interrupted after one variant
+    journal = Journal()
+    journal.new_sweep('20250101-000000')
+    journal.complete({'variant': '1a', 'status': 'success'})
+    assert journal.pending_run() == '20250101-000000'
+    assert artifacts.apply_retention(store, keep_runs=1) == ['20250201-000000']
+
+    # Once resume has finished it, the run ages out like any other
+    for variant in STUDY_CASES:
+        journal.complete({'variant': variant, 'status': 'success'})
+    assert journal.pending_run() is None
+    assert artifacts.apply_retention(store, keep_runs=1) == ['20250101-000000']
+    assert [d.name for d in store.iterdir()] == ['20250301-000000']
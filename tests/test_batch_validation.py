@@ -0,0 +1,59 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyze import BatchValidation
+
+RESULTS = Path(__file__).resolve().parent.parent / 'results'
+
+@pytest.fixture
+def validation():
+    return BatchValidation(str(RESULTS / 'OTHER_TOOLS.json'))
+
+def result_set(directory, heating, version='25.1.0'):
+    results = json.loads((RESULTS / 'FORMATTED_RESULTS.json').read_text())
+    results['metadata']['version'] = version
+    results['case_600']['annual_heating_load'] = heating
+    directory.mkdir(parents=True)
+    (directory / 'FORMATTED_RESULTS.json').write_text(json.dumps(results))
+    return directory / 'FORMATTED_RESULTS.json'
+
+def test_distance_is_in_range_widths(validation):
+    column = validation.columns.index('case_600.annual_heating_load')
+    low, high = validation.ref_min[column], validation.ref_max[column]
+    values = np.full((3, len(validation.columns)), np.nan)
+    values[:, column] = [low, high + (high - low), np.nan]
+    evaluated, within, distance = validation.validate(values)
+
+    assert within[0, column] and not within[1, column]
+    assert distance[0, column] == 0
+    assert distance[1, column] == pytest.approx(1.0)
+    # Missing values are neither passes nor failures
+    assert not evaluated[2].any() and np.isnan(distance[2]).all()
+
+def test_batch_of_result_sets_and_a_parametric_sweep(validation, tmp_path):
+    column = validation.columns.index('case_600.annual_heating_load')
+    low, high = validation.ref_min[column], validation.ref_max[column]
+    good = result_set(tmp_path / 'denver', (low + high) / 2)
+    bad = result_set(tmp_path / 'hot', high * 2, version='24.2.0')
+    sweep = tmp_path / 'parametric' / 'results' / 'results.csv'
+    sweep.parent.mkdir(parents=True)
+    pd.DataFrame({'variant': ['base', '1a'], 'annual_heating_load': [(low + high) / 2, low / 2],
+                  'annual_sensible_cooling_load': [np.nan, np.nan]}).to_csv(sweep, index=False)
+
+    matrix, passes = validation.run([good, bad, sweep], tmp_path / 'analysis')
+    assert list(matrix.index) == ['denver (25.1.0)', 'hot (24.2.0)', 'parametric:base', 'parametric:1a']
+    assert passes.tolist() == [True, False, True, False]
+    assert matrix.loc['hot (24.2.0)', 'case_600.annual_heating_load'] == 'fail'
+    # The sweep only reports annual loads; everything else is left blank
+    assert matrix.loc['parametric:base'].tolist().count('pass') == 1
+
+    summary = (tmp_path / 'analysis' / 'batch_summary.txt').read_text()
+    assert '2/4 result sets pass every evaluated metric' in summary
+    hot = next(line for line in summary.splitlines() if line.startswith('✗ hot'))
+    assert f"(worst: case_600.annual_heating_load, {high / (high - low):.2f} ranges outside)" in hot
+    distance = pd.read_csv(tmp_path / 'analysis' / 'batch_distance.csv', index_col=0)
+    assert distance.loc['parametric:1a', 'case_600.annual_heating_load'] > 0
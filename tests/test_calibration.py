@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from parametric import calibration
+from parametric.config import CONFIG
+
+REFERENCE = Path(__file__).resolve().parent.parent / 'results' / 'OTHER_TOOLS.json'
+
+@pytest.fixture
+def calibration_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(CONFIG, 'reference_file', str(REFERENCE))
+    monkeypatch.setitem(CONFIG, 'calibration_cache', str(tmp_path / 'calibration_cache.json'))
+    return tmp_path
+
+def test_every_evaluation_failing(calibration_dir, capsys):
+    df = calibration.run_calibration(budget=8, population=4, evaluate=lambda configs: {name: {} for name in configs})
+    assert df.empty
+    assert 'No successful evaluations in the first generation (4 simulated, none cached)' in capsys.readouterr().out
+    assert not (calibration_dir / 'parametric' / 'results' / 'calibration.csv').exists()
+
+def test_search_finds_the_design_at_the_reference_mean(calibration_dir):
+    targets = calibration.load_targets()
+    batches = []
+
+    def evaluate(configs):
+        # Each variant in a design moves every metric a tenth of the tools' range off the mean
+        batches.append(list(configs))
+        found = {}
+        for name in configs:
+            changed = sum(level != '0' for level in name[len('calib_'):].split('-'))
+            found[name] = {metric: mean + 0.1 * spread * changed for metric, (mean, spread) in targets.items()}
+        return found
+
+    df = calibration.run_calibration(budget=12, population=4, evaluate=evaluate)
+    assert df.iloc[0]['design'] == 'base'
+    assert df.iloc[0]['objective'] == pytest.approx(0)
+    assert df['objective'].is_monotonic_increasing
+    assert sum(len(batch) for batch in batches) <= 12
+    assert (calibration_dir / 'parametric' / 'results' / 'calibration.csv').exists()
+
+    # Scored designs come from the cache on the next run: only new designs are simulated
+    first = {name for batch in batches for name in batch}
+    batches.clear()
+    again = calibration.run_calibration(budget=12, population=4, evaluate=evaluate)
+    assert not first & {name for batch in batches for name in batch}
+    assert set(df['design']) <= set(again['design'])
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from parametric import simulation
+from parametric.canonical import canonicalize_idf, canonical_hash, describe_modifications
+from parametric.config import CONFIG, STUDY_CASES
+
+BASE = """
+  Timestep,4;
+  Building,
+    BESTEST Case 600,        !- Name
+    0,                       !- North Axis {deg}
+    Country,                 !- Terrain
+    ,                        !- Loads Convergence Tolerance Value {W}
+    ,                        !- Temperature Convergence Tolerance Value {deltaC}
+    FullExterior;            !- Solar Distribution
+  ShadowCalculation,PolygonClipping,Periodic,20;
+  Output:Variable,*,Zone Mean Air Temperature,Hourly;
+"""
+
+def digest(text):
+    return canonical_hash(canonicalize_idf(text))
+
+def test_presentation_does_not_change_the_model():
+    # Reordered, reformatted, respelled numbers, defaults written out, outputs dropped
+    same = """! Case 600, tidied
+  Building,BESTEST CASE 600,0.0,Country,0.04,0.4,FullExterior;
+  SHADOWCALCULATION, PolygonClipping, Periodic, 20.0;
+  Timestep, 4.0;
+"""
+    assert digest(same) == digest(BASE)
+
+def test_physics_changes_the_model():
+    assert digest(BASE.replace('Timestep,4;', 'Timestep,6;')) != digest(BASE)
+    assert digest(BASE.replace('Country,', 'City,')) != digest(BASE)
+
+def test_update_frequency_is_irrelevant_when_shading_updates_every_timestep():
+    every_step = BASE.replace('Periodic,20', 'Timestep,20')
+    assert digest(every_step.replace('Timestep,20', 'Timestep,7')) == digest(every_step)
+    assert digest(BASE.replace('Periodic,20', 'Periodic,7')) != digest(BASE)
+
+def test_variants_identical_to_earlier_models_are_reused(sweep_dir, monkeypatch):
+    monkeypatch.setitem(STUDY_CASES, 'tol_default', {'description': 'Loads tolerance: default',
+                                                     'modifications': {'BUILDING': {'fields': [3], 'values': [0.04]}}})
+    monkeypatch.setitem(STUDY_CASES, '6b_again', {'description': 'Terrain: City again',
+                                                  'modifications': {'BUILDING': {'fields': [2], 'values': ['City']}}})
+    variants = ['tol_default', '6b', '6b_again', '1a']
+    reused, variant_files = simulation.find_reusable_variants(Path(CONFIG['base_case']), variants)
+
+    assert {v: source for v, (source, _) in reused.items()} == {'tol_default': 'base', '6b_again': '6b'}
+    assert reused['tol_default'][1] == f"{describe_modifications(STUDY_CASES['tol_default'])} gives a model identical to base"
+    # Every variant file is kept for the pool, so nothing is built twice
+    assert list(variant_files) == variants
+    assert all(path.exists() for path in variant_files.values())
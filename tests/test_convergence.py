@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from parametric.convergence import OUTPUTS, extrapolate, observed_order, run_convergence
+
+EXACT = {'annual_heating_load': 4.0, 'annual_sensible_cooling_load': 6.0}
+
+def second_order(steps):
+    # Loads converging as h^2 onto EXACT, step size 1/steps hours
+    return {output: value * (1 + 0.5 / steps ** 2) for output, value in EXACT.items()}
+
+def test_richardson_recovers_the_order_and_limit():
+    steps = [4, 6, 10]
+    values = [second_order(n)['annual_heating_load'] for n in steps]
+    assert observed_order(values, [1 / n for n in steps]) == pytest.approx(2, abs=1e-6)
+    value, order = extrapolate(values, steps)
+    assert value == pytest.approx(4.0)
+    assert order == pytest.approx(2, abs=1e-6)
+
+def test_oscillating_sequence_falls_back_to_first_order():
+    value, order = extrapolate([1.0, 2.0, 1.5], [1, 2, 4])
+    assert order == 1.0
+    assert value == pytest.approx(1.0)
+
+def test_refinement_stops_once_within_tolerance(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    batches = []
+
+    def evaluate(configs):
+        batches.append(list(configs))
+        return {name: second_order(int(name[len('ts_'):])) for name in configs}
+
+    df = run_convergence(tolerance=0.5, ladder=[1, 2, 4, 6, 10, 12, 60], evaluate=evaluate)
+    # 4 -> 6 steps changes the loads by 1.7%, 6 -> 10 by 0.9%, 10 -> 12 by 0.15%
+    assert batches == [['ts_1', 'ts_2', 'ts_4'], ['ts_6'], ['ts_10'], ['ts_12']]
+    assert df['steps_per_hour'].tolist() == [1, 2, 4, 6, 10, 12]
+    assert df['within_tolerance'].tolist() == [False, False, False, False, True, True]
+
+    report = (tmp_path / 'parametric' / 'results' / 'timestep_convergence.txt').read_text()
+    assert '(converged, stopped early)' in report
+    assert 'Cheapest timestep within tolerance: 10 steps/hour' in report
+
+def test_failed_runs_are_skipped(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+
+    def evaluate(configs):
+        return {name: ({} if name == 'ts_2' else second_order(int(name[len('ts_'):]))) for name in configs}
+
+    df = run_convergence(tolerance=0.01, ladder=[1, 2, 4], evaluate=evaluate)
+    assert '✗ 2 steps/hour failed, skipping' in capsys.readouterr().out
+    assert df['steps_per_hour'].tolist() == [1, 4]
+
+def test_sweep_against_the_fake_engine(sweep_dir):
+    df = run_convergence(tolerance=100, ladder=[1, 2, 4])
+    assert df['steps_per_hour'].tolist() == [1, 2, 4]
+    assert all(df[output].gt(0).all() for output in OUTPUTS)
+    assert pd.read_csv(sweep_dir / 'parametric' / 'results' / 'timestep_convergence.csv').shape[0] == 3
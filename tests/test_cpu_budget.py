@@ -0,0 +1,59 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from parametric import cpu_budget
+from parametric.config import CONFIG
+
+TWO_NODES = [list(range(6)), list(range(6, 12))]
+
+def test_parse_cpulist():
+    assert cpu_budget.parse_cpulist('0-3,8-9,12\n') == [0, 1, 2, 3, 8, 9, 12]
+
+def test_blocks_stay_inside_a_node():
+    slots = cpu_budget.plan_slots(4, 3, list(range(12)), TWO_NODES)
+    assert slots == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9, 10, 11]]
+
+def test_leftover_cores_form_cross_node_blocks_before_wrapping():
+    # 2 x 6 cores, 4 threads: a third job gets the four spare cores, not a block already in use
+    slots = cpu_budget.plan_slots(3, 4, list(range(12)), TWO_NODES)
+    assert slots == [[0, 1, 2, 3], [6, 7, 8, 9], [4, 5, 10, 11]]
+    assert len({core for slot in slots for core in slot}) == 12
+
+def test_more_jobs_than_blocks_wrap_round():
+    slots = cpu_budget.plan_slots(4, 4, list(range(12)), TWO_NODES)
+    assert slots[3] == slots[0]
+
+def test_fewer_cores_than_threads_share_every_core():
+    assert cpu_budget.plan_slots(2, 8, [0, 1, 2, 3], [[0, 1, 2, 3]]) == [[0, 1, 2, 3], [0, 1, 2, 3]]
+
+def test_single_node_default():
+    assert cpu_budget.plan_slots(2, 2, [0, 1, 2, 3], [[0, 1, 2, 3]]) == [[0, 1], [2, 3]]
+
+def test_core_budget_hands_out_each_slot_once():
+    budget = cpu_budget.CoreBudget(2, 1, [0, 1])
+    with budget.slot() as first, budget.slot() as second:
+        assert sorted([first, second]) == [[0], [1]]
+        assert budget.slots.empty()
+    assert budget.slots.qsize() == 2
+
+def test_unpinned_command_is_unchanged(monkeypatch):
+    monkeypatch.setitem(CONFIG, 'pin_cpus', False)
+    assert cpu_budget.pinned_command(['energyplus', '-r'], [0]) == ['energyplus', '-r']
+    monkeypatch.setitem(CONFIG, 'pin_cpus', True)
+    assert cpu_budget.pinned_command(['energyplus', '-r'], None) == ['energyplus', '-r']
+
+@pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'), reason='CPU affinity is Linux only')
+def test_pinned_command_starts_on_its_cores(monkeypatch):
+    monkeypatch.setitem(CONFIG, 'pin_cpus', True)
+    core = min(os.sched_getaffinity(0))
+    cmd = cpu_budget.pinned_command([sys.executable, '-c', 'import os; print(sorted(os.sched_getaffinity(0)))'], [core])
+    assert subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.strip() == f"[{core}]"
+
+@pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'), reason='CPU affinity is Linux only')
+def test_pinned_command_missing_executable(monkeypatch):
+    monkeypatch.setitem(CONFIG, 'pin_cpus', True)
+    with pytest.raises(FileNotFoundError):
+        cpu_budget.pinned_command(['/nonexistent/energyplus'], [0])
@@ -0,0 +1,44 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from parametric import cube
+
+ESO = Path(__file__).parent / 'data' / 'small.eso'
+
+@pytest.fixture
+def runs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ('base', 'wall', 'annual'):
+        Path(name).mkdir()
+        shutil.copy(ESO, Path(name) / 'eplusout.eso')
+    # A run reporting RunPeriod values only, as sweeps did before series_variables
+    Path('annual/eplusout.eso').write_text('\n'.join(
+        line for line in ESO.read_text().splitlines() if line.split(',')[0] not in ('7', '9', '10')) + '\n')
+
+    def use(*names):
+        monkeypatch.setattr(cube, 'cube_sources', lambda variants=None: {name: name for name in names})
+    return use
+
+def test_cube_holds_runs_with_hourly_series(runs, tmp_path):
+    runs('base', 'wall', 'annual')
+    data, variants, variables = cube.build_cube(cube_dir=tmp_path / 'cube')
+    assert variants == ['base', 'wall']
+    assert data.shape == (2, 3, cube.HOURS)
+    heating = variables.index('MAIN_ZONE_IDEAL_LOADS_AIR_Zone_Ideal_Loads_Supply_Air_Total_Heating_Energy')
+    # J -> kWh, design day excluded
+    assert np.nansum(data[0, heating]) == pytest.approx(3000.0)
+
+def test_no_cube_from_the_base_alone(runs, tmp_path, capsys):
+    runs('base', 'annual')
+    assert cube.build_cube(cube_dir=tmp_path / 'cube') == (None, [], [])
+    assert 'fewer than two runs have hourly series (base)' in capsys.readouterr().out
+
+def test_cube_is_reused_until_an_output_changes(runs, tmp_path):
+    runs('base', 'wall')
+    cube.build_cube(cube_dir=tmp_path / 'cube')
+    built = (tmp_path / 'cube' / 'cube.npy').stat().st_mtime_ns
+    cube.build_cube(cube_dir=tmp_path / 'cube')
+    assert (tmp_path / 'cube' / 'cube.npy').stat().st_mtime_ns == built
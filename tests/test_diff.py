@@ -0,0 +1,80 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from parametric.diff import diff_runs, diff_sweep, load_series, parse_eso_series
+
+ESO = Path(__file__).parent / 'data' / 'small.eso'
+HEATING = 'MAIN_ZONE_IDEAL_LOADS_AIR_Zone_Ideal_Loads_Supply_Air_Total_Heating_Energy'
+TEMPERATURE = 'MAIN_ZONE_Zone_Mean_Air_Temperature'
+
+def scaled_copy(path, factor):
+    # The fixture with every hourly heating value multiplied by factor
+    lines = []
+    for line in ESO.read_text().splitlines():
+        parts = line.split(',')
+        if len(parts) == 2 and parts[0] == '7':
+            line = f"7,{float(parts[1]) * factor}"
+        lines.append(line)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+@pytest.fixture
+def eso(tmp_path):
+    path = tmp_path / 'base' / 'eplusout.eso'
+    path.parent.mkdir()
+    shutil.copy(ESO, path)
+    return path
+
+def test_series_skip_design_days():
+    columns, times, values = parse_eso_series(ESO)
+    # The RunPeriod variable is not an hourly series
+    assert columns == [HEATING, 'MAIN_ZONE_IDEAL_LOADS_AIR_Zone_Ideal_Loads_Supply_Air_Sensible_Cooling_Energy', TEMPERATURE]
+    assert times.tolist() == [1010100, 1010200, 1010300]
+    assert values[2].tolist() == [18.0, 21.0, 24.0]
+
+def test_series_cache_is_reused_until_the_eso_changes(eso):
+    columns, times, values = load_series(eso)
+    cache = eso.parent / 'eplusout.series.npy'
+    assert cache.exists()
+    assert isinstance(values, np.memmap)
+
+    mtime = cache.stat().st_mtime_ns
+    load_series(eso.parent)
+    assert cache.stat().st_mtime_ns == mtime
+
+    scaled_copy(eso, 2)
+    columns, times, values = load_series(eso)
+    assert values[0].tolist() == [7200000000.0] * 3
+
+def test_diff_runs(eso, tmp_path):
+    other = scaled_copy(tmp_path / 'other' / 'eplusout.eso', 1.1)
+    results = diff_runs(eso.parent, other.parent)
+    stats, monthly_dev, monthly_pct, hourly_dev, top_days = results[HEATING]
+    assert stats['steps'] == 3
+    assert stats['total_change_pct'] == pytest.approx(10)
+    assert stats['bias'] == pytest.approx(360000000)
+    assert monthly_pct[0] == pytest.approx(10)
+    assert np.isnan(monthly_pct[1])
+    assert top_days[0][:2] == (1, 1)
+    # Unchanged series diff to zero
+    assert results[TEMPERATURE][0]['max_abs'] == 0
+
+def test_diff_sweep_writes_reports(eso, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scaled_copy(tmp_path / 'parametric' / 'outputs' / 'Case600_1a' / 'eplusout.eso', 0.5)
+    df = diff_sweep(['1a', '1b'], base=str(eso.parent))
+    assert set(df['variant']) == {'1a'}
+    heating = df[df['variable'] == HEATING].iloc[0]
+    assert heating['total_change_pct'] == pytest.approx(-50)
+
+    results_dir = tmp_path / 'parametric' / 'results'
+    monthly = pd.read_csv(results_dir / 'hourly_diff_monthly.csv')
+    assert len(monthly) == 12 * len(df)
+    hours = pd.read_csv(results_dir / 'hourly_diff_hour_of_day.csv')
+    assert len(hours) == 24 * len(df)
+    assert (results_dir / 'hourly_diff_top_days.csv').exists()
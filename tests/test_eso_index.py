@@ -0,0 +1,80 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from parametric.eso_index import EsoIndex, eso_version, sidecar
+
+ESO = Path(__file__).parent / 'data' / 'small.eso'
+HEATING = 'Zone Ideal Loads Supply Air Total Heating Energy'
+COOLING = 'Zone Ideal Loads Supply Air Sensible Cooling Energy'
+
+@pytest.fixture
+def eso(tmp_path):
+    path = tmp_path / 'eplusout.eso'
+    shutil.copy(ESO, path)
+    return path
+
+def run_period_only(text, name):
+    # The fixture with its design day dropped and only run-period variables reported
+    lines = text.splitlines()
+    start = lines.index('1,RUN PERIOD 1,39.83,-104.65,-7.00,1650.00')
+    dictionary = [line for line in lines[:lines.index('End of Data Dictionary') + 1]
+                  if not line.startswith(('7,', '9,', '10,'))]
+    body = [line.replace('RUN PERIOD 1', name) for line in lines[start:]
+            if line.split(',')[0] in ('1', '5', '8') or line.startswith('End of Data')]
+    return '\n'.join(dictionary + body) + '\n'
+
+def test_dictionary(eso):
+    index = EsoIndex.load(eso)
+    assert index.variables['7'] == {'key': 'MAIN_ZONE IDEAL LOADS AIR', 'name': HEATING, 'unit': 'J', 'record': 2}
+    assert index.variables['8']['record'] == 5
+    assert sorted(index.find(HEATING.upper())) == ['7', '8']
+
+def test_design_days_are_skipped(eso):
+    index = EsoIndex.load(eso)
+    assert index.env_names == ['DENVER CENTENNIAL ANN HTG 99.6% CONDNS DB', 'RUN PERIOD 1']
+    assert index.design_day.tolist() == [True, False]
+    assert index.environments() == [1]
+    assert index.environments('all') == [0, 1]
+
+def test_totals_per_frequency(eso):
+    index = EsoIndex.load(eso)
+    run_period = index.environments()
+    assert index.totals(['7', '8', '9'], run_period) == {'7': 1.08e10, '8': 1.08e10, '9': 3.6e9}
+    assert index.totals(['7'], index.environments('all')) == {'7': 1.08e10 + 1e9}
+
+def test_block_values_seek_run_period_records(eso):
+    index = EsoIndex.load(eso)
+    assert index.block_values(5, [1], ['8']) == {'8': [1.08e10]}
+    assert index.block_values(5, [0, 1], ['8']) == {'8': [1e9, 1.08e10]}
+
+def test_block_values_stop_at_non_numeric_lines(eso):
+    eso.write_text(ESO.read_text().replace('8,10800000000.0', 'x8,10800000000.0'))
+    index = EsoIndex.load(eso)
+    assert index.block_values(5, [1], ['8']) == {'8': []}
+
+def test_sidecar_is_reused_until_the_eso_changes(eso):
+    first = EsoIndex.load(eso)
+    assert sidecar(eso).exists()
+    again = EsoIndex.load(eso)
+    assert again.variables == first.variables
+    assert again.blocks[2].tolist() == first.blocks[2].tolist()
+    with open(eso, 'a') as f:
+        f.write('\n')
+    assert EsoIndex.load(eso).env_bounds[-1][1] == first.env_bounds[-1][1]
+
+def test_one_day_weather_run_period_is_not_a_design_day(eso):
+    # Run-period-only output has no day type: a single weather day must still count
+    eso.write_text(run_period_only(ESO.read_text(), 'RUN PERIOD 1'))
+    index = EsoIndex.load(eso)
+    assert index.design_day.tolist() == [False]
+    assert index.totals(['8'], index.environments()) == {'8': 1.08e10}
+
+def test_design_day_named_environment_without_day_type(eso):
+    eso.write_text(run_period_only(ESO.read_text(), 'CHICAGO ANN CLG .4% CONDNS DB=>MWB'))
+    assert EsoIndex.load(eso).environments() == []
+
+def test_eso_version(eso, tmp_path):
+    assert eso_version(eso) == '25.1.0'
+    assert eso_version(tmp_path / 'missing.eso') is None
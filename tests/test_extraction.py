@@ -0,0 +1,57 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from parametric import extraction
+from parametric.extraction_cache import ExtractionCache
+from parametric.utils import file_hash
+
+ESO = Path(__file__).parent / 'data' / 'small.eso'
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ExtractionCache(tmp_path / 'cache')
+    monkeypatch.setattr(extraction, 'EXTRACTION_CACHE', cache)
+    return cache
+
+def scaled_copy(path, factor):
+    # The fixture with every heating value, hourly and run period, multiplied by factor
+    lines = []
+    for line in ESO.read_text().splitlines():
+        parts = line.split(',')
+        if parts[0] in ('7', '8') and len(parts) in (2, 12):
+            parts[1] = str(float(parts[1]) * factor)
+        lines.append(','.join(parts))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('\n'.join(lines) + '\n')
+    return path
+
+def test_parse_worker_returns_an_array_and_digest(tmp_path):
+    eso = scaled_copy(tmp_path / 'run' / 'eplusout.eso', 1)
+    values, digest, seconds = extraction.parse_worker(eso)
+    assert isinstance(values, np.ndarray)
+    assert values.tolist() == pytest.approx([3.0, 1.0])
+    assert digest == file_hash(eso)
+    assert seconds >= 0
+
+def test_prefetch_across_processes(cache, tmp_path):
+    esos = [scaled_copy(tmp_path / f"Case600_{n}" / 'eplusout.eso', n) for n in (1, 2, 3, 4)]
+    assert extraction.prefetch_metrics(esos, workers=2) == 4
+    # Results land against the ESO they came from, whatever process parsed it
+    for n, eso in enumerate(esos, 1):
+        assert cache.get(eso, 'eso_metrics', extraction.EXTRACTOR_VERSION) == pytest.approx(
+            {'annual_heating_load': 3.0 * n, 'annual_sensible_cooling_load': 1.0})
+    assert extraction.prefetch_metrics(esos, workers=2) == 0
+
+    # Only a changed ESO goes back to the pool
+    scaled_copy(esos[1], 5)
+    assert extraction.prefetch_metrics(esos, workers=2) == 1
+    assert extraction.cached_eso_metrics(esos[1])['annual_heating_load'] == pytest.approx(15.0)
+
+def test_missing_esos_are_skipped(cache, tmp_path):
+    eso = scaled_copy(tmp_path / 'run' / 'eplusout.eso', 1)
+    missing = tmp_path / 'missing' / 'eplusout.eso'
+    assert extraction.prefetch_metrics([missing, eso], workers=2) == 1
+    assert not missing.parent.exists()
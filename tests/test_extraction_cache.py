@@ -0,0 +1,83 @@
+import json
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from parametric.extraction_cache import ExtractionCache
+
+ESO = Path(__file__).parent / 'data' / 'small.eso'
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(tmp_path / 'cache')
+
+@pytest.fixture
+def eso(tmp_path):
+    path = tmp_path / 'run' / 'eplusout.eso'
+    path.parent.mkdir()
+    shutil.copy(ESO, path)
+    return path
+
+def test_fetch_parses_once(cache, eso):
+    calls = []
+    extract = lambda: calls.append(1) or {'annual_heating_load': 3.0}
+    assert cache.fetch(eso, 'eso_metrics', 1, extract) == {'annual_heating_load': 3.0}
+    assert cache.fetch(eso, 'eso_metrics', 1, extract) == {'annual_heating_load': 3.0}
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_version_change_reparses(cache, eso):
+    cache.fetch(eso, 'eso_metrics', 1, lambda: {'value': 1})
+    assert cache.fetch(eso, 'eso_metrics', 2, lambda: {'value': 2}) == {'value': 2}
+
+def test_copied_eso_hits_by_content(cache, eso, tmp_path):
+    cache.fetch(eso, 'eso_metrics', 1, lambda: {'value': 1})
+    copy = tmp_path / 'moved' / 'eplusout.eso'
+    copy.parent.mkdir()
+    shutil.move(eso, copy)
+    assert cache.fetch(copy, 'eso_metrics', 1, lambda: {'value': 2}) == {'value': 1}
+
+def test_changed_eso_misses(cache, eso):
+    cache.fetch(eso, 'eso_metrics', 1, lambda: {'value': 1})
+    with open(eso, 'a') as f:
+        f.write('\n')
+    assert cache.fetch(eso, 'eso_metrics', 1, lambda: {'value': 2}) == {'value': 2}
+
+def test_index_is_written_on_flush_only(cache, eso):
+    cache.fetch(eso, 'eso_metrics', 1, lambda: {'value': 1})
+    assert not cache.index_file.exists()
+    cache.flush()
+    index = json.loads(cache.index_file.read_text())
+    assert list(index['files']) == [str(eso.resolve())]
+    reloaded = ExtractionCache(cache.dir)
+    assert reloaded.get(eso, 'eso_metrics', 1) == {'value': 1}
+
+def test_frames_round_trip_as_npy(cache, eso):
+    frame = pd.DataFrame({'Month': [1, 1], 'Hour': [1, 2], 'MAIN_ZONE_Zone_Mean_Air_Temperature': [18.0, 21.5]})
+    first = cache.fetch_frame(eso, 'eso_columns', 1, lambda: frame)
+    cache.flush()
+    again = ExtractionCache(cache.dir)
+    second = again.fetch_frame(eso, 'eso_columns', 1, lambda: pytest.fail('parsed twice'))
+    pd.testing.assert_frame_equal(first, frame)
+    pd.testing.assert_frame_equal(second, frame)
+    assert [f.suffix for f in cache.dir.glob('eso_columns-*')] == ['.npy']
+
+def test_prune_drops_deleted_outputs(cache, eso):
+    cache.fetch_frame(eso, 'eso_columns', 1, lambda: pd.DataFrame({'Month': [1]}))
+    eso.unlink()
+    assert cache.prune() == 1
+    assert not list(cache.dir.glob('*.npy'))
+    assert json.loads(cache.index_file.read_text()) == {'files': {}, 'entries': {}}
+
+def test_prefetch_hashes_in_the_worker(cache, eso, monkeypatch):
+    from parametric import extraction, extraction_cache
+    monkeypatch.setattr(extraction, 'EXTRACTION_CACHE', cache)
+    # The parent only trusts the path map; hashing is the worker's job
+    monkeypatch.setattr(extraction_cache, 'file_hash', lambda path: pytest.fail('hashed in the parent'))
+    assert extraction.prefetch_metrics([eso], workers=1) == 1
+    assert extraction.prefetch_metrics([eso], workers=1) == 0
+    assert cache.hits == 0
+    assert cache.get(eso, 'eso_metrics', extraction.EXTRACTOR_VERSION) == pytest.approx(
+        {'annual_heating_load': 3.0, 'annual_sensible_cooling_load': 1.0})
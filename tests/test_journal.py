@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+
+from parametric import journal, simulation
+from parametric.config import CONFIG, STUDY_CASES
+from parametric.journal import Journal
+
+VARIANTS = {v: STUDY_CASES[v] for v in ('1a', '6a', '6b')}
+
+@pytest.fixture
+def sweep(sweep_dir, monkeypatch):
+    monkeypatch.setattr(simulation, 'STUDY_CASES', VARIANTS)
+    monkeypatch.setattr(journal, 'STUDY_CASES', VARIANTS)
+    monkeypatch.setitem(CONFIG, 'max_parallel', 1)
+    calls = []
+    run = simulation.run_single_simulation
+
+    def tracked(variant_id, *args, **kwargs):
+        calls.append(variant_id)
+        if variant_id in crash:
+            raise KeyboardInterrupt(f"killed while running {variant_id}")
+        return run(variant_id, *args, **kwargs)
+
+    crash = set()
+    monkeypatch.setattr(simulation, 'run_single_simulation', tracked)
+    return calls, crash
+
+def test_resume_runs_only_what_the_crash_left(sweep):
+    calls, crash = sweep
+    crash.add('6b')
+    with pytest.raises(KeyboardInterrupt):
+        simulation.run_sweep(Path(CONFIG['base_case']))
+    run_id, jobs = Journal().replay()
+    assert {v: job['status'] for v, job in jobs.items()} == {'1a': 'success', '6a': 'success', '6b': 'in_flight'}
+    assert Journal().pending_run() == run_id
+
+    # A torn line from the crash is skipped on replay
+    with open(CONFIG['journal_file'], 'a') as f:
+        f.write('{"event": "complete", "variant": "6')
+
+    calls.clear()
+    crash.clear()
+    results = simulation.run_sweep(Path(CONFIG['base_case']), resume=True)
+    assert calls == ['6b']
+    assert [(r['variant'], r['status']) for r in results] == [('1a', 'success'), ('6a', 'success'), ('6b', 'success')]
+    # Same sweep, now finished
+    assert Journal().replay()[0] == run_id
+    assert Journal().pending_run() is None
+
+def test_failed_jobs_are_retried_then_rerun_on_resume(sweep, monkeypatch):
+    calls, _ = sweep
+    monkeypatch.setitem(CONFIG, 'max_retries', 1)
+    execute = simulation.execute
+    monkeypatch.setattr(simulation, 'execute', lambda variant_file, *args: (
+        {'status': 'failed', 'reason': 'Fatal', 'runtime': 0.0} if '6a' in str(variant_file) else execute(variant_file, *args)))
+    results = simulation.run_sweep(Path(CONFIG['base_case']))
+    assert calls.count('6a') == 2
+    assert [r['attempt'] for r in results if r['variant'] == '6a'] == [2]
+
+    monkeypatch.setattr(simulation, 'execute', execute)
+    calls.clear()
+    results = simulation.run_sweep(Path(CONFIG['base_case']), resume=True)
+    assert calls == ['6a']
+    assert all(r['status'] == 'success' for r in results)
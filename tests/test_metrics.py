@@ -0,0 +1,104 @@
+import re
+import urllib.request
+import urllib.error
+
+import pytest
+
+from parametric.metrics import SweepMetrics, RUNTIME_BUCKETS, start_metrics_server
+
+SAMPLE = re.compile(r'^([a-z_]+)(\{le="([^"]+)"\})? (-?[0-9.]+)$')
+
+def parse(text):
+    # name -> value, histogram buckets as name{le} -> value; checks every line is valid exposition
+    helps, types, samples = set(), {}, {}
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            helps.add(line.split()[2])
+        elif line.startswith('# TYPE '):
+            _, _, name, kind = line.split()
+            types[name] = kind
+        else:
+            match = SAMPLE.match(line)
+            assert match, line
+            name, _, le, value = match.groups()
+            samples[f"{name}{{{le}}}" if le else name] = float(value)
+    return helps, types, samples
+
+def family(name, types):
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in types:
+            return name[:-len(suffix)]
+    return name
+
+@pytest.fixture
+def metrics(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return SweepMetrics()
+
+def run_jobs(metrics, runtimes, fail_first=False):
+    metrics.enqueue(len(runtimes))
+    for runtime in runtimes:
+        metrics.start(1)
+        result = {'status': 'failed' if fail_first else 'success', 'runtime': runtime}
+        metrics.finish(result)
+        if fail_first:
+            metrics.start(2)
+            result = {'status': 'success', 'runtime': runtime}
+            metrics.finish(result)
+        metrics.done(result)
+
+def test_every_sample_has_help_and_type(metrics):
+    helps, types, samples = parse(metrics.render())
+    assert samples
+    for name in samples:
+        base = family(name.split('{')[0], types)
+        assert base in helps and base in types
+    assert types['parametric_jobs_completed_total'] == 'counter'
+    assert types['parametric_jobs_queued'] == 'gauge'
+    assert types['parametric_job_runtime_seconds'] == 'histogram'
+
+def test_job_counters(metrics):
+    run_jobs(metrics, [3, 45], fail_first=True)
+    metrics.enqueue(1)
+    _, _, samples = parse(metrics.render())
+    assert samples['parametric_jobs_queued'] == 1
+    assert samples['parametric_jobs_running'] == 0
+    assert samples['parametric_jobs_completed_total'] == 2
+    assert samples['parametric_jobs_failed_total'] == 0
+    assert samples['parametric_job_retries_total'] == 2
+
+def test_runtime_histogram_is_cumulative(metrics):
+    runtimes = [1, 7, 7, 400, 5000]
+    run_jobs(metrics, runtimes)
+    _, _, samples = parse(metrics.render())
+    buckets = [samples[f"parametric_job_runtime_seconds_bucket{{{bound}}}"] for bound in RUNTIME_BUCKETS]
+    assert buckets == [sum(r <= bound for r in runtimes) for bound in RUNTIME_BUCKETS]
+    assert buckets == sorted(buckets)
+    assert samples['parametric_job_runtime_seconds_bucket{+Inf}'] == len(runtimes)
+    assert samples['parametric_job_runtime_seconds_count'] == len(runtimes)
+    assert samples['parametric_job_runtime_seconds_sum'] == pytest.approx(sum(runtimes))
+
+def test_cache_hit_ratio_and_disk(metrics, tmp_path):
+    metrics.cached(3, 12)
+    outputs = tmp_path / 'parametric' / 'outputs' / 'Case600_base'
+    outputs.mkdir(parents=True)
+    (outputs / 'eplusout.eso').write_bytes(b'x' * 2000)
+    _, _, samples = parse(metrics.render())
+    assert samples['parametric_cache_hit_ratio'] == pytest.approx(0.25)
+    assert samples['parametric_outputs_disk_bytes'] == 2000
+
+def test_server_serves_exposition(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = start_metrics_server(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(url + '/metrics', timeout=10) as response:
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            body = response.read().decode()
+        assert 'parametric_jobs_queued' in parse(body)[2]
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(url + '/other', timeout=10)
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,44 @@
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from parametric import journal, pipeline, simulation
+from parametric.config import CONFIG, STUDY_CASES
+
+ESO = Path(__file__).parent / 'data' / 'small.eso'
+VARIANTS = {v: STUDY_CASES[v] for v in ('1a', '1b', '6a', '6b')}
+
+@pytest.fixture
+def sweep(sweep_dir, monkeypatch):
+    for module in (simulation, journal, pipeline):
+        monkeypatch.setattr(module, 'STUDY_CASES', VARIANTS)
+    base = sweep_dir / 'outputs' / Path(CONFIG['weather_file']).stem / 'Case600' / 'eplusout.eso'
+    base.parent.mkdir(parents=True)
+    shutil.copy(ESO, base)
+
+    events = []
+    monkeypatch.setattr(pipeline, 'create_academic_plots', lambda df, plots_dir, only: events.append(('plot', only[0])))
+    process = pipeline.Pipeline.process
+    monkeypatch.setattr(pipeline.Pipeline, 'process',
+                        lambda self, result: events.append(('result', result['variant'])) or process(self, result))
+    return events
+
+def test_results_are_extracted_and_groups_analysed_as_they_complete(sweep, sweep_dir):
+    df = pipeline.run_pipelined()
+    assert df['variant'].tolist() == ['base', '1a', '1b', '6a', '6b']
+    assert (df['fidelity'] == 'full').all()
+    assert df['annual_heating_load'].iloc[0] == pytest.approx(3.0)
+
+    # Each group is plotted once, after its last variant: the first to complete while others still run
+    plots = [i for i, event in enumerate(sweep) if event[0] == 'plot']
+    assert sorted(sweep[i][1] for i in plots) == ['terrain', 'timestep']
+    groups = {'timestep': {'1a', '1b'}, 'terrain': {'6a', '6b'}}
+    for i in plots:
+        assert groups[sweep[i][1]] <= {variant for kind, variant in sweep[:i] if kind == 'result'}
+    assert sum(kind == 'result' for kind, _ in sweep[:plots[0]]) < len(VARIANTS)
+
+    results_dir = sweep_dir / 'parametric' / 'results'
+    assert pd.read_csv(results_dir / 'results.csv')['variant'].tolist() == ['base', '1a', '1b', '6a', '6b']
+    assert (results_dir / 'results.txt').exists()
@@ -0,0 +1,30 @@
+import shutil
+from pathlib import Path
+
+import reference
+from parametric import extraction_cache
+from parametric.utils import file_hash
+
+WORKBOOK = Path(__file__).resolve().parent.parent / reference.WORKBOOK
+
+def test_one_file_hash():
+    # The reference cache and the extraction cache fingerprint files the same way
+    assert reference.file_hash is file_hash
+    assert extraction_cache.file_hash is file_hash
+
+def test_cache_is_compiled_once(tmp_path, monkeypatch):
+    workbook = tmp_path / WORKBOOK.name
+    shutil.copy(WORKBOOK, workbook)
+    cache_dir = tmp_path / 'cache'
+
+    assert reference.ingest(workbook, cache_dir) is True
+    assert reference.ingest(workbook, cache_dir) is False
+    data = reference.load_reference(workbook, cache_dir)
+    assert data['metadata']['workbook_sha256'] == file_hash(workbook)
+    heating = data['cases']['600']['metrics']['annual_heating_load']['statistics']
+    assert heating['min'] < heating['mean'] < heating['max']
+
+    # A new cache layout recompiles an unchanged workbook
+    monkeypatch.setattr(reference, 'REFERENCE_CACHE_VERSION', reference.REFERENCE_CACHE_VERSION + 1)
+    assert not reference.cache_is_current(workbook, cache_dir)
+    assert reference.ingest(workbook, cache_dir) is True
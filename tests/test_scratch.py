@@ -0,0 +1,54 @@
+import threading
+import time
+from pathlib import Path
+
+from parametric import scratch, simulation
+from parametric.config import CONFIG, STUDY_CASES
+from parametric.scratch import ScratchManager
+
+def test_jobs_wait_for_room_in_the_budget(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG, 'scratch_job_mb', 60)
+    manager = ScratchManager(tmp_path / 'scratch', limit_mb=100)
+    events = []
+
+    def job(name, hold):
+        with manager.job(name) as path:
+            events.append(('start', name, manager.reserved_mb))
+            assert path.parent == tmp_path / 'scratch'
+            time.sleep(hold)
+            events.append(('end', name))
+
+    first = threading.Thread(target=job, args=('a', 0.3))
+    first.start()
+    time.sleep(0.1)
+    job('b', 0)
+    first.join()
+    # Two 60 MB jobs do not fit in 100 MB: b starts only once a has released its share
+    assert events == [('start', 'a', 60), ('end', 'a'), ('start', 'b', 60), ('end', 'b')]
+    assert manager.reserved_mb == 0
+
+def test_oversized_job_runs_alone(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG, 'scratch_job_mb', 500)
+    manager = ScratchManager(tmp_path / 'scratch', limit_mb=100)
+    with manager.job('big'):
+        assert manager.reserved_mb == 500
+        assert not manager.can_reserve(1)
+
+def test_estimates_learn_from_measured_footprints(tmp_path):
+    manager = ScratchManager(tmp_path / 'scratch', limit_mb=100)
+    assert manager.estimate_mb('1a') == CONFIG['scratch_job_mb']
+    with manager.job('1a') as path:
+        (path / 'eplusout.eso').write_bytes(b'\0' * 2_000_000)
+    # Largest footprint seen plus 20%, and the job's directory is gone
+    assert manager.sizes['1a'] == 2.0
+    assert manager.estimate_mb('1a') == 2.4
+    assert list((tmp_path / 'scratch').iterdir()) == []
+
+def test_simulation_on_scratch_keeps_only_what_extraction_needs(sweep_dir, monkeypatch):
+    monkeypatch.setitem(CONFIG, 'scratch_dir', str(sweep_dir / 'tmpfs'))
+    monkeypatch.setattr(scratch, '_MANAGER', None)
+    result = simulation.run_single_simulation('1a', STUDY_CASES['1a'], Path(CONFIG['base_case']))
+    assert result['status'] == 'success'
+    assert sorted(p.name for p in Path(result['output_dir']).iterdir()) == ['energyplus.log', 'eplusout.err', 'eplusout.eso']
+    assert list((sweep_dir / 'tmpfs').iterdir()) == []
+    assert scratch.scratch_manager().sizes['1a'] > 0
@@ -0,0 +1,64 @@
+import threading
+from pathlib import Path
+
+from parametric import simulation
+from parametric.canonical import parse_objects
+from parametric.config import CONFIG, STUDY_CASES
+from parametric.extraction import METRIC_VARIABLES
+
+# Variants whose fields exist in the IDD eppy ships (see conftest.sweep_dir)
+VARIANTS = ['1a', '1b', '6a', '6b', '12a', '13a']
+
+def test_screening_runs_variants_in_parallel_after_the_base(sweep_dir, monkeypatch):
+    events = []
+    active = [0, 0]
+    lock = threading.Lock()
+    run = simulation.run_single_simulation
+
+    def tracked(variant_id, *args, **kwargs):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+            events.append(('start', variant_id))
+        try:
+            return run(variant_id, *args, **kwargs)
+        finally:
+            with lock:
+                active[0] -= 1
+                events.append(('end', variant_id))
+
+    monkeypatch.setattr(simulation, 'run_single_simulation', tracked)
+    promoted, screened, note = simulation.screen_variants(Path(CONFIG['base_case']), VARIANTS)
+
+    # The base finishes before any variant starts; the variants then share max_parallel slots
+    assert events[:2] == [('start', 'base'), ('end', 'base')]
+    assert active[1] == CONFIG['max_parallel']
+    assert note is None
+    assert sorted(promoted + list(screened)) == sorted(VARIANTS)
+    assert promoted == [v for v in VARIANTS if v in promoted]
+    assert all(change <= CONFIG['screening_tolerance'] for change in screened.values())
+
+def output_requests(variant_file):
+    return sorted((fields[2], fields[3]) for fields in parse_objects(variant_file.read_text())
+                  if fields[0] == 'output:variable')
+
+def test_variant_requests_only_metric_and_series_outputs(sweep_dir):
+    base = Path(CONFIG['base_case'])
+    objects = {fields[0] for fields in parse_objects(base.read_text())}
+    assert objects & {'output:table:summaryreports', 'outputcontrol:table:style'}
+
+    variant_file = simulation.write_variant_idf('1a', STUDY_CASES['1a'], base)
+    objects = [fields[0] for fields in parse_objects(variant_file.read_text())]
+    assert not {'output:table:summaryreports', 'outputcontrol:table:style', 'output:sqlite'} & set(objects)
+    metrics = [(METRIC_VARIABLES[m].lower(), CONFIG['output_frequency'].lower()) for m in CONFIG['output_metrics']]
+    series = [(v.lower(), 'hourly') for v in CONFIG['series_variables']]
+    assert output_requests(variant_file) == sorted(metrics + series)
+
+    # Screening runs feed annual totals only
+    screen_file = simulation.write_variant_idf('1a', STUDY_CASES['1a'], base, screening=True)
+    assert output_requests(screen_file) == sorted(metrics)
+
+def test_api_backend_requests_metrics_through_the_api(sweep_dir, monkeypatch):
+    monkeypatch.setitem(CONFIG, 'backend', 'api')
+    variant_file = simulation.write_variant_idf('1a', STUDY_CASES['1a'], Path(CONFIG['base_case']))
+    assert output_requests(variant_file) == sorted((v.lower(), 'hourly') for v in CONFIG['series_variables'])
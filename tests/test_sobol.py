@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from parametric import sobol
+from parametric.config import SOBOL_FACTORS
+
+def indices(model, n_factors, n=20000, seed=1):
+    a, b, ab = sobol.saltelli_matrices(n, n_factors, np.random.default_rng(seed))
+    return model(a), model(b), np.stack([model(m) for m in ab])
+
+def test_additive_model_matches_the_analytic_indices():
+    # Var(x1) : Var(2 x2) = 1 : 4, x3 unused
+    f_a, f_b, f_ab = indices(lambda x: x[:, 0] + 2 * x[:, 1], 3)
+    first, total = sobol.sobol_indices(f_a, f_b, f_ab)
+    assert first == pytest.approx([0.2, 0.8, 0.0], abs=0.03)
+    assert total == pytest.approx([0.2, 0.8, 0.0], abs=0.03)
+
+def test_interaction_shows_in_total_not_first_order():
+    # x1 x2 on the unit square: S1 = 3/7 each, ST = 4/7 each
+    f_a, f_b, f_ab = indices(lambda x: x[:, 0] * x[:, 1], 2)
+    first, total = sobol.sobol_indices(f_a, f_b, f_ab)
+    assert first == pytest.approx([3 / 7, 3 / 7], abs=0.03)
+    assert total == pytest.approx([4 / 7, 4 / 7], abs=0.03)
+
+def test_bootstrap_brackets_the_estimate():
+    f_a, f_b, f_ab = indices(lambda x: x[:, 0] + 2 * x[:, 1], 3, n=2000)
+    first, total = sobol.sobol_indices(f_a, f_b, f_ab)
+    first_ci, total_ci = sobol.bootstrap_indices(f_a, f_b, f_ab, 250, np.random.default_rng(0), batch=64)
+    assert first_ci.shape == total_ci.shape == (2, 3)
+    assert (first_ci[0] <= first + 1e-12).all() and (first <= first_ci[1] + 1e-12).all()
+    assert (total_ci[0] <= total + 1e-12).all() and (total <= total_ci[1] + 1e-12).all()
+
+def test_run_sobol_simulates_each_distinct_design_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    names = list(SOBOL_FACTORS)
+    batches = []
+
+    def evaluate(configs):
+        # Heating follows the timestep level only, cooling the terrain level only
+        batches.append(list(configs))
+        found = {}
+        for name in configs:
+            levels = dict(zip(names, map(int, name[len('sobol_'):].split('-'))))
+            found[name] = {'annual_heating_load': 4 + 0.1 * levels['timestep'],
+                           'annual_sensible_cooling_load': 6 + 0.2 * levels['terrain']}
+        return found
+
+    df = sobol.run_sobol(n_samples=32, n_resamples=50, evaluate=evaluate)
+    assert len(batches) == 1 and len(set(batches[0])) == len(batches[0])
+    evaluations = pd.read_csv(tmp_path / 'parametric' / 'results' / 'sobol_evaluations.csv')
+    assert len(evaluations) == len(batches[0]) < 32 * (len(names) + 2)
+
+    total = df.set_index(['output', 'factor'])['ST']
+    assert total['annual_heating_load'].idxmax() == 'timestep'
+    assert total['annual_sensible_cooling_load'].idxmax() == 'terrain'
+    # Factors a model ignores have exactly zero total effect
+    assert (total['annual_heating_load'].drop('timestep') == 0).all()
+    assert (tmp_path / 'parametric' / 'results' / 'sobol.txt').exists()
@@ -0,0 +1,61 @@
+import sys
+import time
+
+import pytest
+
+from parametric.config import CONFIG, STUDY_CASES
+from parametric.supervision import RuntimeHistory, estimate_cost, run_energyplus
+
+def script(code):
+    return [sys.executable, '-c', code]
+
+def test_cost_follows_timestep_algorithm_and_fidelity():
+    assert estimate_cost(STUDY_CASES['1d']) == pytest.approx(5.0)
+    assert estimate_cost(STUDY_CASES['11a']) == pytest.approx(5.0)
+    assert estimate_cost(STUDY_CASES['6a'], screening=True) == pytest.approx(len(CONFIG['screening_weeks']) * 7 / 365)
+
+def test_timeouts_come_from_recorded_runtimes(tmp_path):
+    history = RuntimeHistory(tmp_path / 'history.json', keep=3)
+    # Nothing recorded: the default, scaled by cost
+    assert history.timeout_for('1a', 2.0) == CONFIG['timeout_default'] * 2.0
+    for seconds in (40, 50, 60, 70):
+        history.record('base', seconds, 1.0)
+    assert [r['seconds'] for r in history.entries['base']] == [50, 60, 70]
+
+    # Own history: the slowest recent run; otherwise the median seconds per unit cost, scaled
+    assert history.timeout_for('base', 1.0) == 70 * CONFIG['timeout_factor']
+    assert history.timeout_for('1d', 5.0) == 60 * 5.0 * CONFIG['timeout_factor']
+    assert history.timeout_for('1a_screen', 0.01) == CONFIG['timeout_min']
+    assert RuntimeHistory(tmp_path / 'history.json').entries == history.entries
+
+def test_fatal_error_kills_the_run_at_once(tmp_path):
+    # Writes a fatal line the way EnergyPlus does, then hangs
+    err_file = tmp_path / 'eplusout.err'
+    code = (f"import time\n"
+            f"open({str(err_file)!r}, 'w').write('   **  Fatal  ** GetInput: errors found\\n')\n"
+            f"time.sleep(30)")
+    start = time.time()
+    outcome = run_energyplus(script(code), tmp_path, timeout=60, poll_interval=0.1)
+    assert outcome['status'] == 'failed'
+    assert outcome['reason'] == 'killed on error: **  Fatal  ** GetInput: errors found'
+    assert time.time() - start < 10
+
+def test_hung_run_times_out(tmp_path):
+    outcome = run_energyplus(script("import time; time.sleep(30)"), tmp_path, timeout=1, poll_interval=0.1)
+    assert outcome['status'] == 'failed'
+    assert outcome['reason'] == 'timeout after 1s'
+    assert outcome['runtime'] < 10
+
+def test_exit_code_reports_the_fatal_line(sweep_dir):
+    outcome = run_energyplus([CONFIG['energyplus_exe'], '-d', str(sweep_dir), 'missing.idf'], sweep_dir, timeout=60)
+    assert outcome['status'] == 'failed'
+    assert 'Fatal' in outcome['reason']
+
+def test_clean_run_succeeds(sweep_dir):
+    idf = sweep_dir / 'model.idf'
+    idf.write_text('Timestep,4;\n')
+    output_dir = sweep_dir / 'out'
+    output_dir.mkdir()
+    outcome = run_energyplus([CONFIG['energyplus_exe'], '-d', str(output_dir), str(idf)], output_dir, timeout=60)
+    assert outcome['status'] == 'success'
+    assert (output_dir / 'eplusout.eso').exists()
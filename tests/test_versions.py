@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from parametric import versions
+from parametric.config import CONFIG, STUDY_CASES
+from parametric.fake_energyplus import install
+
+REFERENCE = Path(__file__).resolve().parent.parent / 'results' / 'OTHER_TOOLS.json'
+VARIANTS = list(STUDY_CASES)[:2]
+
+@pytest.fixture
+def engines(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(versions, '_VERSIONS', {})
+    monkeypatch.setitem(CONFIG, 'reference_file', str(REFERENCE))
+    monkeypatch.setitem(CONFIG, 'max_parallel', 2)
+    monkeypatch.setitem(CONFIG, 'threads_per_job', 1)
+    monkeypatch.setitem(CONFIG, 'scratch_dir', None)
+    return [str(install(tmp_path / 'engines', version)) for version in ('24.2.0', '25.1.0')]
+
+def prepare(exe, version, configs, idf_file):
+    # Stands in for the per-engine eppy build: one small model file per variant
+    variant_dir = Path('parametric') / 'idf_variants' / version
+    variant_dir.mkdir(parents=True, exist_ok=True)
+    files = {}
+    for variant in configs:
+        files[variant] = variant_dir / f"{variant}.idf"
+        files[variant].write_text(f"! {variant}\nTimestep,4;\n")
+    return files
+
+def test_detect_version_from_the_executable(engines):
+    assert [versions.detect_version(exe) for exe in engines] == ['24.2.0', '25.1.0']
+
+def test_duplicate_version_is_reported(engines, tmp_path, capsys):
+    duplicate = str(install(tmp_path / 'other', '25.1.0'))
+    assert versions.installed_engines(engines + [duplicate]) == {'24.2.0': engines[0], '25.1.0': engines[1]}
+    assert f"{duplicate}: version 25.1.0 already covered by {engines[1]}" in capsys.readouterr().out
+
+def test_missing_executable_is_skipped(engines, tmp_path):
+    assert list(versions.installed_engines([str(tmp_path / 'none' / 'energyplus'), engines[1]])) == ['25.1.0']
+
+def test_version_matrix(engines, tmp_path):
+    duplicate = str(install(tmp_path / 'other', '25.1.0'))
+    df = versions.run_version_matrix(engines + [duplicate], VARIANTS, prepare=prepare)
+    assert list(zip(df['version'], df['variant'])) == [(v, n) for v in ('24.2.0', '25.1.0') for n in ['base'] + VARIANTS]
+    assert (df['status'] == 'success').all()
+    # The version each ESO reports, not just the one the executable claimed
+    assert df['eso_version'].tolist() == df['version'].tolist()
+
+    heating = df.pivot(index='variant', columns='version', values='annual_heating_load')
+    assert (heating['24.2.0'] != heating['25.1.0']).all()
+
+    summary = pd.read_csv(Path('parametric') / 'results' / 'version_comparison.csv')
+    assert summary['version'].tolist() == ['24.2.0', '25.1.0', '25.1.0']
+    assert summary['executable'].tolist() == engines + [duplicate]
+    # The duplicate is on record, not just in the console output
+    assert summary['skipped'].isna().tolist() == [True, True, False]
+    assert summary.loc[2, 'skipped'] == f"version 25.1.0 already covered by {engines[1]}"
+    summary = summary[summary['skipped'].isna()]
+    assert summary['succeeded'].tolist() == [3, 3]
+    # Reference passes are judged on the base case only
+    assert summary['base_within_reference'].tolist() == [True, True]
+    assert 'bestest_passes' not in summary.columns
+    assert summary.loc[0, 'annual_heating_load_max_abs_change_pct'] == 0
+
+def test_failed_variant_build_fails_only_that_version(engines):
+    def partial(exe, version, configs, idf_file):
+        if version == '24.2.0':
+            raise FileNotFoundError('Energy+.idd')
+        return prepare(exe, version, configs, idf_file)
+
+    df = versions.run_version_matrix(engines, VARIANTS, prepare=partial)
+    status = df.groupby('version')['status'].unique()
+    assert status['24.2.0'].tolist() == ['failed']
+    assert status['25.1.0'].tolist() == ['success']
+    # The reference version has nothing to compare against: no NaN lines in the report
+    report = (Path('parametric') / 'results' / 'version_comparison.txt').read_text()
+    assert '24.2.0: no successful runs, 3 failed' in report
+    assert 'no successful runs in common with 24.2.0, no changes to report' in report
+    assert 'nan' not in report
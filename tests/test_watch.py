@@ -0,0 +1,53 @@
+import json
+import copy
+from pathlib import Path
+
+import pytest
+
+import watch
+from analyze import PLOT_METRICS, read_reference
+from parametric.fake_energyplus import install
+
+REFERENCE = Path(__file__).resolve().parent.parent / 'results' / 'OTHER_TOOLS.json'
+
+@pytest.fixture
+def watcher(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    Path('Case600.idf').write_text("! Case 600\n")
+    Path('weather.epw').write_text("LOCATION,Denver\n")
+    return watch.Watcher(['Case600.idf'], 'weather.epw', str(REFERENCE), analysis_dir='analysis',
+                         energyplus=str(install(tmp_path / 'engines', '24.2.0')))
+
+def test_changed_metrics(watcher):
+    reference = read_reference(str(REFERENCE))
+    results = {'case_600': {'annual_heating_load': 4.3, 'monthly_heating_loads': {'january': 900.0}}}
+    # Nothing rendered yet: every plot
+    assert watcher.changed_metrics(results, reference) == (set(PLOT_METRICS), {'heating', 'cooling'})
+
+    watcher.last_results, watcher.last_reference = copy.deepcopy(results), copy.deepcopy(reference)
+    assert watcher.changed_metrics(results, reference) == (set(), set())
+
+    results['case_600']['annual_heating_load'] = 4.4
+    results['case_600']['monthly_heating_loads']['january'] = 910.0
+    assert watcher.changed_metrics(results, reference) == ({'annual_heating_load'}, {'heating'})
+
+    # A reference edit re-renders the plots it feeds, with unchanged results
+    watcher.last_results = copy.deepcopy(results)
+    reference['metrics']['annual_sensible_cooling_load']['statistics']['max'] += 1
+    assert watcher.changed_metrics(results, reference) == ({'annual_sensible_cooling_load'}, set())
+
+def test_default_reference_is_what_analyze_reads(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert watch.Watcher([], 'weather.epw').reference_file == 'results/OTHER_TOOLS.json'
+    Path('results').mkdir()
+    Path('results/RESULTS5-2A-Update.xlsx').write_bytes(b'')
+    assert watch.Watcher([], 'weather.epw').reference_file == 'results/RESULTS5-2A-Update.xlsx'
+
+def test_edit_reruns_and_records_the_version(watcher):
+    watcher.step({'Case600.idf'})
+    results = json.loads(Path('results/weather/FORMATTED_RESULTS.json').read_text())
+    assert results['metadata']['version'] == '24.2.0'
+    assert Path('analysis/results_report.txt').exists()
+
+    # An unchanged ESO is not re-extracted
+    assert watcher.extract('Case600') is False
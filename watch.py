@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import run_simulation
+import extract_results
+from analyze import BESTESTComparison, PLOT_METRICS, reference_source
+from parametric.eso_index import eso_version
+from parametric.utils import file_hash
+
+class Watcher:
+    def __init__(self, cases, weather, reference=None, output_root='outputs',
+                 results_root='results', analysis_dir='results_analysis', energyplus=run_simulation.ENERGYPLUS):
+        self.cases = {run_simulation.case_name(idf): str(idf) for idf in cases}
+        self.weather = str(weather)
+        self.weather_name = Path(weather).stem
+        # None: whatever analyze.py validates against (the workbook cache, else OTHER_TOOLS.json)
+        self.reference = reference
+        self.reference_file = reference_source(reference)
+        self.output_root = Path(output_root) / self.weather_name
+        self.results_dir = Path(results_root) / self.weather_name
+        self.analysis_dir = analysis_dir
+        self.energyplus = energyplus
+
+        self.hashes = {}        # watched path -> (mtime, content hash)
+        self.eso_mtimes = {}    # case -> mtime of the last extracted ESO
+        self.case_data = {}     # case -> extracted metrics
+        self.eso_versions = {}  # case -> engine version in the ESO header
+        self.last_results = None
+        self.last_reference = None
+
+    def watched_files(self):
+        return list(self.cases.values()) + [self.weather, self.reference_file]
+
+    def changed_files(self):
+        changed = []
+        for path in self.watched_files():
+            if not Path(path).exists():
+                continue
+            mtime = Path(path).stat().st_mtime
+            last_mtime, last_digest = self.hashes.get(path, (None, None))
+            if mtime == last_mtime:
+                continue
+            # mtime alone is not trusted: editors touch files without changing them
+            digest = file_hash(path)
+            self.hashes[path] = (mtime, digest)
+            if digest != last_digest:
+                changed.append(path)
+        return changed
+
+    def simulate(self, case):
+        output_dir = self.output_root / case
+        return run_simulation.run_simulation(self.cases[case], str(output_dir), self.weather, self.energyplus)
+
+    def extract(self, case):
+        eso_file = self.output_root / case / 'eplusout.eso'
+        if not eso_file.exists():
+            return False
+
+        mtime = eso_file.stat().st_mtime
+        if self.eso_mtimes.get(case) == mtime:
+            return False
+
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        metrics = extract_results.extract_case(eso_file, case, self.results_dir / f"{case}.csv")
+        if metrics is None:
+            return False
+
+        self.eso_mtimes[case] = mtime
+        self.case_data[case] = metrics
+        self.eso_versions[case] = eso_version(eso_file)
+        return True
+
+    def changed_metrics(self, results, reference):
+        # Plots depend on the case_600 value and the reference entry for each metric
+        if self.last_results is None or self.last_reference is None:
+            return set(PLOT_METRICS), {'heating', 'cooling'}
+
+        case = results.get('case_600', {})
+        last_case = self.last_results.get('case_600', {})
+        metrics = set()
+        for metric in PLOT_METRICS:
+            if case.get(metric) != last_case.get(metric):
+                metrics.add(metric)
+            elif reference['metrics'].get(metric) != self.last_reference['metrics'].get(metric):
+                metrics.add(metric)
+
+        monthly = set()
+        for data_type in ['heating', 'cooling']:
+            result_key = f'monthly_{data_type}_loads'
+            ref_key = f'{data_type}_loads'
+            if case.get(result_key) != last_case.get(result_key):
+                monthly.add(data_type)
+            elif reference.get('monthly_data', {}).get(ref_key) != self.last_reference.get('monthly_data', {}).get(ref_key):
+                monthly.add(data_type)
+
+        return metrics, monthly
+
+    def analyze(self):
+        results_file = self.results_dir / 'FORMATTED_RESULTS.json'
+        # As run_simulation.py records it: the version each ESO reports
+        version = ', '.join(sorted(v for v in set(self.eso_versions.values()) if v)) or None
+        extract_results.generate_bestest_json(self.case_data, results_file, version)
+
+        comparison = BESTESTComparison(self.reference, results_file, self.analysis_dir)
+        metrics, monthly = self.changed_metrics(comparison.results, comparison.reference)
+
+        if 'case_600' in comparison.results:
+            df = comparison.generate_comparison_report()
+            print(f"BESTEST validation: {df['within_range'].sum()}/{len(df)} passed")
+
+            comparison.output_dir.mkdir(parents=True, exist_ok=True)
+            for metric in sorted(metrics):
+                comparison.plot_comparison(metric, comparison.output_dir / f"{metric}.png")
+            for data_type in sorted(monthly):
+                comparison.plot_monthly_comparison(data_type, comparison.output_dir / f"monthly_{data_type}_comparison.png")
+            print(f"Re-rendered {len(metrics) + len(monthly)} plots")
+
+        self.last_results = comparison.results
+        self.last_reference = comparison.reference
+
+    def step(self, changed):
+        if self.weather in changed:
+            to_simulate = list(self.cases)
+        else:
+            to_simulate = [case for case, idf in self.cases.items() if idf in changed]
+
+        for case in to_simulate:
+            print(f"Simulating {case}...")
+            self.simulate(case)
+
+        extracted = [case for case in self.cases if self.extract(case)]
+        if extracted:
+            print(f"Extracted: {', '.join(extracted)}")
+
+        if (extracted or self.reference_file in changed) and self.case_data:
+            self.analyze()
+
+    def prime(self):
+        # Start from what is already on disk so the first pass only redoes stale stages
+        changed = self.changed_files()
+        stale = []
+        for case in self.cases:
+            eso_file = self.output_root / case / 'eplusout.eso'
+            if not eso_file.exists():
+                stale.append(self.cases[case])
+                continue
+            eso_mtime = eso_file.stat().st_mtime
+            inputs = [self.cases[case], self.weather]
+            if any(Path(p).exists() and Path(p).stat().st_mtime > eso_mtime for p in inputs):
+                stale.append(self.cases[case])
+
+        self.step(set(stale) | ({self.reference_file} if self.reference_file in changed else set()))
+
+    def run(self, interval=1.0):
+        print(f"Watching {len(self.watched_files())} files (Ctrl-C to stop)")
+        self.prime()
+        try:
+            while True:
+                time.sleep(interval)
+                changed = self.changed_files()
+                if changed:
+                    print(f"Changed: {', '.join(changed)}")
+                    self.step(set(changed))
+        except KeyboardInterrupt:
+            print("Stopped")
+        return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-run simulation, extraction and analysis when inputs change')
+    parser.add_argument('--cases', nargs='+', default=None, help='Case IDFs (default: all in idf_files/)')
+    parser.add_argument('--weather', default=run_simulation.WEATHER, help='Weather file (EPW)')
+    parser.add_argument('--reference', default=None, help='Reference JSON (default: as analyze.py, the compiled workbook cache)')
+    parser.add_argument('--output-dir', default='results_analysis', help='Where to write plots and the report')
+    parser.add_argument('--interval', type=float, default=1.0, help='Polling interval in seconds')
+    parser.add_argument('--energyplus', default=run_simulation.ENERGYPLUS, help='EnergyPlus executable')
+
+    args = parser.parse_args()
+    cases = args.cases or sorted(str(p) for p in Path('idf_files').glob('*.idf'))
+
+    watcher = Watcher(cases, args.weather, args.reference, analysis_dir=args.output_dir, energyplus=args.energyplus)
+    return watcher.run(args.interval)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)